@@ -5,6 +5,7 @@ from pygeopressure.basic.log_tools import (
     smooth_log, truncate_log, interpolate_log, upscale_log, local_average,
     shale, extrapolate_log_traugott)
 from pygeopressure.basic.seisegy import SeiSEGY
+from pygeopressure.basic.seicube import SeiCube
 from pygeopressure.basic.survey import Survey
 from pygeopressure.basic.las import LasData
 from pygeopressure.basic.survey_setting import SurveySetting
@@ -16,7 +17,11 @@ from pygeopressure.basic.indexes import (
 from pygeopressure.basic.horizon import Horizon
 from pygeopressure.basic.optimizer import (
     optimize_nct, optimize_eaton, optimize_bowers_virgin, optimize_traugott,
-    optimize_bowers_unloading, optimize_multivaraite)
+    optimize_bowers_unloading, optimize_multivaraite, optimize_nct_batch,
+    optimize_bowers_batch)
+from pygeopressure.basic.calibration import calibrate_field
+from pygeopressure.basic.joint_optimizer import (
+    joint_bowers_virgin, joint_bowers_unloading, joint_eaton)
 from pygeopressure.basic.plots import (
     plot_eaton_error, plot_bowers_vrigin, plot_bowers_unloading,
     plot_multivariate)
@@ -24,7 +29,8 @@ from pygeopressure.basic.survey import create_survey_directory
 
 from pygeopressure.velocity.smoothing import smooth, smooth_2d, smooth_trace
 from pygeopressure.velocity.conversion import (
-    rms2int, int2rms, int2avg, avg2int, twt2depth)
+    rms2int, int2rms, int2avg, avg2int, twt2depth, twt2depth_batch,
+    twt2depth_seis)
 from pygeopressure.velocity.interpolation import interp_DW, spline_1d
 from pygeopressure.velocity.extrapolate import (
     set_v0, normal, slotnick, normal_dt)
@@ -37,12 +43,23 @@ from pygeopressure.pressure.bowers import (
     bowers, bowers_varu)
 from pygeopressure.pressure.bowers_seis import bowers_seis
 from pygeopressure.pressure.eaton import eaton
-from pygeopressure.pressure.eaton_seis import eaton_seis
+from pygeopressure.pressure.eaton_seis import eaton_seis, nct_map
+from pygeopressure.pressure.fillippone import (
+    fillippone, fillippone_from_vint_time, fillippone_seis)
+from pygeopressure.pressure.pipeline import Pipeline
+from pygeopressure.pressure.uncertainty import (
+    sample_coefficients, bootstrap_coefficients, ensemble, ensemble_logs,
+    ensemble_seis)
 from pygeopressure.pressure.multivariate import (
     multivariate_virgin, invert_multivariate_virgin,
     multivariate_unloading, invert_multivariate_unloading,
     effective_stress_multivariate, pressure_multivariate,
     pressure_multivariate_varu)
+from pygeopressure.pressure.multivariate_seis import multivariate_seis
+from pygeopressure.pressure.eberhart_phillips import (
+    eberhart_phillips, invert_eberhart_phillips)
+from pygeopressure.pressure.eberhart_phillips_seis import (
+    eberhart_phillips_seis)
 from pygeopressure.pressure.hydrostatic import (
     hydrostatic_pressure, hydrostatic_well, hydrostatic_trace)
 
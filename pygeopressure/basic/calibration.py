@@ -0,0 +1,245 @@
+# -*- coding: utf-8 -*-
+"""
+calibration of NCT, Eaton and Bowers models for all wells of a field
+"""
+from __future__ import (absolute_import, division, print_function,
+                        unicode_literals)
+
+from builtins import bytes, str
+
+__author__ = "yuhao"
+
+from collections import OrderedDict
+from multiprocessing import Pool
+
+import numpy as np
+import pandas as pd
+
+from pygeopressure.basic.optimizer import (
+    optimize_nct, optimize_eaton, optimize_bowers_virgin,
+    optimize_bowers_unloading)
+from pygeopressure.basic.utils import rmse
+from pygeopressure.pressure.eaton import eaton
+from pygeopressure.pressure.bowers import invert_unloading
+from pygeopressure.velocity.extrapolate import normal
+
+MODELS = ('nct', 'eaton', 'bowers', 'unloading')
+COLUMNS = ['well', 'model', 'a', 'b', 'n', 'u', 'rms', 'n_points', 'error']
+
+
+def calibrate_field(survey, models=('nct', 'eaton', 'bowers'), workers=1,
+                    wells=None, vel_log='Velocity',
+                    obp_log='Overburden_Pressure', upper=None, lower=None,
+                    pres_log='loading', unloading_log='unloading',
+                    save=False, nnc=5):
+    """
+    Calibrate models for all wells of a field
+
+    Logs and pressure measurements of every well are read once, then wells
+    are fitted in parallel. Models of a well are fitted in the order of
+    MODELS, later models use coefficients fitted before (Eaton uses the NCT,
+    unloading uses the Bowers loading curve), or stored parameters of the
+    well if those are not calibrated.
+
+    Parameters
+    ----------
+    survey : Survey or list of Well
+    models : list of str
+        models to calibrate, in 'nct', 'eaton', 'bowers', 'unloading'
+    workers : int
+        number of processes
+    wells : list of str, optional
+        names of wells to calibrate, all wells by default
+    vel_log, obp_log : str
+        names of velocity and overburden pressure logs
+    upper, lower : float or str, optional
+        depth or horizon name of the NCT fitting interval, also used to
+        pick points on the NCT for the Bowers loading curve. The whole
+        velocity log is used for NCT and only measured pressures for Bowers
+        if not given.
+    pres_log : str
+        name of measured pressures for Eaton and Bowers loading curve
+    unloading_log : str
+        name of measured pressures for Bowers unloading curve
+    save : bool
+        store calibrated coefficients in well parameters and save them with
+        `Well.save_params`
+    nnc : int
+        number of points picked on the NCT for the Bowers loading curve when
+        both upper and lower are given
+
+    Returns
+    -------
+    pandas.DataFrame
+        one row per well and model with coefficients ('a', 'b' for NCT and
+        Bowers, 'n' for Eaton, 'u' for unloading), relative RMS error (see
+        `rmse`, of velocity for 'nct', pressure for 'eaton', effective
+        stress for 'bowers' and 'unloading'), number of points fitted and
+        error message of failed fits
+    """
+    for model in models:
+        if model not in MODELS:
+            raise ValueError("Unknown model {}".format(model))
+    models = [model for model in MODELS if model in models]
+    all_wells = list(survey.wells.values()) if hasattr(survey, 'wells') \
+        else list(survey)
+    if wells is not None:
+        all_wells = [well for well in all_wells if well.well_name in wells]
+
+    tasks = [(well, _resolve_inputs(
+        well, models, vel_log, obp_log, pres_log, unloading_log, upper,
+        lower, nnc), models) for well in all_wells]
+    if workers > 1 and len(tasks) > 1:
+        pool = Pool(min(workers, len(tasks)))
+        try:
+            results = pool.map(_calibrate_well, tasks)
+        finally:
+            pool.close()
+            pool.join()
+    else:
+        results = [_calibrate_well(task) for task in tasks]
+
+    if save:
+        for well, records in zip(all_wells, results):
+            if _update_params(well, records):
+                well.save_params()
+    return pd.DataFrame(
+        [record for records in results for record in records],
+        columns=COLUMNS)
+
+
+def _resolve_inputs(well, models, vel_log, obp_log, pres_log, unloading_log,
+                    upper, lower, nnc):
+    """
+    read logs and pressure measurements a well needs, errors are stored and
+    reported for every model
+    """
+    inputs = dict(vel=vel_log, obp=obp_log, pres=pres_log,
+                  unloading=unloading_log, nnc=nnc)
+    try:
+        if not well.get_log(vel_log):
+            raise ValueError("No log named {}".format(vel_log))
+        inputs['upper'] = _horizon_depth(well, upper)
+        inputs['lower'] = _horizon_depth(well, lower)
+        # logs and pressure points are cached in the well, and sent with it
+        # to workers
+        if models != ['nct'] and not well.get_log(obp_log):
+            raise ValueError("No log named {}".format(obp_log))
+        if 'eaton' in models or 'bowers' in models:
+            well.pressure_points(pres_log, vel_log, obp_log)
+        if 'unloading' in models:
+            well.pressure_points(unloading_log, vel_log, obp_log)
+    except Exception as ex:
+        inputs['error'] = "{}: {}".format(type(ex).__name__, ex)
+    return inputs
+
+
+def _horizon_depth(well, depth):
+    if isinstance(depth, (bytes, str)):
+        return well.params['horizon'][depth]
+    return depth
+
+
+def _calibrate_well(task):
+    "fit models of a well, returns list of records"
+    well, inputs, models = task
+    records = []
+    coef = dict()
+    for model in models:
+        record = OrderedDict((key, np.nan) for key in COLUMNS)
+        record['error'] = None
+        record['well'] = well.well_name
+        record['model'] = model
+        try:
+            if 'error' in inputs:
+                raise ValueError(inputs['error'])
+            record.update(_FITTERS[model](well, inputs, coef))
+        except Exception as ex:
+            record['error'] = "{}: {}".format(type(ex).__name__, ex) \
+                if 'error' not in inputs else inputs['error']
+        records.append(record)
+    return records
+
+
+def _fit_nct(well, inputs, coef):
+    vel_log = well.get_log(inputs['vel'])
+    a, b = optimize_nct(vel_log, inputs['upper'], inputs['lower'])
+    depth, vel = np.asarray(vel_log.depth), np.asarray(vel_log.data)
+    mask = np.isfinite(vel)
+    if inputs['upper'] is not None:
+        mask &= depth > inputs['upper']
+    if inputs['lower'] is not None:
+        mask &= depth < inputs['lower']
+    coef['nct'] = (a, b)
+    return dict(a=a, b=b, rms=rmse(vel[mask], normal(depth[mask], a, b)),
+                n_points=int(mask.sum()))
+
+
+def _fit_eaton(well, inputs, coef):
+    if 'nct' in coef:
+        a, b = coef['nct']
+    else:
+        a, b = well.params['nct']['a'], well.params['nct']['b']
+    vel_log, obp_log, pres_log = inputs['vel'], inputs['obp'], inputs['pres']
+    n = optimize_eaton(well, vel_log, obp_log, a, b, pres_log=pres_log)
+    points = well.pressure_points(pres_log, vel_log, obp_log, a, b)
+    predicted = eaton(
+        points['velocity'], points['normal_velocity'], points['hydrostatic'],
+        points['obp'], n=n)
+    return dict(n=n, rms=rmse(points['pressure'], predicted),
+                n_points=len(points))
+
+
+def _fit_bowers(well, inputs, coef):
+    mode = 'pres' if inputs['upper'] is None or inputs['lower'] is None \
+        else 'both'
+    a, b, rms_err = optimize_bowers_virgin(
+        well, inputs['vel'], inputs['obp'], inputs['upper'], inputs['lower'],
+        pres_log=inputs['pres'], mode=mode, nnc=inputs['nnc'])
+    coef['bowers'] = (a, b)
+    n_nct = inputs['nnc'] if mode == 'both' else 0
+    points = well.pressure_points(inputs['pres'], inputs['vel'], inputs['obp'])
+    return dict(a=a, b=b, rms=rms_err, n_points=len(points) + n_nct)
+
+
+def _fit_unloading(well, inputs, coef):
+    if 'bowers' in coef:
+        a, b = coef['bowers']
+    else:
+        a, b = well.params['bowers']['A'], well.params['bowers']['B']
+    vmax = well.params['bowers']['vmax']
+    vel_log, obp_log = inputs['vel'], inputs['obp']
+    pres_log = inputs['unloading']
+    u = optimize_bowers_unloading(
+        well, vel_log, obp_log, a, b, vmax, pres_log=pres_log)
+    points = well.pressure_points(pres_log, vel_log, obp_log)
+    predicted = invert_unloading(points['velocity'], a, b, u, vmax)
+    return dict(u=u, rms=rmse(points['es'], predicted),
+                n_points=len(points))
+
+
+_FITTERS = {
+    'nct': _fit_nct,
+    'eaton': _fit_eaton,
+    'bowers': _fit_bowers,
+    'unloading': _fit_unloading,
+}
+
+
+def _update_params(well, records):
+    "store successful fits in well.params, returns whether any is stored"
+    updated = False
+    for record in records:
+        if record['error'] is not None:
+            continue
+        updated = True
+        if record['model'] == 'nct':
+            well.params['nct'] = {"a": record['a'], "b": record['b']}
+        elif record['model'] == 'eaton':
+            well.params['n'] = record['n']
+        elif record['model'] == 'bowers':
+            bowers = well.params.setdefault('bowers', dict())
+            bowers['A'], bowers['B'] = record['a'], record['b']
+        elif record['model'] == 'unloading':
+            well.params['bowers']['U'] = record['u']
+    return updated
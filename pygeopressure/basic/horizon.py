@@ -9,36 +9,136 @@ from __future__ import (absolute_import, division, print_function,
 
 __author__ = "yuhao"
 
+import numpy as np
 import pandas as pd
+from scipy.interpolate import griddata
 
 
 class Horizon(object):
     """
     Horizon using excel file as input
 
+    Values are stored in a dense grid of inlines and crosslines on load, so
+    lookups do not scan the data.
+
     Parameters
     ----------
     data_file : str
         path to excel data file
+    like : SeiSEGY, SeiCube or SurveySetting, optional
+        survey geometry of the grid, the extent and spacing of the horizon
+        data by default
+    interpolation : {None, 'nearest', 'linear', 'cubic'}
+        method of `scipy.interpolate.griddata` filling grid nodes without
+        data, left as nan if None
     """
-    def __init__(self, data_file):
+    def __init__(self, data_file, like=None, interpolation=None):
         self.hdf_file = None
         self.horizon_name = None
         # self.data_frame = pd.read_excel(data_file)
         self.data_frame = pd.read_csv(data_file, sep='\t')
+        self._build_grid(like, interpolation)
 
     def __str__(self):
         return "Horizon Object: {}".format(self.horizon_name)
 
+    def _build_grid(self, like, interpolation):
+        # the last value of a cdp is used for duplicates
+        data = self.data_frame.drop_duplicates(
+            ['inline', 'crline'], keep='last')
+        inlines, crlines = data.inline.values, data.crline.values
+        if like is None:
+            self.inline_range = _axis_range(inlines)
+            self.crline_range = _axis_range(crlines)
+        else:
+            self.inline_range = (
+                like.startInline, like.endInline, like.stepInline)
+            self.crline_range = (
+                like.startCrline, like.endCrline, like.stepCrline)
+        self.grid = np.full(
+            (_axis_size(self.inline_range), _axis_size(self.crline_range)),
+            np.nan)
+        rows, cols = self._grid_index(inlines, crlines)
+        on_grid = (rows >= 0) & (cols >= 0)
+        self.grid[rows[on_grid], cols[on_grid]] = data.z.values[on_grid]
+        known = ~np.isnan(self.grid)
+        if interpolation is not None and known.any() and not known.all():
+            self.grid[~known] = griddata(
+                np.argwhere(known), self.grid[known], np.argwhere(~known),
+                method=interpolation)
+
+    def _grid_index(self, inlines, crlines):
+        "grid rows and columns of cdps, -1 where not on grid"
+        return _line_index(inlines, self.inline_range), \
+            _line_index(crlines, self.crline_range)
+
     def get_cdp(self, cdp):
         """
         Get value for a CDP point on the horizon.
 
         Parameters
         ----------
-        cdp : tuple of int (inline, crossline)
+        cdp : tuple (inline, crossline)
+            int or arrays of int of the same shape
+
+        Returns
+        -------
+        float or ndarray
+            value of cdps, nan where the horizon has no value
         """
-        inl, crl = cdp
-        return self.data_frame[
-            (self.data_frame.inline == inl) & \
-            (self.data_frame.crline == crl)].z.values[-1]
+        rows, cols = self._grid_index(*cdp)
+        values = np.where(
+            (rows >= 0) & (cols >= 0),
+            self.grid[np.maximum(rows, 0), np.maximum(cols, 0)], np.nan)
+        return values[()]
+
+    def get_inline(self, inline, crlines=None):
+        """
+        Get values along an inline
+
+        Parameters
+        ----------
+        inline : int
+        crlines : list of int, optional
+            crosslines of values, all crosslines of the grid by default
+
+        Returns
+        -------
+        1-d ndarray
+            nan where the horizon has no value
+        """
+        if crlines is None:
+            start, _, step = self.crline_range
+            crlines = start + step * np.arange(self.grid.shape[1])
+        crlines = np.asarray(crlines)
+        return self.get_cdp((np.full(crlines.shape, inline), crlines))
+
+
+def _axis_range(lines):
+    "start, end and step of line numbers"
+    lines = np.unique(lines)
+    if lines.size < 2:
+        return (lines[0], lines[0], 1)
+    steps = np.diff(lines)
+    if np.all(np.mod(lines, 1) == 0):
+        step = np.gcd.reduce(steps.astype(np.int64))
+    else:
+        step = steps.min()
+    return (lines[0], lines[-1], step)
+
+
+def _axis_size(line_range):
+    start, end, step = line_range
+    return int(round((end - start) / step)) + 1
+
+
+def _line_index(lines, line_range):
+    "index of lines on an axis, -1 where not on it"
+    start, _, step = line_range
+    position = (np.asarray(lines, dtype=np.float64) - start) / step
+    with np.errstate(invalid='ignore'):
+        index = np.round(
+            np.where(np.isnan(position), -1, position)).astype(np.int64)
+        on_axis = (np.abs(position - index) < 1e-6) & (index >= 0) & \
+            (index < _axis_size(line_range))
+    return np.where(on_axis, index, -1)
@@ -0,0 +1,279 @@
+# -*- coding: utf-8 -*-
+"""
+joint optimizers fitting Bowers and Eaton models to many wells at once
+
+Pressure points of all wells are stacked into one least-squares problem with
+shared coefficients and optional per-well terms. Jacobians are computed
+analytically and stored as sparse matrices, every row only depends on the
+shared coefficients and the terms of its own well, so the problem size grows
+linearly with the number of points and wells.
+"""
+from __future__ import (absolute_import, division, print_function,
+                        unicode_literals)
+
+__author__ = "yuhao"
+
+from collections import OrderedDict
+
+import numpy as np
+from scipy import sparse
+from scipy.optimize import least_squares
+
+from pygeopressure.pressure.bowers import virgin_curve, unloading_curve
+
+
+def joint_bowers_virgin(points, per_well=False, a=100., b=0.8, reg=0.,
+                        loss='linear', f_scale=1., weights=None):
+    """
+    Fit Bowers loading curve to pressure points of many wells
+
+    .. math:: V = 1524 + A{\\sigma}^{B} + \\Delta V_{w}
+
+    Parameters
+    ----------
+    points : dict
+        well name -> pressure points with fields 'es' and 'velocity', as
+        returned by `Well.pressure_points`
+    per_well : bool
+        fit a velocity offset for every well in addition to shared A and B
+    a, b : float
+        initial values of A and B
+    reg : float
+        weight of the penalty pulling per-well offsets towards zero
+    loss : str
+        loss function of `scipy.optimize.least_squares`, e.g. 'linear',
+        'soft_l1', 'huber'
+    f_scale : float
+        soft margin between inlier and outlier residuals (m/s)
+    weights : dict, optional
+        well name -> weight of residuals of that well
+
+    Returns
+    -------
+    a, b : float
+        loading curve coefficients
+    offsets : OrderedDict
+        well name -> velocity offset, zeros if not per_well
+    result : OptimizeResult
+        result of `scipy.optimize.least_squares`
+    """
+    names, well_idx, es, vel, row_weight = _stack(
+        points, ('es', 'velocity'), weights)
+    n_wells = len(names) if per_well else 0
+
+    def residual(x):
+        res = virgin_curve(es, x[0], x[1]) - vel
+        if per_well:
+            res = res + x[2:][well_idx]
+        return _append_penalty(row_weight * res, x[2:], reg)
+
+    def jacobian(x):
+        es_b = es**x[1]
+        shared = np.column_stack([es_b, x[0] * es_b * np.log(es)])
+        return _sparse_jacobian(shared, well_idx, n_wells, row_weight, reg)
+
+    x0 = np.concatenate([[a, b], np.zeros(n_wells)])
+    result = _solve(residual, jacobian, x0, loss, f_scale)
+    offsets = OrderedDict(zip(names, result.x[2:] if per_well \
+                              else np.zeros(len(names))))
+    return result.x[0], result.x[1], offsets, result
+
+
+def joint_bowers_unloading(points, a, b, vmax, per_well=True, u=2.,
+                           loss='linear', f_scale=1., weights=None):
+    """
+    Fit Bowers unloading parameter U to pressure points of many wells,
+    with the loading curve given
+
+    Parameters
+    ----------
+    points : dict
+        well name -> pressure points with fields 'es' and 'velocity'
+    a, b : float
+        loading curve coefficients
+    vmax : float
+        velocity at which unloading starts
+    per_well : bool
+        fit one U per well, otherwise a single U shared by all wells
+    u : float
+        initial value of U
+    loss, f_scale, weights :
+        see `joint_bowers_virgin`
+
+    Returns
+    -------
+    u : float or OrderedDict
+        shared U, or well name -> U if per_well
+    result : OptimizeResult
+    """
+    names, well_idx, es, vel, row_weight = _stack(
+        points, ('es', 'velocity'), weights)
+    sigma_max = ((vmax - 1524) / a)**(1 / b)
+    log_ratio = np.log(es / sigma_max)
+    n_wells = len(names) if per_well else 1
+    u_idx = well_idx if per_well else np.zeros(well_idx.shape, dtype=int)
+
+    def residual(x):
+        return row_weight * (
+            unloading_curve(es, a, b, x[u_idx], vmax) - vel)
+
+    def jacobian(x):
+        u_row = x[u_idx]
+        independent = sigma_max * np.exp(log_ratio / u_row)
+        d_u = -a * b * independent**b * log_ratio / u_row**2
+        return _sparse_jacobian(
+            np.empty((es.size, 0)), u_idx, n_wells, row_weight, 0,
+            d_well=d_u)
+
+    x0 = np.full(n_wells, u, dtype=np.float64)
+    result = _solve(residual, jacobian, x0, loss, f_scale)
+    if per_well:
+        return OrderedDict(zip(names, result.x)), result
+    return result.x[0], result
+
+
+def joint_eaton(points, per_well=False, n=3., reg=0., loss='linear',
+                f_scale=1., weights=None):
+    """
+    Fit Eaton exponent to pressure points of many wells
+
+    .. math:: \\frac{\\sigma}{{\\sigma}_{n}}=
+        \\left(\\frac{V}{V_{n}}\\right)^{n + \\Delta n_{w}}
+
+    Parameters
+    ----------
+    points : dict
+        well name -> pressure points with fields 'es', 'es_normal',
+        'velocity' and 'normal_velocity', as returned by
+        `Well.pressure_points`
+    per_well : bool
+        fit an exponent offset for every well in addition to shared n.
+        Shifting n and all offsets the other way leaves residuals unchanged,
+        so offsets are constrained to sum to zero and n is the mean exponent
+        of the wells
+    n : float
+        initial value of n
+    reg, loss, f_scale, weights :
+        see `joint_bowers_virgin`
+
+    Returns
+    -------
+    n : float
+        shared Eaton exponent
+    offsets : OrderedDict
+        well name -> exponent offset, zeros if not per_well
+    result : OptimizeResult
+    """
+    names, well_idx, es, es_normal, vel, vel_normal, row_weight = _stack(
+        points, ('es', 'es_normal', 'velocity', 'normal_velocity'), weights)
+    es_ratio = es / es_normal
+    log_vel_ratio = np.log(vel / vel_normal)
+    n_wells = len(names) if per_well else 0
+
+    def exponent(x):
+        return x[0] + x[1:][well_idx] if per_well else x[0]
+
+    def residual(x):
+        res = np.exp(exponent(x) * log_vel_ratio) - es_ratio
+        res = _append_penalty(row_weight * res, x[1:], reg)
+        if per_well:
+            # zero sum of offsets removes the null direction of n and offsets
+            res = np.append(res, x[1:].sum())
+        return res
+
+    def jacobian(x):
+        d_n = np.exp(exponent(x) * log_vel_ratio) * log_vel_ratio
+        jac = _sparse_jacobian(
+            d_n[:, np.newaxis], well_idx, n_wells, row_weight, reg,
+            d_well=d_n)
+        if per_well:
+            jac = sparse.vstack(
+                [jac, np.concatenate([[0.], np.ones(n_wells)])], format='csr')
+        return jac
+
+    x0 = np.concatenate([[n], np.zeros(n_wells)])
+    result = _solve(residual, jacobian, x0, loss, f_scale)
+    offsets = OrderedDict(zip(names, result.x[1:] if per_well \
+                              else np.zeros(len(names))))
+    return result.x[0], offsets, result
+
+
+def _stack(points, fields, weights):
+    """
+    concatenate fields of all wells, dropping points with non-finite or
+    non-positive values
+
+    Returns
+    -------
+    names : list of str
+        wells with at least one valid point
+    well_idx : ndarray of int
+        index in names of the well of each point
+    *columns : ndarray
+        stacked values of each field
+    row_weight : ndarray
+        weight of each point
+    """
+    names, well_idx, columns, row_weight = [], [], [], []
+    for name, well_points in points.items():
+        values = np.column_stack(
+            [np.asarray(well_points[field], dtype=np.float64) \
+             for field in fields])
+        with np.errstate(invalid='ignore'):
+            valid = np.all(np.isfinite(values) & (values > 0), axis=1)
+        if not valid.any():
+            continue
+        well_idx.append(np.full(valid.sum(), len(names), dtype=int))
+        names.append(name)
+        columns.append(values[valid])
+        weight = 1. if weights is None else weights.get(name, 1.)
+        row_weight.append(np.full(valid.sum(), np.sqrt(weight)))
+    if not names:
+        raise ValueError("No valid pressure points")
+    columns = np.concatenate(columns)
+    return [names, np.concatenate(well_idx)] + \
+        [columns[:, i] for i in range(len(fields))] + \
+        [np.concatenate(row_weight)]
+
+
+def _append_penalty(res, well_params, reg):
+    if reg > 0 and well_params.size > 0:
+        return np.concatenate([res, np.sqrt(reg) * well_params])
+    return res
+
+
+def _sparse_jacobian(shared, well_idx, n_wells, row_weight, reg, d_well=None):
+    """
+    Jacobian with dense columns of shared parameters followed by one column
+    per well, where row i has a single entry in column of well_idx[i]
+
+    Parameters
+    ----------
+    shared : ndarray
+        derivatives on shared parameters, shape (n_points, n_shared)
+    d_well : ndarray, optional
+        derivatives on the per-well parameter of each row, ones by default
+    """
+    n_points, n_shared = shared.shape
+    rows = [np.repeat(np.arange(n_points), n_shared)]
+    cols = [np.tile(np.arange(n_shared), n_points)]
+    data = [(shared * row_weight[:, np.newaxis]).ravel()]
+    if n_wells > 0:
+        rows.append(np.arange(n_points))
+        cols.append(n_shared + well_idx)
+        data.append(row_weight if d_well is None else row_weight * d_well)
+    n_rows = n_points
+    if n_wells > 0 and reg > 0:
+        rows.append(n_points + np.arange(n_wells))
+        cols.append(n_shared + np.arange(n_wells))
+        data.append(np.full(n_wells, np.sqrt(reg)))
+        n_rows += n_wells
+    return sparse.csr_matrix(
+        (np.concatenate(data), (np.concatenate(rows), np.concatenate(cols))),
+        shape=(n_rows, n_shared + n_wells))
+
+
+def _solve(residual, jacobian, x0, loss, f_scale):
+    return least_squares(
+        residual, x0, jac=jacobian, loss=loss, f_scale=f_scale,
+        x_scale='jac', tr_solver='lsmr')
@@ -28,9 +28,17 @@ class LasData(object):
     Class for reading LAS and pseudo-LAS file data
 
     null_values could be set to more values in order to deal with messy files
+
+    Parameters
+    ----------
+    las_file : str
+    usecols : list of str, optional
+        names of logs to read (e.g. ['Velocity']), depth is always read,
+        all logs are read if not given
     """
-    def __init__(self, las_file):
+    def __init__(self, las_file, usecols=None):
         self.las_file = las_file
+        self.usecols = usecols
         self.null_values = [-999.25, 1.0e30]
         self._file_type = None
         self._data_frame = None
@@ -61,9 +69,12 @@ class LasData(object):
         return self._data_frame
 
     def read_pseudo_las(self):
-        df = pd.read_csv(self.las_file, sep='\t')
-        for value in self.null_values:
-            df = df.replace(value, np.nan)  # replace 1e30 with np.nan
+        usecols = None
+        if self.usecols is not None:
+            usecols = lambda column: _log_name(column) in self._used_logs
+        df = pd.read_csv(
+            self.las_file, sep='\t', usecols=usecols)
+        df = df.mask(df.isin(self.null_values))  # replace 1e30 with np.nan
         df = df.round({df.columns[0]: 1})  # round depth to 1 decimal
         if 'Depth(M)' in df.columns.values.tolist():
             df.rename(columns={'Depth(M)': 'Depth(m)'}, inplace=True)
@@ -72,18 +83,25 @@ class LasData(object):
 
     def read_las(self):
         if Path(native(self.las_file)).exists():
-            las = LASReader(native(str(Path(self.las_file))), null_subs=np.nan)
+            usecols = None
+            if self.usecols is not None:
+                usecols = lambda item: item.name.upper() in ('DEPT', 'DEPTH') \
+                    or _log_name(_las_column(item)) in self._used_logs
+            las = LASReader(native(str(Path(self.las_file))), null_subs=np.nan,
+                            usecols=usecols)
             # well_name = las.well.items['WELL'].data
             df = pd.DataFrame(
                 las.data2d,
-                columns=["{}({})".format(
-                    las.curves.items[name].descr.replace(' ', '_'),
-                    las.curves.items[name].units) \
-                    for name in las.curves.names])
+                columns=[_las_column(las.curves.items[name]) \
+                         for name in las.names])
             if 'Depth(M)' in df.columns.values.tolist():
                 df.rename(columns={'Depth(M)': 'Depth(m)'}, inplace=True)
             self._data_frame = df
 
+    @property
+    def _used_logs(self):
+        return ['Depth'] + list(self.usecols)
+
     def find_logs(self):
         self._logs = []
         self._units = []
@@ -106,3 +124,13 @@ class LasData(object):
         if self._units is None:
             self.find_logs()
         return self._units
+
+
+def _log_name(column):
+    "log name of a column name, e.g. 'Velocity' of 'Velocity(Meter/Second)'"
+    return column.split('(')[0]
+
+
+def _las_column(item):
+    "column name of a LAS curve"
+    return "{}({})".format(item.descr.replace(' ', '_'), item.units)
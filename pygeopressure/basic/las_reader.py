@@ -21,6 +21,7 @@ and makes the data available as a Python object.
 
 import re
 import keyword
+import warnings
 
 import numpy as np
 
@@ -93,33 +94,62 @@ class LASItem(object):
                        descr=descr.strip())
 
 
-def _read_wrapped_row(f, n):
-    """Read a "row" of data from the Ascii section of a "wrapped" LAS file.
+def _tokenize(text):
+    """Convert a block of text of whitespace separated numbers to a 1D array.
 
-    `f` must be a file object opened for reading.
-    `n` is the number of fields in the row.
-
-    Returns the list of floats read from the file.
+    Comment lines (starting with '#') are skipped.
     """
-    depth = float(f.readline().strip())
-    values = [depth]
-    while len(values) < n:
-        new_values = [float(s) for s in f.readline().split()]
-        values.extend(new_values)
-    return values
+    if '#' in text:
+        text = '\n'.join(line for line in text.splitlines()
+                         if not line.lstrip().startswith('#'))
+    with warnings.catch_warnings():
+        warnings.simplefilter('error', DeprecationWarning)
+        try:
+            return np.fromstring(text, dtype=float, sep=' ')
+        except (DeprecationWarning, ValueError):
+            raise LASError("Non-numeric value in the '~A' section.")
+
 
+def _read_blocks(f, ncols, block_size=-1, wrap=True):
+    """Read the Ascii section in blocks of text.
 
-def _read_wrapped_data(f, dt):
-    data = []
-    ncols = len(dt.names)
+    `f` must be a file object positioned after the '~A' line.
+    `ncols` is the number of fields in a row.  `block_size` is the
+    approximate number of characters read at a time, -1 reads the rest
+    of the file at once.  `wrap` is True if rows may span several lines.
+
+    Yields 2D arrays of the complete rows in each block.  Values are
+    tokenized regardless of line breaks.  For wrapped files an incomplete
+    row at the end of the file is ignored.  For unwrapped files every line
+    must hold `ncols` values, otherwise LASError is raised.
+    """
+    remainder = np.empty(0)
     while True:
-        try:
-            row = _read_wrapped_row(f, ncols)
-        except Exception:
+        text = f.read(block_size)
+        if not text:
             break
-        data.append(tuple(row))
-    data = np.array(data, dtype=dt)
-    return data
+        if not text.endswith('\n'):
+            # complete the last line, so no number or comment is split
+            text += f.readline()
+        values = _tokenize(text)
+        if not wrap:
+            _check_rows(text, ncols)
+        if remainder.size:
+            values = np.concatenate([remainder, values])
+        nrows = values.size // ncols
+        remainder = values[nrows * ncols:]
+        if nrows:
+            yield values[:nrows * ncols].reshape(nrows, ncols)
+
+
+def _check_rows(text, ncols):
+    """Raise LASError unless every data line of `text` has `ncols` values."""
+    for line in text.splitlines():
+        nvalues = len(line.split())
+        if nvalues and nvalues != ncols and \
+                not line.lstrip().startswith('#'):
+            raise LASError("Expected %d values in the '~A' section line: %r"
+                           % (ncols, line.strip()))
 
 
 class LASSection(object):
@@ -177,13 +207,23 @@ class LASReader(object):
 
     Constructor
     -----------
-    LASReader(f, null_subs=None)
+    LASReader(f, null_subs=None, usecols=None, chunksize=None)
 
     f : file object or string
         If f is a file object, it must be opened for reading.
         If f is a string, it must be the filename of a LAS file.
         In that case, the file will be opened and read.
 
+    usecols : sequence or callable, optional
+        Curves to keep, given as mnemonics or indices in the '~C' section,
+        or a callable returning True for the LASItem of each curve to keep.
+        All curves are kept if not given.
+
+    chunksize : int, optional
+        If given, only the header is read by the constructor, and the
+        data is read by iterating over `chunks()`, `chunksize` rows at a
+        time.  `data` and `data2d` are None.
+
     Attributes for LAS Sections
     ---------------------------
     version : LASSection instance
@@ -206,6 +246,9 @@ class LASReader(object):
         of the array is constructed from the items in the '~C'
         section.
 
+    names : list
+        Mnemonics of the curves kept in `data`.
+
     Other attributes
     ----------------
     data2d : numpy 2D array of floats
@@ -258,7 +301,7 @@ class LASReader(object):
 
     """
 
-    def __init__(self, f, null_subs=None):
+    def __init__(self, f, null_subs=None, usecols=None, chunksize=None):
         """f can be a filename (str) or a file object.
 
         If 'null_subs' is not None, its value replaces any values in the data
@@ -280,14 +323,84 @@ class LASReader(object):
         self.parameters = LASSection()
         self.other = ''
         self.data = None
+        self.data2d = None
+        self.names = []
+        self.chunksize = chunksize
+        self._f = f
+        self._usecols = None
 
-        self._read_las(f)
+        self._read_las(f, usecols)
 
-        self.data2d = self.data.view(float).reshape(-1, len(self.curves.items))
-        if null_subs is not None:
-            self.data2d[self.data2d == self.null] = null_subs
+    def chunks(self):
+        """Iterate over the data of a reader created with `chunksize`.
 
-    def _read_las(self, f):
+        Yields numpy 1D structured arrays of `chunksize` rows (fewer for
+        the last one), with the same data type as `data`.
+        """
+        if self.chunksize is None:
+            raise LASError("LASReader was not created with chunksize.")
+        opened_here = isinstance(self._f, str)
+        f = open(self._f, 'r') if opened_here else self._f
+        try:
+            if opened_here:
+                line = f.readline()
+                while line and not line.startswith('~A'):
+                    line = f.readline()
+            pending = []
+            n_pending = 0
+            for block in _read_blocks(f, len(self.curves.names), 1 << 22,
+                                      self.wrap):
+                pending.append(self._select(block))
+                n_pending += block.shape[0]
+                if n_pending >= self.chunksize:
+                    rows = np.concatenate(pending)
+                    n_full = rows.shape[0] // self.chunksize * self.chunksize
+                    for start in range(0, n_full, self.chunksize):
+                        yield self._structured(
+                            rows[start:start + self.chunksize])
+                    pending = [rows[n_full:]]
+                    n_pending = rows.shape[0] - n_full
+            if n_pending:
+                yield self._structured(np.concatenate(pending))
+        finally:
+            if opened_here:
+                f.close()
+
+    def _select(self, block):
+        """Keep the columns in usecols and substitute null values."""
+        if self._usecols is not None:
+            block = block[:, self._usecols]
+        if self.null_subs is not None and self.null is not None:
+            block[block == self.null] = self.null_subs
+        return block
+
+    def _structured(self, block):
+        dt = np.dtype([(name, float) for name in self.names])
+        return np.ascontiguousarray(block).view(dt).reshape(-1)
+
+    def _set_usecols(self, usecols):
+        names = self.curves.names
+        if usecols is None:
+            self.names = list(names)
+            return
+        if callable(usecols):
+            idx = [i for i, name in enumerate(names)
+                   if usecols(self.curves.items[name])]
+        else:
+            idx = []
+            for col in usecols:
+                if isinstance(col, (int, np.integer)):
+                    if not -len(names) <= col < len(names):
+                        raise LASError("No curve with index %d" % col)
+                    idx.append(col % len(names))
+                elif col in self.curves.items:
+                    idx.append(names.index(col))
+                else:
+                    raise LASError("No curve named '%s'" % col)
+        self._usecols = idx
+        self.names = [names[i] for i in idx]
+
+    def _read_las(self, f, usecols=None):
         """Read a LAS file.
 
         Returns a dictionary with keys 'V', 'W', 'C', 'P', 'O' and 'A',
@@ -364,17 +477,20 @@ class LASReader(object):
             line = f.readline()
 
         # Finished reading the header--all that is left is the numerical
-        # data that follows the '~A' line.  We'll construct a structured
-        # data type, and, if the data is not wrapped, use numpy.loadtext
-        # to read the data into an array.  For wrapped rows, we use the
-        # function _read_wrapped() defined elsewhere in this module.
-        # The data type is determined by the items from the '~Curves' section.
-        dt = np.dtype([(name, float) for name in self.curves.names])
-        if self.wrap:
-            a = _read_wrapped_data(f, dt)
-        else:
-            a = np.loadtxt(f, dtype=dt)
-        self.data = a
+        # data that follows the '~A' line.  The values are tokenized as one
+        # block regardless of line breaks (so wrapped files need no special
+        # handling), then the columns in usecols are kept.  The data type
+        # is determined by the items from the '~Curves' section.
+        self._set_usecols(usecols)
+        if self.chunksize is None:
+            blocks = list(_read_blocks(f, len(self.curves.names),
+                                       wrap=self.wrap))
+            if blocks:
+                a = self._select(blocks[0])
+            else:
+                a = np.empty((0, len(self.names)))
+            self.data = self._structured(a)
+            self.data2d = self.data.view(float).reshape(-1, len(self.names))
 
         if opened_here:
             f.close()
@@ -26,18 +26,18 @@ def extrapolate_log_traugott(den_log, a, b, kb=0, wd=0):
     Extrapolate density log using Traugott equation
     """
     density_trend = traugott_trend(
-        np.array(den_log.depth), a, b, kb=kb, wd=wd)
+        np.asarray(den_log.depth), a, b, kb=kb, wd=wd)
 
     extra_log = Log()
     extra_log.name = den_log.name + "_ex"
     extra_log.units = den_log.units
     extra_log.descr = "Density_extra"
-    extra_log.depth = np.array(den_log.depth)
+    extra_log.depth = np.asarray(den_log.depth)
 
     new_data = np.full_like(density_trend, np.nan)
     new_data[:den_log.start_idx] = density_trend[:den_log.start_idx]
 
-    old_data = np.array(den_log.data)
+    old_data = np.asarray(den_log.data)
     new_data[den_log.start_idx:] = old_data[den_log.start_idx:]
 
     extra_log.data = new_data
@@ -77,8 +77,8 @@ def smooth_log(log, window=1500):
     smoothed log : Log object
         smoothed log
     """
-    data = np.array(log.data)
-    depth = np.array(log.depth)
+    data = np.asarray(log.data)
+    depth = np.asarray(log.depth)
     mask = np.isfinite(data)
     func = interp1d(depth[mask], data[mask])
     interp_data = func(depth[log.start_idx: log.stop_idx])
@@ -126,8 +126,8 @@ def upscale_log(log, freq=20):
     """
     downscale a well log with a lowpass butterworth filter
     """
-    depth = np.array(log.depth)
-    data = np.array(log.data)
+    depth = np.asarray(log.depth)
+    data = np.asarray(log.data)
     mask = np.isfinite(data)
     func = interp1d(depth[mask], data[mask])
     interp_data = func(depth[log.start_idx: log.stop_idx])
@@ -160,7 +160,7 @@ def truncate_log(log, top, bottom):
     -------
     trunc_log : Log object
     """
-    depth = np.array(log.depth)
+    depth = np.asarray(log.depth)
     data = np.array(log.data)
     if top != 0:
         mask = depth < top
@@ -190,7 +190,7 @@ def shale(log, vsh_log, thresh=0.35):
     """
     shale_mask = np.isfinite(vsh_log.depth)
     shale_mask[vsh_log.start_idx: vsh_log.stop_idx] = True
-    mask_thresh = np.array(vsh_log.data) < thresh
+    mask_thresh = np.asarray(vsh_log.data) < thresh
     mask = shale_mask * mask_thresh
     data = np.array(log.data)
     data[mask] = np.nan
@@ -207,7 +207,7 @@ def interpolate_log(log):
     """
     Log curve interpolation
     """
-    depth = np.array(log.depth)
+    depth = np.asarray(log.depth)
     data = np.array(log.data)
     mask = np.isfinite(data)
     func = interp1d(depth[mask], data[mask])
@@ -238,7 +238,7 @@ def local_average(log, rad=10):
     new_log : Log()
         upscaled log data
     """
-    data = np.array(log.data)
+    data = np.asarray(log.data)
     mask = np.isfinite(data)
     index = np.where(mask)
     start = index[0][0]
@@ -19,7 +19,7 @@ from sklearn import linear_model
 
 from pygeopressure.pressure.bowers import (
     virgin_curve, invert_virgin, power_bowers)
-from pygeopressure.velocity.extrapolate import normal, normal_dt
+from pygeopressure.velocity.extrapolate import normal_dt
 from pygeopressure.pressure.obp import traugott
 from pygeopressure.basic.well import Well
 from pygeopressure.basic.well_log import Log
@@ -28,7 +28,8 @@ from pygeopressure.pressure.eaton import power_eaton
 
 
 def optimize_bowers_virgin(well, vel_log, obp_log, upper, lower,
-                           pres_log='loading', mode='nc', nnc=5):
+                           pres_log='loading', mode='nc', nnc=5,
+                           return_cov=False):
     """
     Optimizer for Bowers loading curve
 
@@ -53,6 +54,8 @@ def optimize_bowers_virgin(well, vel_log, obp_log, upper, lower,
         - 'both' : both of them
     nnc : int
         number of points to pick on NCT
+    return_cov : bool
+        also return covariance of a and b
 
     Returns
     -------
@@ -60,6 +63,8 @@ def optimize_bowers_virgin(well, vel_log, obp_log, upper, lower,
         optimized bowers loading curve coefficients
     rms_err : float
         root mean square error of pressure
+    pcov : 2-d ndarray
+        covariance of a and b, only if return_cov is True
     """
     if isinstance(upper, (bytes, str)):
         depth_upper = well.params['horizon'][upper]
@@ -69,57 +74,49 @@ def optimize_bowers_virgin(well, vel_log, obp_log, upper, lower,
         depth_lower = well.params['horizon'][lower]
     else:
         depth_lower = lower
+    if mode == 'pres' or mode == 'both':
+        # before logs are resolved, so points are cached by log names
+        points = well.pressure_points(pres_log, vel_log, obp_log)
     if isinstance(vel_log, (bytes, str)):
         vel_log = well.get_log(vel_log)
     if isinstance(obp_log, (bytes, str)):
         obp_log = well.get_log(obp_log)
-    if isinstance(pres_log, (bytes, str)):
-        # pres_log = well.get_loading_pressure()
-        pres_log = well.get_pressure(pres_log)
-    depth = np.array(obp_log.depth)
+    depth = np.asarray(obp_log.depth)
 
     nct_vel_to_fit = []
     nct_es_to_fit = []
     pres_vel_to_fit = []
     pres_es_to_fit = []
     if mode == 'nct' or mode == 'both':
-        nct_es_data = np.array(obp_log.data) - np.array(well.hydrostatic)
+        nct_es_data = np.asarray(obp_log.data) - np.array(well.hydrostatic)
         nct_mask = depth < depth_lower
         nct_mask *= depth > depth_upper
         nct_mask *= depth < vel_log.stop
 
-        nct_vel_interval = np.array(vel_log.data)[nct_mask]
+        nct_vel_interval = np.asarray(vel_log.data)[nct_mask]
         nct_es_interval = nct_es_data[nct_mask]
 
         nct_vel_to_fit = np.array(pick_sparse(nct_vel_interval, nnc))
         nct_es_to_fit = np.array(pick_sparse(nct_es_interval, nnc))
     if mode == 'pres' or mode == 'both':
-        vel = list()
-        obp = list()
-        pres = list()
-        for dp in pres_log.depth:
-            idx = np.searchsorted(depth, dp)
-            vel.append(vel_log.data[idx])
-            obp.append(obp_log.data[idx])
-        vel, obp, pres = np.array(vel), np.array(obp), np.array(pres_log.data)
-        es = obp - pres
-
-        pres_vel_to_fit = vel
-        pres_es_to_fit = es
+        pres_vel_to_fit = points['velocity']
+        pres_es_to_fit = points['es']
     vel_to_fit = np.append(nct_vel_to_fit, pres_vel_to_fit)
     es_to_fit = np.append(nct_es_to_fit, pres_es_to_fit)
 
-    popt, _ = curve_fit(virgin_curve, es_to_fit, vel_to_fit)
+    popt, pcov = curve_fit(virgin_curve, es_to_fit, vel_to_fit)
     a, b = popt
 
     es_predicted = invert_virgin(vel_to_fit, a, b)
     rms_err = rmse(es_to_fit, es_predicted)
 
+    if return_cov:
+        return a, b, rms_err, pcov
     return a, b, rms_err
 
 
 def optimize_bowers_unloading(well, vel_log, obp_log, a, b,
-                              vmax, pres_log='unloading'):
+                              vmax, pres_log='unloading', return_cov=False):
     """
     Optimize for Bowers Unloading curve parameter U
 
@@ -135,41 +132,29 @@ def optimize_bowers_unloading(well, vel_log, obp_log, a, b,
     pres_log : Log or str
         Log object storing measured pressure value or Pressure name
         stored in well
+    return_cov : bool
+        also return variance of u
 
     Returns
     -------
     u : float
         unloading curve cofficient U
-    error : float
-        Relative RMS error
+    pcov : 2-d ndarray
+        variance of u with shape (1, 1), only if return_cov is True
     """
-    if isinstance(vel_log, (bytes, str)):
-        vel_log = well.get_log(vel_log)
-    if isinstance(obp_log, (bytes, str)):
-        obp_log = well.get_log(obp_log)
-    if isinstance(pres_log, (bytes, str)):
-        pres_log = well.get_pressure(pres_log)
-
-    depth = np.array(obp_log.depth)
-
-    vel = list()
-    obp = list()
-    pres = list()
-    for dp in pres_log.depth:
-        idx = np.searchsorted(depth, dp)
-        vel.append(vel_log.data[idx])
-        obp.append(obp_log.data[idx])
-    vel, obp, pres = np.array(vel), np.array(obp), np.array(pres_log.data)
-    es = obp - pres
+    points = well.pressure_points(pres_log, vel_log, obp_log)
+    vel, es = points['velocity'], points['es']
 
     sigma_max = invert_virgin(vmax, a, b)
 
     sigma_vc = invert_virgin(vel, a, b)
 
-    popt, _ = curve_fit(power_bowers, sigma_vc/sigma_max, es/sigma_max)
+    popt, pcov = curve_fit(power_bowers, sigma_vc/sigma_max, es/sigma_max)
 
     u, = popt
 
+    if return_cov:
+        return u, pcov
     return u
 
 
@@ -194,7 +179,170 @@ def optimize_bowers_trace(depth_tr, vel_tr, obp_tr, hydro_tr,
     return a, b
 
 
-def optimize_eaton(well, vel_log, obp_log, a, b, pres_log="loading"):
+def optimize_bowers_batch(depth, vel, obp, hydro, depth_upper, depth_lower,
+                          refine=True, max_iter=20, tol=1e-6):
+    """
+    Fit Bowers loading curve of many traces at once
+
+    Every trace is first fitted in closed form with the log-linearized
+    curve log(v - 1524) = log(a) + b*log(es), then the curve
+    v = 1524 + a*es**b is optionally refined with vectorized Gauss-Newton
+    iterations, starting from the previous trace's estimate where that fits
+    better. Traces without enough samples take the solution of the nearest
+    fitted trace.
+
+    Parameters
+    ----------
+    depth : 1-d ndarray
+        depth of samples, shape (n_samples,)
+    vel : ndarray
+        velocity traces, shape (..., n_samples)
+    obp : ndarray
+        overburden pressure traces, shape (..., n_samples)
+    hydro : ndarray
+        hydrostatic pressure, broadcastable to obp
+    depth_upper, depth_lower : float or ndarray
+        bounds of fitting interval, scalar or one value per trace
+    refine : bool
+        refine log-linear solution with Gauss-Newton iterations
+    max_iter : int
+        maximum number of Gauss-Newton iterations
+    tol : float
+        relative step size under which a trace is considered converged
+
+    Returns
+    -------
+    a, b : ndarray
+        loading curve coefficients of each trace with shape (...)
+    converged : ndarray of bool
+        False for traces which could not be fitted themselves (coefficients
+        taken from a neighbour) or did not converge within max_iter
+    """
+    v0 = 1524
+    vel = np.asarray(vel, dtype=np.float64)
+    shape = vel.shape[:-1]
+    n_samples = vel.shape[-1]
+    vel = vel.reshape((-1, n_samples))
+    es = np.broadcast_to(
+        np.asarray(obp, dtype=np.float64) - np.asarray(hydro, dtype=np.float64),
+        shape + (n_samples,)).reshape((-1, n_samples))
+    depth = np.asarray(depth, dtype=np.float64)
+    depth_upper = np.broadcast_to(
+        np.asarray(depth_upper, dtype=np.float64), shape).reshape((-1, 1))
+    depth_lower = np.broadcast_to(
+        np.asarray(depth_lower, dtype=np.float64), shape).reshape((-1, 1))
+
+    with np.errstate(invalid='ignore'):
+        mask = (depth > depth_upper) & (depth < depth_lower)
+        mask &= np.isfinite(vel) & np.isfinite(es) & (vel > v0) & (es > 0)
+    weight = mask.astype(np.float64)
+    log_es = np.zeros(es.shape)
+    log_es[mask] = np.log(es[mask])
+    log_dv = np.zeros(vel.shape)
+    log_dv[mask] = np.log(vel[mask] - v0)
+
+    # log-linear least squares
+    n = weight.sum(axis=-1)
+    s_x = log_es.sum(axis=-1)
+    s_xx = (log_es**2).sum(axis=-1)
+    s_y = log_dv.sum(axis=-1)
+    s_xy = (log_es * log_dv).sum(axis=-1)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        det = n * s_xx - s_x**2
+        b = (n * s_xy - s_x * s_y) / det
+        log_a = (s_y - b * s_x) / n
+    fitted = (n >= 2) & (det > 0) & np.isfinite(b) & np.isfinite(log_a)
+
+    converged = fitted.copy()
+    if refine:
+        log_a, b, converged = _refine_bowers_batch(
+            vel - v0, log_es, weight, log_a, b, fitted, max_iter, tol)
+
+    # traces without solution take the one of nearest fitted trace
+    fitted_idx = np.flatnonzero(fitted)
+    missing_idx = np.flatnonzero(~fitted)
+    if fitted_idx.size > 0 and missing_idx.size > 0:
+        pos = np.clip(
+            np.searchsorted(fitted_idx, missing_idx), 1, fitted_idx.size) - 1
+        left = fitted_idx[pos]
+        right = fitted_idx[np.minimum(pos + 1, fitted_idx.size - 1)]
+        nearest = np.where(
+            np.abs(right - missing_idx) < np.abs(left - missing_idx),
+            right, left)
+        log_a[missing_idx] = log_a[nearest]
+        b[missing_idx] = b[nearest]
+    elif fitted_idx.size == 0:
+        log_a[:] = np.nan
+        b[:] = np.nan
+
+    return np.exp(log_a).reshape(shape), b.reshape(shape), \
+        converged.reshape(shape)
+
+
+def _refine_bowers_batch(dv, log_es, weight, log_a, b, active, max_iter, tol):
+    """
+    Gauss-Newton iterations of dv = exp(log_a + b*log_es) on active traces
+    """
+    log_a, b = log_a.copy(), b.copy()
+    dv = np.where(weight > 0, dv, 0)
+
+    def sse(log_a, b):
+        g = np.exp(log_a[:, np.newaxis] + b[:, np.newaxis] * log_es)
+        return (weight * (dv - g)**2).sum(axis=-1), g
+
+    converged = np.zeros(active.shape, dtype=bool)
+    active = active.copy()
+    err, g = sse(log_a, b)
+    # warm start from the previous trace where its solution fits better
+    if log_a.size > 1:
+        prev_log_a = np.append(log_a[:1], log_a[:-1])
+        prev_b = np.append(b[:1], b[:-1])
+        prev_err, prev_g = sse(prev_log_a, prev_b)
+        better = active & (prev_err < err)
+        log_a = np.where(better, prev_log_a, log_a)
+        b = np.where(better, prev_b, b)
+        err = np.where(better, prev_err, err)
+        g = np.where(better[:, np.newaxis], prev_g, g)
+    for _ in range(max_iter):
+        if not active.any():
+            break
+        res = weight * (dv - g)
+        g2 = weight * g**2
+        j11 = g2.sum(axis=-1)
+        j12 = (g2 * log_es).sum(axis=-1)
+        j22 = (g2 * log_es**2).sum(axis=-1)
+        r1 = (res * g).sum(axis=-1)
+        r2 = (res * g * log_es).sum(axis=-1)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            det = j11 * j22 - j12**2
+            d_log_a = (j22 * r1 - j12 * r2) / det
+            d_b = (j11 * r2 - j12 * r1) / det
+        active &= np.isfinite(d_log_a) & np.isfinite(d_b)
+        d_log_a = np.where(active, d_log_a, 0)
+        d_b = np.where(active, d_b, 0)
+        # step halving where sum of squares increases
+        step = np.ones(log_a.shape)
+        for _ in range(10):
+            new_err, new_g = sse(log_a + step * d_log_a, b + step * d_b)
+            worse = active & ~(new_err <= err)
+            if not worse.any():
+                break
+            step[worse] *= 0.5
+        accept = active & (new_err <= err)
+        log_a = np.where(accept, log_a + step * d_log_a, log_a)
+        b = np.where(accept, b + step * d_b, b)
+        err = np.where(accept, new_err, err)
+        g = np.where(accept[:, np.newaxis], new_g, g)
+        done = active & (
+            (np.abs(step * d_log_a) <= tol * (1 + np.abs(log_a))) & \
+            (np.abs(step * d_b) <= tol * (1 + np.abs(b))) | ~accept)
+        converged |= done
+        active &= ~done
+    return log_a, b, converged
+
+
+def optimize_eaton(well, vel_log, obp_log, a, b, pres_log="loading",
+                   return_cov=False):
     """
     Optimizer for Eaton model
 
@@ -210,52 +358,29 @@ def optimize_eaton(well, vel_log, obp_log, a, b, pres_log="loading"):
     pres_log : Log or str
         Log object storing measured pressure value or Pressure name
         stored in well
+    return_cov : bool
+        also return variance of n
 
     Returns
     -------
     n : float
         optimized eaton exponential
+    pcov : 2-d ndarray
+        variance of n with shape (1, 1), only if return_cov is True
     min_eer : float
         minimum error abtained by optimized n
     rms_err : array
         array of rms error of different n around minmum
     """
-    if isinstance(vel_log, (bytes, str)):
-        vel_log = well.get_log(vel_log)
-    if isinstance(obp_log, (bytes, str)):
-        obp_log = well.get_log(obp_log)
-    if isinstance(pres_log, (bytes, str)):
-        # pres_log = well.get_loading_pressure()
-        pres_log = well.get_pressure(pres_log)
-
-    depth = np.array(obp_log.depth)
-
-    hydrostatic = np.array(well.hydrostatic)
-    es_normal = np.array(obp_log.data) - hydrostatic
-    v_normal = normal(depth, a, b)
-
-    vel = list()
-    vel_norm = list()
-    es_norm = list()
-    obp = list()
-    pres = list()
-    for dp in pres_log.depth:
-        idx = np.searchsorted(depth, dp)
-        vel.append(vel_log.data[idx])
-        vel_norm.append(v_normal[idx])
-        es_norm.append(es_normal[idx])
-        obp.append(obp_log.data[idx])
-    vel, vel_norm = np.array(vel), np.array(vel_norm)
-    vel_ratio = vel / vel_norm
-
-    obp, pres = np.array(obp), np.array(pres_log.data)
-    es = obp - pres
-    es_norm = np.array(es_norm)
-    es_ratio = es / es_norm
-
-    popt, _ = curve_fit(power_eaton, vel_ratio, es_ratio)
+    points = well.pressure_points(pres_log, vel_log, obp_log, a, b)
+    vel_ratio = points['velocity'] / points['normal_velocity']
+    es_ratio = points['es'] / points['es_normal']
+
+    popt, pcov = curve_fit(power_eaton, vel_ratio, es_ratio)
     n, = popt
 
+    if return_cov:
+        return n, pcov
     return n
 
 
@@ -270,10 +395,10 @@ def optimize_multivaraite(well, obp_log, vel_log, por_log, vsh_log, B,
     if isinstance(obp_log, (bytes, str)):
         obp_log = well.get_log(obp_log)
     # --------------------------------------------
-    obp_data = np.array(obp_log.data)
-    por_data = np.array(por_log.data)
-    vp_data = np.array(vel_log.data)
-    vsh_data = np.array(vsh_log.data)
+    obp_data = np.asarray(obp_log.data)
+    por_data = np.asarray(por_log.data)
+    vp_data = np.asarray(vel_log.data)
+    vsh_data = np.asarray(vsh_log.data)
 
     depth = well.depth
     hydrostatic = well.hydrostatic
@@ -327,10 +452,10 @@ def optimize_eberhart_phillips(well, obp_log, vel_log, por_log, vsh_log, B,
     if isinstance(obp_log, (bytes, str)):
         obp_log = well.get_log(obp_log)
     # --------------------------------------------
-    obp_data = np.array(obp_log.data)
-    por_data = np.array(por_log.data)
-    vp_data = np.array(vel_log.data)
-    vsh_data = np.array(vsh_log.data)
+    obp_data = np.asarray(obp_log.data)
+    por_data = np.asarray(por_log.data)
+    vp_data = np.asarray(vel_log.data)
+    vsh_data = np.asarray(vsh_log.data)
 
     depth = well.depth
     hydrostatic = well.hydrostatic
@@ -375,7 +500,7 @@ def optimize_eberhart_phillips(well, obp_log, vel_log, por_log, vsh_log, B,
     return a0, a1, a2, a3
 
 
-def optimize_nct(vel_log, fit_start, fit_stop):
+def optimize_nct(vel_log, fit_start, fit_stop, return_cov=False):
     """
     Fit velocity NCT
 
@@ -385,11 +510,15 @@ def optimize_nct(vel_log, fit_start, fit_stop):
         Velocity log
     fit_start, fit_stop : float
         start and end depth for fitting
+    return_cov : bool
+        also return covariance of a and b
 
     Returns
     -------
     a, b : float
         NCT coefficients
+    pcov : 2-d ndarray
+        covariance of a and b, only if return_cov is True
     """
     fit_start = fit_start
     fit_stop = fit_stop
@@ -399,14 +528,13 @@ def optimize_nct(vel_log, fit_start, fit_stop):
     if fit_stop is None or fit_stop > vel_log.bottom:
         fit_stop = vel_log.bottom
 
-    a, b = optimize_nct_trace(
-        np.array(vel_log.depth), np.array(vel_log.data), fit_start, fit_stop,
-        pick=False)
-
-    return a, b
+    return optimize_nct_trace(
+        np.asarray(vel_log.depth), np.asarray(vel_log.data), fit_start, fit_stop,
+        pick=False, return_cov=return_cov)
 
 
-def optimize_nct_trace(depth, vel, fit_start, fit_stop, pick=True):
+def optimize_nct_trace(depth, vel, fit_start, fit_stop, pick=True,
+                       return_cov=False):
 
     mask = depth > fit_start
     mask *= depth < fit_stop
@@ -425,9 +553,66 @@ def optimize_nct_trace(depth, vel, fit_start, fit_stop, pick=True):
     dt = vel_to_fit**(-1)
     log_dt = np.log(dt)
 
-    popt, _ = curve_fit(normal_dt, depth_to_fit, log_dt)
+    popt, pcov = curve_fit(normal_dt, depth_to_fit, log_dt)
     a, b = popt
 
+    if return_cov:
+        return a, b, pcov
+    return a, b
+
+
+def optimize_nct_batch(depth, vel, fit_start, fit_stop):
+    """
+    Fit velocity NCT of many traces at once
+
+    The NCT is linear in log space (log(1/v) = a - b*z), so every trace is
+    fitted in closed form with least squares over all finite samples
+    within its fitting window.
+
+    Parameters
+    ----------
+    depth : 1-d ndarray
+        depth of samples, shape (n_samples,)
+    vel : ndarray
+        velocity traces, shape (..., n_samples)
+    fit_start, fit_stop : float or ndarray
+        start and end depth for fitting, scalar or one value per trace
+        with shape (...)
+
+    Returns
+    -------
+    a, b : ndarray
+        NCT coefficients of each trace with shape (...), nan where less than
+        two samples are available for fitting
+    """
+    depth = np.asarray(depth, dtype=np.float64)
+    vel = np.asarray(vel, dtype=np.float64)
+    fit_start = np.asarray(fit_start, dtype=np.float64)[..., np.newaxis]
+    fit_stop = np.asarray(fit_stop, dtype=np.float64)[..., np.newaxis]
+
+    mask = (depth > fit_start) & (depth < fit_stop) & np.isfinite(vel)
+    mask &= vel > 0
+
+    log_dt = np.zeros(vel.shape)
+    log_dt[mask] = -np.log(vel[mask])
+    weight = mask.astype(np.float64)
+    z = depth * weight
+
+    # normal equations of log_dt = a + slope * z
+    n = weight.sum(axis=-1)
+    s_z = z.sum(axis=-1)
+    s_zz = (z * depth).sum(axis=-1)
+    s_y = log_dt.sum(axis=-1)
+    s_zy = (z * log_dt).sum(axis=-1)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        det = n * s_zz - s_z**2
+        slope = (n * s_zy - s_z * s_y) / det
+        a = (s_y - slope * s_z) / n
+    invalid = (n < 2) | (det == 0)
+    a = np.where(invalid, np.nan, a)
+    b = np.where(invalid, np.nan, -slope)
+
     return a, b
 
 
@@ -25,8 +25,8 @@ from pygeopressure.pressure.eaton import eaton, sigma_eaton, power_eaton
 from pygeopressure.pressure.bowers import (
     virgin_curve, invert_virgin, unloading_curve)
 from pygeopressure.pressure.multivariate import multivariate_virgin
-from pygeopressure.velocity.extrapolate import normal
 from pygeopressure.basic.well_log import Log
+from pygeopressure.basic.well import sample_pressure_points
 from pygeopressure.basic.utils import rmse, pick_sparse
 
 
@@ -60,19 +60,9 @@ class LoadingPlot(object):
         self.vels = []
         self.ess = []
         for obp_log, vel_log, pres_log in zip(self.obp_logs, self.vel_logs, self.pres_logs):
-            vel = list()
-            obp = list()
-            pres = list()
-            depth = np.array(vel_log.depth)
-            for dp in pres_log.depth:
-                idx = np.searchsorted(depth, dp)
-                vel.append(vel_log.data[idx])
-                obp.append(obp_log.data[idx])
-
-            vel, obp, pres = np.array(vel), np.array(obp), np.array(pres_log.data)
-            es = obp - pres
-            self.vels.append(vel)
-            self.ess.append(es)
+            points = sample_pressure_points(pres_log, vel_log, obp_log)
+            self.vels.append(points['velocity'])
+            self.ess.append(points['es'])
 
     def plot(self):
         # self._init_axis()
@@ -106,17 +96,8 @@ class LoadingPlot(object):
 
     def check_error(self, obp_log, vel_log, pres_log):
         # for obp_log, vel_log, pres_log in zip(self.obp_logs, self.vel_logs, self.pres_logs):
-        vel = list()
-        obp = list()
-        pres = list()
-        depth = np.array(vel_log.depth)
-        for dp in pres_log.depth:
-            idx = np.searchsorted(depth, dp)
-            vel.append(vel_log.data[idx])
-            obp.append(obp_log.data[idx])
-
-        vel, obp, pres = np.array(vel), np.array(obp), np.array(pres_log.data)
-        es = obp - pres
+        points = sample_pressure_points(pres_log, vel_log, obp_log)
+        vel, es = points['velocity'], points['es']
 
         new_es = np.arange(0, 81)
         new_vel = virgin_curve(new_es, self.a, self.b)
@@ -137,27 +118,27 @@ def plot_bowers_vrigin(ax, a, b, well, vel_log, obp_log, upper, lower,
         depth_lower = well.params['horizon'][lower]
     else:
         depth_lower = lower
+    if mode == 'pres' or mode == 'both':
+        # before logs are resolved, so points are cached by log names
+        points = well.pressure_points(pres_log, vel_log, obp_log)
     if isinstance(vel_log, (bytes, str)):
         vel_log = well.get_log(vel_log)
     if isinstance(obp_log, (bytes, str)):
         obp_log = well.get_log(obp_log)
-    if isinstance(pres_log, (bytes, str)):
-        # pres_log = well.get_loading_pressure()
-        pres_log = well.get_pressure(pres_log)
 
-    depth = np.array(obp_log.depth)
+    depth = np.asarray(obp_log.depth)
 
     nct_vel_to_fit = []
     nct_es_to_fit = []
     pres_vel_to_fit = []
     pres_es_to_fit = []
     if mode == 'nct' or mode == 'both':
-        nct_es_data = np.array(obp_log.data) - np.array(well.hydrostatic)
+        nct_es_data = np.asarray(obp_log.data) - np.array(well.hydrostatic)
         nct_mask = depth < depth_lower
         nct_mask *= depth > depth_upper
         nct_mask *= depth < vel_log.stop
 
-        nct_vel_interval = np.array(vel_log.data)[nct_mask]
+        nct_vel_interval = np.asarray(vel_log.data)[nct_mask]
         nct_es_interval = nct_es_data[nct_mask]
 
         nct_vel_to_fit = np.array(pick_sparse(nct_vel_interval, nnc))
@@ -166,18 +147,8 @@ def plot_bowers_vrigin(ax, a, b, well, vel_log, obp_log, upper, lower,
             nct_es_to_fit, nct_vel_to_fit, color='blue', marker='d',
             label='NCP')
     if mode == 'pres' or mode == 'both':
-        vel = list()
-        obp = list()
-        pres = list()
-        for dp in pres_log.depth:
-            idx = np.searchsorted(depth, dp)
-            vel.append(vel_log.data[idx])
-            obp.append(obp_log.data[idx])
-        vel, obp, pres = np.array(vel), np.array(obp), np.array(pres_log.data)
-        es = obp - pres
-
-        pres_vel_to_fit = vel
-        pres_es_to_fit = es
+        pres_vel_to_fit = points['velocity']
+        pres_es_to_fit = points['es']
         ax.scatter(
             pres_es_to_fit, pres_vel_to_fit, color='purple', marker='s',
             label='measured')
@@ -200,24 +171,8 @@ def plot_bowers_unloading(ax, a, b, u, vmax, well, vel_log, obp_log,
     """
     plot bowers unloading plot
     """
-    if isinstance(vel_log, (bytes, str)):
-        vel_log = well.get_log(vel_log)
-    if isinstance(obp_log, (bytes, str)):
-        obp_log = well.get_log(obp_log)
-    if isinstance(pres_log, (bytes, str)):
-        pres_log = well.get_pressure(pres_log)
-
-    depth = np.array(obp_log.depth)
-
-    vel = list()
-    obp = list()
-    pres = list()
-    for dp in pres_log.depth:
-        idx = np.searchsorted(depth, dp)
-        vel.append(vel_log.data[idx])
-        obp.append(obp_log.data[idx])
-    vel, obp, pres = np.array(vel), np.array(obp), np.array(pres_log.data)
-    es = obp - pres
+    points = well.pressure_points(pres_log, vel_log, obp_log)
+    vel, es = points['velocity'], points['es']
 
     ax.scatter(es, vel, marker="^", color='r', label='meassured')
 
@@ -233,37 +188,10 @@ def plot_bowers_unloading(ax, a, b, u, vmax, well, vel_log, obp_log,
 
 
 def plot_eaton_error(ax, well, vel_log, obp_log, a, b, pres_log="loading"):
-    if isinstance(vel_log, (bytes, str)):
-        vel_log = well.get_log(vel_log)
-    if isinstance(obp_log, (bytes, str)):
-        obp_log = well.get_log(obp_log)
-    if isinstance(pres_log, (bytes, str)):
-        # pres_log = well.get_loading_pressure()
-        pres_log = well.get_pressure(pres_log)
-
-    depth = np.array(obp_log.depth)
-
-    hydrostatic = np.array(well.hydrostatic)
-    es_normal = np.array(obp_log.data) - hydrostatic
-    v_normal = normal(depth, a, b)
-
-    vel = list()
-    vel_norm = list()
-    es_norm = list()
-    obp = list()
-    pres = list()
-    for dp in pres_log.depth:
-        idx = np.searchsorted(depth, dp)
-        vel.append(vel_log.data[idx])
-        vel_norm.append(v_normal[idx])
-        es_norm.append(es_normal[idx])
-        obp.append(obp_log.data[idx])
-    vel, vel_norm = np.array(vel), np.array(vel_norm)
-    vel_ratio = vel / vel_norm
-
-    obp, pres = np.array(obp), np.array(pres_log.data)
-    es = obp - pres
-    es_norm = np.array(es_norm)
+    points = well.pressure_points(pres_log, vel_log, obp_log, a, b)
+    vel_ratio = points['velocity'] / points['normal_velocity']
+    es = points['es']
+    es_norm = points['es_normal']
     es_ratio = es / es_norm
 
     popt, _ = curve_fit(power_eaton, vel_ratio, es_ratio)
@@ -289,7 +217,7 @@ def plot_eaton_error(ax, well, vel_log, obp_log, a, b, pres_log="loading"):
 def plot_multivariate(axes, well, vel_log, por_log, vsh_log, obp_log,
                       upper, lower, a0, a1, a2, a3, B):
 
-    axes[0].plot(np.array(vel_log.data)/1000, vel_log.depth, linewidth=0.5,
+    axes[0].plot(np.asarray(vel_log.data)/1000, vel_log.depth, linewidth=0.5,
                  color='gray')
 
     axes[0].set(xlabel='Vp (km/s)', ylabel='Depth (m)', ylim=[lower, upper])
@@ -310,5 +238,5 @@ def plot_multivariate(axes, well, vel_log, por_log, vsh_log, obp_log,
     axes[3].set(xlabel='${\sigma}^{B}$')
 
     vel_predict = multivariate_virgin(
-        es, np.array(por_log.data), np.array(vsh_log.data), a0, a1, a2, a3, B)
+        es, np.asarray(por_log.data), np.asarray(vsh_log.data), a0, a1, a2, a3, B)
     axes[0].plot(vel_predict/1000, vel_log.depth)
@@ -0,0 +1,453 @@
+# -*- coding: utf-8 -*-
+"""
+class for seismic cube stored as compressed bricks in a directory
+
+Created on Oct. 18th 2026
+"""
+from __future__ import (absolute_import, division, print_function,
+                        unicode_literals)
+
+__author__ = "yuhao"
+
+from builtins import range, open
+import os
+import json
+import zlib
+from collections import OrderedDict
+from contextlib import contextmanager
+from future.utils import native
+
+import numpy as np
+from tqdm.auto import tqdm
+
+from .seisegy import SeiSEGY
+from .indexes import InlineIndex, CrlineIndex, DepthIndex
+from .survey_setting import SurveySetting
+from .threepoints import ThreePoints
+
+from . import Path
+
+
+class SeiCube(SeiSEGY):
+    """
+    Seismic cube stored as independently compressed 3-d bricks.
+
+    Data is cut into bricks of `brick_shape` samples along inline, crossline
+    and depth, each brick compressed with zlib and saved in its own file, so
+    inline, crossline and depth sections all read a similar amount of data.
+    Bricks are written atomically and independently, so processes writing to
+    different bricks do not interfere.
+
+    The cube directory holds a `cube.json` file with the same information
+    as the `.seis` file written by `create_seis_info`, plus brick layout.
+
+    Within a `session`, updated bricks are kept in memory and each is
+    written once, when the session ends or when more than `max_dirty` bricks
+    are pending, instead of being rewritten for every updated section.
+
+    Parameters
+    ----------
+    cube_dir : str
+        path to cube directory
+    cache_size : int
+        number of bricks cached for reading
+    max_dirty : int
+        maximum number of updated bricks kept in memory within a session
+    """
+    META_FILE = "cube.json"
+
+    def __init__(self, cube_dir, cache_size=64, max_dirty=256):
+        self._init_state(native(str(cube_dir)))
+        self.cube_dir = Path(self.segy_file)
+        self.cache_size = cache_size
+        self.max_dirty = max_dirty
+        self._brick_cache = OrderedDict()
+        self._dirty = OrderedDict()
+
+        if (self.cube_dir / self.META_FILE).exists():
+            self._parse_meta()
+        else:
+            raise Exception("File does not exist!")
+
+    @classmethod
+    def from_json(cls, json_file, segy_file=None):
+        """
+        Initialize SeiCube from an json file containing information
+
+        Parameters
+        ----------
+        json_file : str
+            json file path
+        segy_file : str
+            cube directory for overriding information in json file.
+        """
+        with open(json_file, 'r') as fl:
+            json_object = json.load(fl)
+        cube_dir = json_object["path"] if segy_file is None else segy_file
+        return cls(native(cube_dir))
+
+    @classmethod
+    def create(cls, cube_dir, like, brick_shape=(64, 64, 64), z_range=None):
+        """
+        Create an empty cube with the same geometry as `like`, an existing
+        cube at cube_dir is opened instead if its geometry and brick shape
+        match
+
+        Parameters
+        ----------
+        cube_dir : str
+            path of cube directory to create
+        like : SeiSEGY or SeiCube
+        brick_shape : tuple of int
+            number of inlines, crosslines and depth samples in one brick
+        z_range : tuple of float, optional
+            start, end and step of z axis, the one of `like` by default
+
+        Returns
+        -------
+        SeiCube
+
+        Raises
+        ------
+        ValueError
+            if an existing cube at cube_dir has different geometry or brick
+            shape
+        """
+        cube_dir = Path(native(str(cube_dir)))
+        if z_range is None:
+            z_range = (like.startDepth, like.endDepth, like.stepDepth)
+        if (cube_dir / cls.META_FILE).exists():
+            # reuse existing cube, as SeiSEGY reuses existing segy files
+            cube = cls(str(cube_dir))
+            expected = [
+                like.startInline, like.endInline, like.stepInline,
+                like.startCrline, like.endCrline, like.stepCrline] + \
+                [float(value) for value in z_range] + \
+                [int(n) for n in brick_shape]
+            existing = [
+                cube.startInline, cube.endInline, cube.stepInline,
+                cube.startCrline, cube.endCrline, cube.stepCrline,
+                cube.startDepth, cube.endDepth, cube.stepDepth] + \
+                list(cube.brick_shape)
+            if not np.allclose(existing, expected):
+                raise ValueError(
+                    "Existing cube {} does not match requested geometry "
+                    "and brick shape".format(cube_dir))
+            return cube
+        if not (cube_dir / "bricks").exists():
+            (cube_dir / "bricks").mkdir(parents=True)
+        setting = like.survey_setting
+        meta = OrderedDict([
+            ("path", str(cube_dir.absolute())),
+            ("inDepth", str(like.inDepth)),
+            ("Property_Type", str(like.property_type)),
+            ("inline_range", [str(like.startInline),
+                              str(like.endInline),
+                              str(like.stepInline)]),
+            ("crline_range", [str(like.startCrline),
+                              str(like.endCrline),
+                              str(like.stepCrline)]),
+            ("z_range", [str(value) for value in z_range]),
+            ("point_A", [int(setting.inline_A), int(setting.crline_A),
+                         float(setting.east_A), float(setting.north_A)]),
+            ("point_B", [int(setting.inline_B), int(setting.crline_B),
+                         float(setting.east_B), float(setting.north_B)]),
+            ("point_C", [int(setting.inline_C), int(setting.crline_C),
+                         float(setting.east_C), float(setting.north_C)]),
+            ("brick_shape", [int(n) for n in brick_shape]),
+            ("dtype", "<f4"),
+            ("compressor", "zlib")])
+        with open(str(cube_dir / cls.META_FILE), 'w') as fl:
+            json.dump(meta, fl, indent=4)
+        return cls(str(cube_dir))
+
+    @classmethod
+    def from_segy(cls, segy, cube_dir, brick_shape=(64, 64, 64)):
+        """
+        Convert a segy file into a brick cube
+
+        Parameters
+        ----------
+        segy : SeiSEGY
+        cube_dir : str
+            path of cube directory to create
+        brick_shape : tuple of int
+
+        Returns
+        -------
+        SeiCube
+        """
+        cube = cls.create(cube_dir, segy, brick_shape)
+        cube.inDepth = segy.inDepth
+        cube.property_type = segy.property_type
+        n_inl = cube.brick_shape[0]
+        inlines = list(segy.inlines())
+        with segy.session():
+            for i in tqdm(range(0, segy.nEast, n_inl), ascii=True):
+                slab = np.stack(
+                    [segy.inline(inl) for inl in inlines[i: i + n_inl]])
+                cube._write_region((i, 0, 0), slab)
+        return cube
+
+    def to_segy(self, segy_file, like):
+        """
+        Write data into a segy file
+
+        Parameters
+        ----------
+        segy_file : str
+            path of segy file to create
+        like : SeiSEGY
+            segy file with the same geometry used as template for headers
+
+        Returns
+        -------
+        SeiSEGY
+        """
+        segy = SeiSEGY(segy_file, like=like.segy_file)
+        with segy.session():
+            for inl in tqdm(self.inlines(), total=self.nEast, ascii=True):
+                segy.update(InlineIndex(inl), self.inline(inl))
+        segy.inDepth = self.inDepth
+        segy.property_type = self.property_type
+        return segy
+
+    def __str__(self):
+        return "SeiCube(inl[{},{},{}];crl[{},{},{}];z[{},{},{}])".format(
+            self.startInline, self.endInline, self.stepInline,
+            self.startCrline, self.endCrline, self.stepCrline,
+            self.startDepth, self.endDepth, self.stepDepth)
+
+    def _parse_meta(self):
+        with open(str(self.cube_dir / self.META_FILE), 'r') as fl:
+            meta = json.load(fl)
+        self.inDepth = meta["inDepth"] == "True"
+        self.property_type = None if meta["Property_Type"] == "None" \
+            else meta["Property_Type"]
+        self.startInline, self.endInline, self.stepInline = \
+            [int(float(v)) for v in meta["inline_range"]]
+        self.startCrline, self.endCrline, self.stepCrline = \
+            [int(float(v)) for v in meta["crline_range"]]
+        self.startDepth, self.endDepth, self.stepDepth = \
+            [float(v) for v in meta["z_range"]]
+        self.nEast = (self.endInline - self.startInline) // \
+            self.stepInline + 1
+        self.nNorth = (self.endCrline - self.startCrline) // \
+            self.stepCrline + 1
+        self.nDepth = int(round(
+            (self.endDepth - self.startDepth) / self.stepDepth)) + 1
+        self.brick_shape = tuple(meta["brick_shape"])
+        self.dtype = np.dtype(native(meta["dtype"]))
+        self.n_bricks = tuple(
+            -(-n // b) for n, b in zip(self.shape, self.brick_shape))
+
+        setting_dict = {
+            "inline_range": [
+                self.startInline, self.endInline, self.stepInline],
+            "crline_range": [
+                self.startCrline, self.endCrline, self.stepCrline],
+            "z_range": [
+                self.startDepth, self.endDepth, self.stepDepth, "unknown"],
+            "point_A": meta["point_A"],
+            "point_B": meta["point_B"],
+            "point_C": meta["point_C"]
+        }
+        self.survey_setting = SurveySetting(ThreePoints(setting_dict))
+
+    @property
+    def shape(self):
+        "number of inlines, crosslines and depth samples"
+        return (self.nEast, self.nNorth, self.nDepth)
+
+    @contextmanager
+    def session(self):
+        """
+        Keep updated bricks in memory within a `with` block, they are written
+        when the outermost session exits. Sessions can be nested.
+        """
+        self._session_depth += 1
+        try:
+            yield self
+        finally:
+            self._session_depth -= 1
+            if self._session_depth == 0:
+                self.flush()
+
+    def flush(self):
+        "write bricks updated in the current session"
+        while self._dirty:
+            brick_idx, brick = self._dirty.popitem(last=False)
+            self._write_brick(brick_idx, brick)
+
+    def clear_cache(self):
+        """
+        Drop data cached in memory, needed after the file has been modified
+        by other processes.
+        """
+        self._cube = None
+        self._brick_cache = OrderedDict()
+
+    def __getstate__(self):
+        state = super(SeiCube, self).__getstate__()
+        state['_brick_cache'] = OrderedDict()
+        state['_dirty'] = OrderedDict()
+        return state
+
+    # bricks ------------------------------------------------------------------
+    def _brick_path(self, brick_idx):
+        return self.cube_dir / "bricks" / "{}_{}_{}.brk".format(*brick_idx)
+
+    def _read_brick(self, brick_idx):
+        if brick_idx in self._dirty:
+            return self._dirty[brick_idx]
+        if brick_idx in self._brick_cache:
+            self._brick_cache[brick_idx] = self._brick_cache.pop(brick_idx)
+            return self._brick_cache[brick_idx]
+        brick_path = self._brick_path(brick_idx)
+        if brick_path.exists():
+            with open(str(brick_path), 'rb') as fl:
+                brick = np.frombuffer(
+                    zlib.decompress(fl.read()), dtype=self.dtype)
+            brick = brick.reshape(self.brick_shape)
+        else:
+            # bricks never written are empty
+            brick = np.full(self.brick_shape, np.nan, dtype=self.dtype)
+        brick.flags.writeable = False
+        self._cache_brick(brick_idx, brick)
+        return brick
+
+    def _write_brick(self, brick_idx, brick):
+        # copy so cached brick does not share memory with caller's data
+        brick = np.array(brick, dtype=self.dtype)
+        brick_path = self._brick_path(brick_idx)
+        temp_path = brick_path.with_name(
+            "{}.{}.tmp".format(brick_path.name, os.getpid()))
+        with open(str(temp_path), 'wb') as fl:
+            fl.write(zlib.compress(brick.tobytes(), 1))
+        _replace(str(temp_path), str(brick_path))
+        brick.flags.writeable = False
+        self._cache_brick(brick_idx, brick)
+
+    def _cache_brick(self, brick_idx, brick):
+        self._brick_cache[brick_idx] = brick
+        while len(self._brick_cache) > self.cache_size:
+            self._brick_cache.popitem(last=False)
+
+    def _read_region(self, start, stop):
+        """
+        data between sample indexes start (inclusive) and stop (exclusive)
+        """
+        out = np.empty(
+            [b - a for a, b in zip(start, stop)], dtype=self.dtype)
+        for brick_idx, brick_slc, out_slc in self._bricks_in(start, stop):
+            out[out_slc] = self._read_brick(brick_idx)[brick_slc]
+        return out
+
+    def _write_region(self, start, data):
+        stop = [a + n for a, n in zip(start, data.shape)]
+        for brick_idx, brick_slc, data_slc in self._bricks_in(start, stop):
+            block = data[data_slc]
+            if brick_idx in self._dirty:
+                brick = self._dirty[brick_idx]
+            elif block.shape == self.brick_shape:
+                brick = np.empty(self.brick_shape, dtype=self.dtype)
+            else:
+                brick = np.array(self._read_brick(brick_idx))
+            brick[brick_slc] = block
+            if self._session_depth > 0:
+                # written when the session ends
+                self._dirty[brick_idx] = brick
+                self._brick_cache.pop(brick_idx, None)
+            else:
+                self._write_brick(brick_idx, brick)
+        if len(self._dirty) > self.max_dirty:
+            self.flush()
+
+    def _bricks_in(self, start, stop):
+        """
+        Yields index of bricks overlapping the region, with slices of the
+        overlapping part in brick and in region
+        """
+        ranges = [range(a // b, -(-c // b)) for a, c, b in zip(
+            start, stop, self.brick_shape)]
+        for i in ranges[0]:
+            for j in ranges[1]:
+                for k in ranges[2]:
+                    brick_slc = []
+                    region_slc = []
+                    for idx, a, c, b in zip(
+                            (i, j, k), start, stop, self.brick_shape):
+                        lo = max(a, idx * b)
+                        hi = min(c, (idx + 1) * b)
+                        brick_slc.append(slice(lo - idx * b, hi - idx * b))
+                        region_slc.append(slice(lo - a, hi - a))
+                    yield (i, j, k), tuple(brick_slc), tuple(region_slc)
+
+    # data access -------------------------------------------------------------
+    def inline(self, inline):
+        "data of a inline section"
+        idx = self._inline_idx(inline)
+        return self._read_region(
+            (idx, 0, 0), (idx + 1, self.nNorth, self.nDepth))[0]
+
+    def crline(self, crline):
+        "data of a crossline section"
+        idx = self._crline_idx(crline)
+        return self._read_region(
+            (0, idx, 0), (self.nEast, idx + 1, self.nDepth))[:, 0]
+
+    def depth(self, depth):
+        "data of a depth slice"
+        idx = self._depth_idx(depth)
+        return self._read_region(
+            (0, 0, idx), (self.nEast, self.nNorth, idx + 1))[:, :, 0]
+
+    def cdp(self, cdp):
+        "data of a cdp"
+        inline, crline = cdp
+        i, j = self._inline_idx(inline), self._crline_idx(crline)
+        return self._read_region((i, j, 0), (i + 1, j + 1, self.nDepth))[0, 0]
+
+    def _depth_idx(self, depth):
+        idx = int((depth - self.startDepth) // self.stepDepth)
+        if not 0 <= idx < self.nDepth:
+            raise IndexError("Depth {} out of range".format(depth))
+        return idx
+
+    def update(self, index, data):
+        """
+        Update data with ndarray
+
+        Parameters
+        ----------
+        index : {InlineIndex, CrlineIndex, DepthIndex}
+        data : 2-d ndarray
+            data of the section
+        """
+        data = np.asarray(data)
+        if isinstance(index, InlineIndex):
+            shape = (self.nNorth, self.nDepth)
+            start = (self._inline_idx(index.value), 0, 0)
+            region_shape = (1, self.nNorth, self.nDepth)
+        elif isinstance(index, CrlineIndex):
+            shape = (self.nEast, self.nDepth)
+            start = (0, self._crline_idx(index.value), 0)
+            region_shape = (self.nEast, 1, self.nDepth)
+        elif isinstance(index, DepthIndex):
+            shape = (self.nEast, self.nNorth)
+            start = (0, 0, self._depth_idx(index.value))
+            region_shape = (self.nEast, self.nNorth, 1)
+        else:
+            raise TypeError("Unsupported index type")
+        if data.shape != shape:
+            raise ValueError("Expected data of shape {}".format(shape))
+        data = data.reshape(region_shape)
+        self._write_region(start, data)
+        self._cube = None
+
+
+def _replace(src, dst):
+    try:
+        os.replace(src, dst)
+    except AttributeError:  # python 2
+        os.rename(src, dst)
@@ -0,0 +1,217 @@
+# -*- coding: utf-8 -*-
+"""
+utilities creating seismic output cubes and computing them inline by inline
+"""
+from __future__ import (absolute_import, division, print_function,
+                        unicode_literals)
+
+from builtins import str, range#, open
+
+__author__ = "yuhao"
+
+import json
+from collections import OrderedDict
+from contextlib import contextmanager
+from multiprocessing import Pool
+
+import numpy as np
+import segyio
+
+from .indexes import InlineIndex
+from .seisegy import SeiSEGY
+from .seicube import SeiCube
+from . import Path
+
+
+def create_seis(name, like, z_range=None):
+    """
+    Parameters
+    ----------
+    name : str
+    like : SeiSEGY or SeiCube
+    z_range : tuple of float, optional
+        start, end and step of z axis of the created cube, e.g. for depth
+        domain outputs of time domain inputs, the one of `like` by default
+    """
+    input_path = Path(like.segy_file)
+    if isinstance(like, SeiCube):
+        # create output brick cube
+        return SeiCube.create(
+            str(input_path.parent / name), like, like.brick_shape, z_range)
+    # create output segy file
+    output_path = input_path.parent / "{}.sgy".format(name)
+    if z_range is not None and not output_path.exists():
+        _create_segy(str(output_path), str(like.segy_file), z_range)
+    return SeiSEGY(str(output_path), like=str(like.segy_file))
+
+
+def _create_segy(segy_file, like, z_range):
+    "empty segy file with trace headers of like and samples of z_range"
+    start, stop, step = z_range
+    samples = np.arange(start, stop + 0.5 * step, step)
+    # sample interval is stored in micro-seconds as a 16-bit integer
+    interval = int(round(step * 1000))
+    if not 0 < interval < 2**15:
+        raise ValueError("z step {} cannot be stored in segy".format(step))
+    with segyio.open(like, 'r') as src:
+        spec = segyio.tools.metadata(src)
+        spec.samples = samples
+        with segyio.create(segy_file, spec) as dst:
+            dst.text[0] = src.text[0]
+            dst.bin = src.bin
+            dst.bin.update(hns=len(samples), hdt=interval)
+            dst.header = src.header
+            empty = np.zeros(len(samples), dtype=np.float32)
+            for i in range(src.tracecount):
+                dst.header[i].update({
+                    segyio.TraceField.TRACE_SAMPLE_COUNT: len(samples),
+                    segyio.TraceField.TRACE_SAMPLE_INTERVAL: interval,
+                    segyio.TraceField.DelayRecordingTime: int(start)})
+                dst.trace[i] = empty
+
+
+def create_seis_info(segy_object, name):
+    """
+    Parameters
+    ----------
+    segy_object : SeiSEGY or SeiCube
+    name : str
+    """
+    file_path = Path(segy_object.segy_file).absolute()
+    parent_folder = file_path.parent
+    dict_info = OrderedDict([
+        ("path", str(file_path)),
+        ("inDepth", str(segy_object.inDepth)),
+        ("Property_Type", str(segy_object.property_type)),
+        ("inline_range", [str(segy_object.startInline),
+                          str(segy_object.endInline),
+                          str(segy_object.stepInline)]),
+        ("crline_range", [str(segy_object.startCrline),
+                          str(segy_object.endCrline),
+                          str(segy_object.stepCrline)]),
+        ("z_range", [str(segy_object.startDepth),
+                     str(segy_object.endDepth),
+                     str(segy_object.stepDepth)])])
+    with open(str(parent_folder / "{}.seis".format(name)), 'w') as fl:
+        json.dump(dict_info, fl, indent=4)
+
+
+def process_inlines(func, inputs, outputs, n_workers=1, **kwargs):
+    """
+    Compute output cubes inline by inline, optionally with a process pool
+
+    Parameters
+    ----------
+    func : callable
+        module level function called as
+        `func(inline, *input_inline_data, **kwargs)`, it should return the
+        data of the inline for each output cube, a 2-d ndarray for one output
+        or a tuple of them for several outputs. Values returned after the
+        output data are collected and returned.
+    inputs : list of SeiSEGY
+        cubes whose inline data are passed to func
+    outputs : SeiSEGY or list of SeiSEGY
+        cubes to write results into, already created with `create_seis`
+    n_workers : int
+        number of processes, inlines are split into contiguous blocks and
+        each process writes its own block of inlines (whole bricks for
+        SeiCube). Results are the same as computed with a single process.
+    kwargs :
+        additional keyword arguments passed to func
+
+    Returns
+    -------
+    list
+        for every inline, the values returned by func after the output data,
+        a single value is unwrapped, None if there is nothing
+    """
+    if isinstance(outputs, SeiSEGY):
+        outputs = [outputs]
+    inlines = list(outputs[0].inlines())
+    if n_workers > 1:
+        tasks = [(func, inputs, outputs, chunk, kwargs) \
+            for chunk in split_inlines(inlines, n_workers, outputs)]
+        pool = Pool(min(n_workers, len(tasks)))
+        try:
+            chunk_extras = pool.map(_process_inline_chunk, tasks)
+        finally:
+            pool.close()
+            pool.join()
+        # data were changed by other processes
+        for cube in outputs:
+            cube.clear_cache()
+        return [extra for extras in chunk_extras for extra in extras]
+    else:
+        return _process_inline_chunk((func, inputs, outputs, inlines, kwargs))
+
+
+def split_inlines(inlines, n_chunks, outputs=()):
+    """
+    Split inline numbers into contiguous chunks of similar size
+
+    Chunk boundaries are aligned to the least common multiple of the inline
+    brick depths of SeiCube outputs, so no two chunks write into the same
+    brick.
+
+    Parameters
+    ----------
+    inlines : list of int
+    n_chunks : int
+    outputs : list of SeiSEGY
+
+    Returns
+    -------
+    list of list of int
+    """
+    align = 1
+    for cube in outputs:
+        if isinstance(cube, SeiCube):
+            align = _lcm(align, cube.brick_shape[0])
+    n_blocks = -(-len(inlines) // align)
+    n_chunks = max(1, min(n_chunks, n_blocks))
+    chunks = []
+    for i in range(n_chunks):
+        start = (n_blocks * i // n_chunks) * align
+        stop = (n_blocks * (i + 1) // n_chunks) * align
+        chunks.append(inlines[start: stop])
+    return chunks
+
+
+def _lcm(a, b):
+    "least common multiple of positive integers"
+    x, y = a, b
+    while y:
+        x, y = y, x % y
+    return a * b // x
+
+
+def _process_inline_chunk(task):
+    func, inputs, outputs, inlines, kwargs = task
+    extras = []
+    with _sessions(list(inputs) + list(outputs)):
+        for inl in inlines:
+            results = func(
+                inl, *[cube.data(InlineIndex(inl)) for cube in inputs],
+                **kwargs)
+            if not isinstance(results, tuple):
+                results = (results,)
+            for cube, result in zip(outputs, results):
+                cube.update(InlineIndex(inl), result)
+            extra = results[len(outputs):]
+            if len(extra) == 0:
+                extras.append(None)
+            elif len(extra) == 1:
+                extras.append(extra[0])
+            else:
+                extras.append(extra)
+    return extras
+
+
+@contextmanager
+def _sessions(cubes):
+    if cubes:
+        with cubes[0].session():
+            with _sessions(cubes[1:]):
+                yield
+    else:
+        yield
@@ -10,13 +10,15 @@ from __future__ import (absolute_import, division, print_function,
 __author__ = "yuhao"
 
 from builtins import range, open
+import os
 import json
+import tempfile
 from shutil import copyfile
 from itertools import product
+from contextlib import contextmanager
 from future.utils import native
 import segyio
 import numpy as np
-import pandas as pd
 from tqdm.auto import tqdm
 
 from .utils import  methdispatch
@@ -38,9 +40,7 @@ class SeiSEGY(object):
         like : str, optional
             created segy file has the same dimesions as like.
         """
-        self.segy_file = segy_file
-        self.inDepth = False # True if dataset Z is in Depth
-        self.property_type = None
+        self._init_state(segy_file)
 
         if like is not None:
             if Path(native(like)).exists() and not Path(native(self.segy_file)).exists():
@@ -51,6 +51,18 @@ class SeiSEGY(object):
         else:
             raise Exception("File does not exist!")
 
+    def _init_state(self, segy_file):
+        "attributes shared by all seismic classes, before data is parsed"
+        self.segy_file = segy_file
+        self.inDepth = False # True if dataset Z is in Depth
+        self.property_type = None
+        self._session_depth = 0
+        self._read_handle = None
+        self._write_handle = None
+        self._viewable = False
+        self._data_offset = None
+        self._cube = None
+
     @classmethod
     def from_json(cls, json_file, segy_file=None):
         """
@@ -133,6 +145,66 @@ class SeiSEGY(object):
             }
             self.survey_setting = SurveySetting(ThreePoints(setting_dict))
 
+            # data of regular IEEE float files could be viewed directly
+            self._data_offset = 3600 + 3200 * segyfile.ext_headers
+            trace_bytes = 240 + 4 * self.nDepth
+            self._viewable = bool(
+                segyfile.bin[segyio.BinField.Format] == \
+                    segyio.SegySampleFormat.IEEE_FLOAT_4_BYTE
+                and segyfile.sorting == segyio.TraceSortingFormat.INLINE_SORTING
+                and segyfile.tracecount == self.nEast * self.nNorth
+                and os.path.getsize(native(self.segy_file)) == \
+                    self._data_offset + segyfile.tracecount * trace_bytes)
+
+    @property
+    def cube(self):
+        """
+        Read-only array of the whole data with shape (nInline, nCrline, nDepth)
+
+        For inline sorted segy files of 4-byte IEEE float, this is a
+        `numpy.memmap` view of the file with trace headers skipped through
+        strides, no data is read before it is actually used. For other files
+        (e.g. IBM float) data is converted inline by inline into a temporary
+        memory mapped file. Accessors like `inline` and `data` return
+        writable native float32 copies of slices of it.
+
+        Returns
+        -------
+        numpy.ndarray
+        """
+        if self._cube is None:
+            if self._viewable:
+                self._cube = self._memmap_cube()
+            else:
+                self._cube = self._converted_cube()
+        return self._cube
+
+    def _memmap_cube(self):
+        trace_dtype = np.dtype([
+            (native('header'), native('V240')),
+            (native('data'), native('>f4'), (self.nDepth,))])
+        traces = np.memmap(
+            native(self.segy_file), dtype=trace_dtype, mode='r',
+            offset=self._data_offset, shape=(self.nEast * self.nNorth,))
+        return traces[native('data')].reshape(
+            (self.nEast, self.nNorth, self.nDepth))
+
+    def _converted_cube(self):
+        cube = np.memmap(
+            tempfile.TemporaryFile(), dtype=np.float32, mode='w+',
+            shape=(self.nEast, self.nNorth, self.nDepth))
+        with self.session():
+            for i, inl in enumerate(self.inlines()):
+                cube[i] = self.inline(inl)
+        cube.flags.writeable = False
+        return cube
+
+    def _inline_idx(self, inline):
+        return _line_idx(inline, self.startInline, self.stepInline, self.nEast)
+
+    def _crline_idx(self, crline):
+        return _line_idx(crline, self.startCrline, self.stepCrline, self.nNorth)
+
     def inlines(self):
         """
         Iterator for inline numbers
@@ -184,32 +256,121 @@ class SeiSEGY(object):
         for i in range(self.nDepth):
             yield self.startDepth + i * self.stepDepth
 
+    @contextmanager
+    def session(self):
+        """
+        Keep the segy file opened and memory mapped within a `with` block.
+
+        Inside a session every read (`data`, `inline`, `crline`, `depth`,
+        `cdp`, `to_gslib` ...) goes through one read handle, and `update`
+        goes through one write handle opened on first use, instead of opening
+        and mapping the file again for each call. Sessions can be nested,
+        handles are closed when the outermost one exits.
+
+        Yields
+        ------
+        SeiSEGY
+            the object itself
+
+        Examples
+        --------
+        >>> with seis_cube.session() as cube:
+        ...     for inl in cube.inlines():
+        ...         data = cube.data(InlineIndex(inl))
+        """
+        self._session_depth += 1
+        try:
+            if self._session_depth == 1:
+                self._read_handle = segyio.open(self.segy_file, 'r')
+                self._read_handle.mmap()
+            yield self
+        finally:
+            self._session_depth -= 1
+            if self._session_depth == 0:
+                self._close_handles()
+
+    def _close_handles(self):
+        for handle in (self._read_handle, self._write_handle):
+            if handle is not None:
+                handle.close()
+        self._read_handle = None
+        self._write_handle = None
+
+    @contextmanager
+    def _segy(self, mode='r'):
+        """
+        segyio file handle, the ones of the current session if there is one
+        """
+        if self._session_depth > 0:
+            if mode == 'r+' and self._write_handle is None:
+                self._write_handle = segyio.open(self.segy_file, 'r+')
+                self._write_handle.mmap()
+            # reading through the write handle once it exists ensures data
+            # updated in this session is seen
+            if self._write_handle is not None:
+                yield self._write_handle
+            else:
+                yield self._read_handle
+        else:
+            with segyio.open(self.segy_file, mode) as segyfile:
+                segyfile.mmap()
+                yield segyfile
+
+    def clear_cache(self):
+        """
+        Drop data cached in memory, needed after the file has been modified
+        by other processes.
+        """
+        self._cube = None
+
+    def __getstate__(self):
+        # opened handles cannot be shared with other processes
+        state = self.__dict__.copy()
+        state['_session_depth'] = 0
+        state['_read_handle'] = None
+        state['_write_handle'] = None
+        state['_cube'] = None
+        return state
+
+    @staticmethod
+    def _copy(view):
+        "writable native float32 copy of a (read-only, big-endian) cube view"
+        return np.array(view, dtype=np.float32)
+
     def inline(self, inline):
         "data of a inline section"
-        with segyio.open(self.segy_file, 'r') as segyfile:
-            segyfile.mmap()
+        if self._viewable:
+            return self._copy(self.cube[self._inline_idx(inline)])
+        with self._segy() as segyfile:
             data = segyfile.iline[inline]
         return data
 
     def crline(self, crline):
         "data of a crossline section"
-        with segyio.open(self.segy_file, 'r') as segyfile:
-            segyfile.mmap()
+        if self._viewable:
+            return self._copy(self.cube[:, self._crline_idx(crline)])
+        with self._segy() as segyfile:
             data = segyfile.xline[crline]
         return data
 
     def depth(self, depth):
         "data of a depth slice"
         depth_idx = int((depth - self.startDepth) // self.stepDepth)
-        with segyio.open(self.segy_file, 'r') as segyfile:
-            segyfile.mmap()
+        if self._viewable:
+            if not 0 <= depth_idx < self.nDepth:
+                raise IndexError("Depth {} out of range".format(depth))
+            return self._copy(self.cube[:, :, depth_idx])
+        with self._segy() as segyfile:
             data = segyfile.depth_slice[depth_idx]
         return data
 
     def cdp(self, cdp):
         "data of a cdp"
-        with segyio.open(self.segy_file, 'r') as segyfile:
-            segyfile.mmap()
+        if self._viewable:
+            inline, crline = cdp
+            return self._copy(
+                self.cube[self._inline_idx(inline), self._crline_idx(crline)])
+        with self._segy() as segyfile:
             data = segyfile.gather[cdp]
             data = data.reshape((data.shape[-1],))
         return data
@@ -309,9 +470,11 @@ class SeiSEGY(object):
                 raise TypeError("has to be InlineIndex")
             if data.shape != (self.nNorth, self.nDepth):
                 raise ValueError
-            with segyio.open(self.segy_file, 'r+') as segyfile:
-                segyfile.mmap()
+            with self._segy('r+') as segyfile:
                 segyfile.iline[index.value] = data
+            if not self._viewable:
+                # converted copy is outdated
+                self._cube = None
         except Exception as er:
             print(er.message)
 
@@ -450,76 +613,77 @@ class SeiSEGY(object):
         crline = self.startCrline + (n_crline + cr_plus_one) * self.stepCrline
         return (inline, crline)
 
-    def to_gslib(self, attr, fname, cdps=None):
+    def to_gslib(self, attr, fname, cdps=None, binary=False):
         """
         Output attributes to a gslib data file.
         A description of this file format could be found on
         'http://www.gslib.com/gslib_help/format.html'
 
+        Coordinate columns are built once and the file is written inline by
+        inline (or cdp by cdp), so no more than one inline is held in memory.
+
         attr : str
             attribute name
         fname : str
             file name
         cdps : list of tuples
             cdps to export
+        binary : bool
+            write the four columns as little-endian float32 records after
+            the text header instead of formatted text
         """
         try:
-            if cdps is None:
-                info = "Number of cells: [{},{},{}] ".format(
-                        self.nEast, self.nNorth, self.nDepth) + \
-                    "Cell dimensions: [{},{},{}] ".format(
-                        self.stepInline, self.stepCrline, self.stepDepth) + \
-                    "Origin: [{}, {}, {}]".format(
-                        self.startInline, self.startCrline, self.startDepth)
-                with open(fname, 'w') as fout:
-                    fout.write("{}\n4\nx\ny\nz\n{}\n".format(info, attr))
-
-                nInline = len(list(self.inlines()))
-                for i, inl in enumerate(
-                        tqdm(self.inlines(), total=nInline, ascii=True)):
-                    data_per_inline = self.inline(inl).flatten()
-                    inline_per_inline = [inl] * data_per_inline.shape[0]
-                    crline_per_inline = np.array(
-                        [[cl]*self.nDepth for cl in self.crlines()]).flatten()
-                    depth_per_inline = np.array(
-                        [d for d in self.depths()] * self.nNorth).flatten()
-                    temp_frame = pd.DataFrame(
-                        {'col1': inline_per_inline,
-                         'col2': crline_per_inline,
-                         'col3': depth_per_inline,
-                         'col4': data_per_inline})
-                    temp_frame.to_csv(
-                        fname, mode='a', index=False, sep=str(' '),
-                        header=False)
-            else:
-                info = "CDPs: {}".format(cdps)
-                with open(fname, 'w') as fout:
-                    fout.write("{}\n4\nx\ny\nz\n{}\n".format(info, attr))
-                for cdp in tqdm(cdps, ascii=True):
-                    data_per_cdp = self.cdp(cdp)
-                    depth_per_cdp = list(self.depths())
-                    n_depth = len(list(self.depths()))
-                    inl, crl = cdp
-                    inline_per_cdp = [inl] * n_depth
-                    crline_per_cdp = [crl] * n_depth
-                    temp_frame = pd.DataFrame(
-                        {'col1': inline_per_cdp,
-                         'col2': crline_per_cdp,
-                         'col3': depth_per_cdp,
-                         'col4': data_per_cdp})
-                    temp_frame.to_csv(
-                        fname, mode='a', index=False, sep=str(' '),
-                        header=False)
+            with self.session(), open(fname, 'wb') as fout:
+                if cdps is None:
+                    info = "Number of cells: [{},{},{}] ".format(
+                            self.nEast, self.nNorth, self.nDepth) + \
+                        "Cell dimensions: [{},{},{}] ".format(
+                            self.stepInline, self.stepCrline, self.stepDepth) + \
+                        "Origin: [{}, {}, {}]".format(
+                            self.startInline, self.startCrline, self.startDepth)
+                    fout.write("{}\n4\nx\ny\nz\n{}\n".format(
+                        info, attr).encode())
+
+                    columns = np.empty((self.nNorth * self.nDepth, 4))
+                    columns[:, 1] = np.repeat(list(self.crlines()), self.nDepth)
+                    columns[:, 2] = np.tile(list(self.depths()), self.nNorth)
+                    for inl in tqdm(self.inlines(), total=self.nEast,
+                                    ascii=True):
+                        columns[:, 0] = inl
+                        columns[:, 3] = self.inline(inl).ravel()
+                        _write_gslib(fout, columns, binary)
+                else:
+                    info = "CDPs: {}".format(cdps)
+                    fout.write("{}\n4\nx\ny\nz\n{}\n".format(
+                        info, attr).encode())
+
+                    columns = np.empty((self.nDepth, 4))
+                    columns[:, 2] = list(self.depths())
+                    for cdp in tqdm(cdps, ascii=True):
+                        columns[:, 0], columns[:, 1] = cdp
+                        columns[:, 3] = self.cdp(cdp)
+                        _write_gslib(fout, columns, binary)
 
         except Exception as inst:
             print(inst)
             print("Failed to export.")
 
-    def to_gslib_grid(self, attr, fname):
+    def to_gslib_grid(self, attr, fname, binary=False):
         """
         Only the variable values are stored in Grid file, grid coordination are
         defined during the importation.
         Data are sorted in Fortran order
+
+        Values are gathered a block of depth slices at a time from `cube`,
+        so memory use is bounded regardless of the cube size.
+
+        attr : str
+            attribute name
+        fname : str
+            file name
+        binary : bool
+            write values as little-endian float32 after the text header
+            instead of formatted text
         """
         info = "Number of cells: [{},{},{}] ".format(
             self.nEast, self.nNorth, self.nDepth) + \
@@ -527,32 +691,30 @@ class SeiSEGY(object):
                 self.stepInline, self.stepCrline, self.stepDepth) + \
             "Origin: [{}, {}, {}]".format(
                 self.startInline, self.startCrline, self.startDepth)
-        with open(fname, 'w') as fout:
-            fout.write("{}\n1\n{}\n".format(info, attr))
-        # nDepth = self.nDepth
-
-        # for i, d in enumerate(
-        #         tqdm(self.depths(), total=nDepth, ascii=True)):
-        #     data_per_depth = self.depth(d).flatten(order="F")
-        #     temp_frame = pd.DataFrame(
-        #         {'col1': data_per_depth})
-        #     temp_frame.to_csv(
-        #         fname, mode='a', index=False, sep=str(' '),
-        #         header=False)
-
-        nInline = self.nEast
-
-        data_array = None
-
-        for inl in tqdm(self.inlines(), total=nInline, ascii=True):
-            data_per_inline = self.inline(inl).flatten()
-            if data_array is None:
-                data_array = data_per_inline
-            else:
-                data_array = np.append(data_array, data_per_inline)
 
-        data_array = data_array.reshape((self.nEast, self.nNorth, self.nDepth)).flatten('F')
-        temp_frame = pd.DataFrame({'col4': data_array})
-        temp_frame.to_csv(
-            fname, mode='a', index=False, sep=str(' '),
-            header=False)
+        cube = self.cube
+        # about 16M values per block
+        n_slices = max(1, (1 << 24) // (self.nEast * self.nNorth))
+        with open(fname, 'wb') as fout:
+            fout.write("{}\n1\n{}\n".format(info, attr).encode())
+            for start in tqdm(range(0, self.nDepth, n_slices), ascii=True):
+                block = cube[:, :, start: start + n_slices]
+                _write_gslib(fout, block.ravel(order='F'), binary)
+
+
+def _write_gslib(fout, values, binary):
+    "write gslib data rows as formatted text or float32 records"
+    if binary:
+        fout.write(np.asarray(values, dtype='<f4').tobytes())
+    else:
+        fmt = '%.9g' if values.ndim == 1 else \
+            ' '.join(['%d', '%d', '%.9g', '%.9g'])
+        np.savetxt(fout, values, fmt=native(fmt))
+
+
+def _line_idx(line, start, step, n):
+    "index of line number, raise KeyError if not in the survey"
+    idx, remainder = divmod(int(line) - start, step)
+    if remainder != 0 or not 0 <= idx < n:
+        raise KeyError("Line {} not in survey".format(line))
+    return idx
@@ -18,6 +18,7 @@ from future.utils import native
 import numpy as np
 
 from .seisegy import SeiSEGY
+from .seicube import SeiCube
 from .well import Well
 from pygeopressure.basic.horizon import Horizon
 from .survey_setting import SurveySetting
@@ -90,8 +91,12 @@ class Survey(SurveySetting):
             if not data_path.is_absolute() and \
                     data_path.name == str(data_path):
                 data_path = self.survey_dir.absolute() / "Seismics" / data_path
-            self.seismics[seis_name] = SeiSEGY.from_json(info_file,
-                                                         str(data_path))
+            if data_path.is_dir():
+                self.seismics[seis_name] = SeiCube.from_json(info_file,
+                                                             str(data_path))
+            else:
+                self.seismics[seis_name] = SeiSEGY.from_json(info_file,
+                                                             str(data_path))
 
     def _add_seis_wells(self):
         well_dir = self.survey_dir / "Wellinfo"
@@ -115,7 +120,7 @@ class Survey(SurveySetting):
         surf_dir = self.survey_dir / "Surfaces"
         for f in surf_dir.iterdir():
             if f.is_file() and f.suffix == '.hor':
-                tmp = Horizon(str(f))
+                tmp = Horizon(str(f), like=self)
                 tmp.horizon_name = f.stem
                 self.horizons[f.stem] = tmp
 
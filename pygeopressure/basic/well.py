@@ -20,11 +20,16 @@ import pandas as pd
 from pygeopressure.pressure.hydrostatic import hydrostatic_pressure
 from pygeopressure.pressure.eaton import eaton
 from pygeopressure.pressure.bowers import bowers_varu
-from pygeopressure.pressure.multivariate import pressure_multivariate
+from pygeopressure.pressure.multivariate import (
+    invert_multivariate_virgin, pressure_multivariate_varu)
 from pygeopressure.velocity.extrapolate import normal
-from .well_log import Log
+from .well_log import Log, DepthAxis
 from .well_storage import WellStorage
 
+PRESSURE_POINT_FIELDS = (
+    'depth', 'pressure', 'velocity', 'obp', 'hydrostatic', 'normal_velocity',
+    'es', 'es_normal')
+
 
 class Well(object):
     """
@@ -47,7 +52,9 @@ class Well(object):
         self.water_depth = None
         self.total_depth = None
         # self.trajectory = None
-        self.data_frame = None
+        self._data_frame = None
+        self._columns = None
+        self._cache = dict()
         self.params = None
         self.in_hdf = False
         self._parse_json()
@@ -72,14 +79,87 @@ class Well(object):
             print(inst)
 
     def _read_hdf(self):
+        """
+        Only column names are read here, log data are loaded on first use
+        """
         try:
             storage = WellStorage(self.hdf_file)
-            self.data_frame = storage.get_well_data(
-                self.well_name.lower().replace('-', '_'))
+            self._columns = storage.get_columns(self._storage_name)
             self.in_hdf = True
         except Exception as inst:
             print(inst)
 
+    @property
+    def _storage_name(self):
+        return self.well_name.lower().replace('-', '_')
+
+    @property
+    def data_frame(self):
+        """
+        all logs of the well, loaded from storage on first access
+
+        Returns
+        -------
+        pandas.DataFrame
+        """
+        if self._data_frame is None and self.in_hdf:
+            self._data_frame = WellStorage(self.hdf_file).get_well_data(
+                self._storage_name)
+        return self._data_frame
+
+    @data_frame.setter
+    def data_frame(self, data_frame):
+        self._data_frame = data_frame
+        self.clear_cache()
+
+    def clear_cache(self):
+        """
+        Drop cached column metadata, depth, trends and logs
+
+        Called whenever logs or parameters are changed through Well methods,
+        call it after modifying `data_frame` in place.
+        """
+        self._cache = dict()
+
+    def _cached(self, key, func):
+        """
+        value of func() stored under key, arrays are made read-only as they
+        are shared between callers
+        """
+        if key not in self._cache:
+            value = func()
+            if isinstance(value, np.ndarray):
+                value.flags.writeable = False
+            self._cache[key] = value
+        return self._cache[key]
+
+    @property
+    def columns(self):
+        """
+        column names of logs including depth, e.g. "Velocity(Meter/Second)"
+
+        Returns
+        -------
+        list of str
+        """
+        if self._data_frame is not None:
+            return [str(item) for item in self._data_frame.keys()]
+        elif self._columns is not None:
+            return list(self._columns)
+        return []
+
+    def _column(self, column):
+        """
+        values of one column, only this column is read if logs are not
+        loaded yet
+        """
+        if self._data_frame is not None:
+            return self._data_frame[column].values
+        if not self.in_hdf:
+            raise Exception("No dataframe found.")
+        return self._cached(('column', column), lambda: WellStorage(
+            self.hdf_file).get_column(self._storage_name, column))
+
     @property
     def depth(self):
         """
@@ -89,8 +169,9 @@ class Well(object):
         -------
         numpy.ndarray
         """
-        if self.data_frame is not None:
-            return np.around(self.data_frame['Depth(m)'].values, decimals=1)
+        if self._data_frame is not None or self.in_hdf:
+            return self._cached(('depth',), lambda: np.around(
+                self._column('Depth(m)'), decimals=1))
         else:
             raise Exception("No dataframe found.")
 
@@ -103,24 +184,22 @@ class Well(object):
         -------
         list
         """
-        if self.data_frame is not None:
-            temp = [item.strip(')').split('(')[0] \
-                for item in self.data_frame.keys()]
-            temp.remove('Depth')
-            return temp
-        else:
-            return []
+        return [name for name in self.unit_dict if name != 'Depth']
 
     @property
     def unit_dict(self):
         """
         properties and their units
         """
-        temp_dict = {
-            item.strip(')').split('(')[0]: item.strip(')').split('(')[-1] \
-            for item in self.data_frame.keys()}
-        return {key: '' if temp_dict[key] == key else temp_dict[key] \
-            for key in temp_dict.keys()}
+        return self._cached(('unit_dict',), self._parse_units)
+
+    def _parse_units(self):
+        unit_dict = OrderedDict()
+        for item in self.columns:
+            name = item.strip(')').split('(')[0]
+            unit = item.strip(')').split('(')[-1]
+            unit_dict[name] = '' if unit == name else unit
+        return unit_dict
 
     @property
     def hydrostatic(self):
@@ -133,10 +212,12 @@ class Well(object):
         """
         try:
             # temp_log = self.get_log('Overburden_Pressure')
-            return hydrostatic_pressure(
-                self.depth,
-                kelly_bushing=self.kelly_bushing,
-                depth_w=self.water_depth)
+            return self._cached(
+                ('hydrostatic', self.kelly_bushing, self.water_depth),
+                lambda: hydrostatic_pressure(
+                    self.depth,
+                    kelly_bushing=self.kelly_bushing,
+                    depth_w=self.water_depth))
         except Exception as ex:
             print(ex.message)
             # print("No 'Overburden_Pressure' log found.")
@@ -167,8 +248,7 @@ class Well(object):
         numpy.ndarray
         """
         try:
-            temp_log = self.get_log('Overburden_Pressure')
-            return np.array(temp_log.data)
+            return self.get_log('Overburden_Pressure').data
         except KeyError:
             print("No 'Overburden_Pressure' log found.")
 
@@ -185,10 +265,69 @@ class Well(object):
             a = self.params['nct']['a']
             b = self.params['nct']['b']
             # temp_log = self.get_log('Overburden_Pressure')
-            return normal(x=self.depth, a=a, b=b)
+            return self._cached(
+                ('normal_velocity', a, b),
+                lambda: normal(x=self.depth, a=a, b=b))
         except KeyError:
             print("No 'Overburden_Pressure' log found.")
 
+    @property
+    def depth_axis(self):
+        "DepthAxis of well depth"
+        return self._cached(('depth_axis',), lambda: DepthAxis(self.depth))
+
+    def pressure_points(self, pres_log='loading', vel_log='Velocity',
+                        obp_log='Overburden_Pressure', a=None, b=None):
+        """
+        Logs sampled at depths of pressure measurements
+
+        Parameters
+        ----------
+        pres_log : Log or str
+            Log object storing measured pressure or pressure name
+        vel_log, obp_log : Log or str
+            Log objects or names of logs stored in well
+        a, b : float, optional
+            NCT coefficients of normal velocity, NCT stored in well is used
+            if not given
+
+        Returns
+        -------
+        numpy.ndarray
+            structured array with one record per pressure measurement, see
+            `sample_pressure_points`. Results are cached when logs are given
+            by name.
+        """
+        def sample():
+            pres = self.get_pressure(pres_log) \
+                if isinstance(pres_log, (bytes, str)) else pres_log
+            vel = self.get_log(vel_log) \
+                if isinstance(vel_log, (bytes, str)) else vel_log
+            obp = self.get_log(obp_log) \
+                if isinstance(obp_log, (bytes, str)) else obp_log
+            if a is None or b is None:
+                v_normal = self.normal_velocity \
+                    if 'nct' in self.params else None
+            else:
+                v_normal = self._cached(
+                    ('normal_velocity', a, b),
+                    lambda: normal(x=self.depth, a=a, b=b))
+            return sample_pressure_points(
+                pres, vel, obp, self.hydrostatic, v_normal)
+        if all(isinstance(item, (bytes, str)) \
+               for item in (pres_log, vel_log, obp_log)):
+            # parameters the points depend on are part of the key, so
+            # changing them without clear_cache does not return stale points
+            params = dict(
+                pres=self.params.get(pres_log),
+                nct=self.params.get('nct') if a is None or b is None \
+                    else None)
+            return self._cached(
+                ('pressure_points', pres_log, vel_log, obp_log, a, b,
+                 self.kelly_bushing, self.water_depth,
+                 json.dumps(params, sort_keys=True, default=str)), sample)
+        return sample()
+
     def get_log(self, logs, ref=None):
         """
         Retreive one or several logs in well
@@ -218,20 +357,27 @@ class Well(object):
                 self.well_name.lower().replace('-', '_')
             new_log.units = self.unit_dict[name]
             new_log.descr = name
-            new_log.depth = np.array(self.data_frame['Depth(m)'].values)
-            new_log.data = np.array(self.data_frame[
-                '{}({})'.format(name, self.unit_dict[name])].values)
-            if ref == 'sea':
-                shift = int(self.kelly_bushing // 0.1)
-                shift_data = np.full_like(new_log.data, np.nan, dtype=np.double)
-                shift_data[:-shift] = new_log.data[shift:]
-                new_log.data = shift_data
+            new_log.depth, new_log.data = self._cached(
+                ('log', name, ref, self.kelly_bushing),
+                lambda: self._log_arrays(name, ref))
             output_list.append(new_log)
         if isinstance(logs, (bytes, str)):
             return output_list[0]
         else:
             return output_list
 
+    def _log_arrays(self, name, ref):
+        "read-only depth and data arrays of a log"
+        log = Log()
+        log.depth = self._column('Depth(m)')
+        log.data = self._column('{}({})'.format(name, self.unit_dict[name]))
+        if ref == 'sea':
+            shift = int(self.kelly_bushing // 0.1)
+            shift_data = np.full_like(log.data, np.nan, dtype=np.double)
+            shift_data[:-shift] = log.data[shift:]
+            log.data = shift_data
+        return log.depth, log.data
+
     def add_log(self, log, name=None, unit=None):
         """
         Add new Log to current well
@@ -306,9 +452,10 @@ class Well(object):
             Log to replace
         """
         old_log = self.get_log(log_name)
-        if old_log.depth == log.depth:
+        if np.array_equal(old_log.depth, log.depth):
             self.data_frame["{}({})".format(
                 old_log.descr.replace(' ', '_'), old_log.units)] = log.data
+            self.clear_cache()
         else:
             raise Warning("Mismatch")
 
@@ -342,7 +489,12 @@ class Well(object):
     def save_well_logs(self):
         """
         Save current well logs to file
+
+        Only logs added, changed or dropped since loading are written.
         """
+        if self._data_frame is None:
+            # logs not loaded, hence not modified
+            return
         try:
             storage = WellStorage(self.hdf_file)
             storage.update_well(self.well_name, self.data_frame)
@@ -376,25 +528,18 @@ class Well(object):
         except KeyError:
             print("{}: Cannot find {}".format(self.well_name, pres_key))
             return Log()
-        hydro = hydrostatic_pressure(self.depth,
-                                     kelly_bushing=self.kelly_bushing,
-                                     depth_w=self.water_depth)
+        hydro = self.hydrostatic
         depth = pres_to_get["depth"]
         coefficients = pres_to_get["coef"]
         pres = pres_to_get["data"]
 
-        obp_depth = self.depth # obp_log.depth
-
-        output_depth = np.array(depth)
+        output_depth = np.array(depth, dtype=np.float64)
+        idx = self.depth_axis.searchsorted(output_depth)
 
         if coef is True:
             if not coefficients:
                 # get pressure coefficients but no coefficients stored
-                output_data = list()
-                for dp, pr in zip(depth, pres):
-                    idx = np.searchsorted(self.depth, dp)
-                    output_data.append(pr / hydro[idx])
-                output_data = np.array(output_data)
+                output_data = np.array(pres, dtype=np.float64) / hydro[idx]
             else:
                 output_data = np.array(coefficients)
         elif coef is False:
@@ -403,13 +548,7 @@ class Well(object):
                 coefficients = pres
                 hydro = np.ones(hydro.shape)
 
-            output_data = list()
-            # ouput_depth = list()
-            for dp, co in zip(depth, coefficients):
-                idx = np.searchsorted(obp_depth, dp)
-                output_data.append(hydro[idx] * co)
-                # ouput_depth.append(dp)
-            output_data = np.array(output_data)
+            output_data = hydro[idx] * np.array(coefficients, dtype=np.float64)
         else:
             raise Exception()
 
@@ -436,15 +575,8 @@ class Well(object):
             Log object containing normally pressured measurements
         """
         # obp_log = self.get_log("Overburden_Pressure")
-        hydro = hydrostatic_pressure(self.depth,
-                                     kelly_bushing=self.kelly_bushing,
-                                     depth_w=self.water_depth)
         depth = self.params["MP"]
-        obp_depth = self.depth
-        pres_data = list()
-        for dp in depth:
-            idx = np.searchsorted(obp_depth, dp)
-            pres_data.append(hydro[idx])
+        pres_data = self.hydrostatic[self.depth_axis.searchsorted(depth)]
 
         log = Log()
         log.depth = depth
@@ -471,14 +603,14 @@ class Well(object):
         """
         if isinstance(vel_log, (bytes, str)):
             vel_log.get_log(vel_log)
-        velocity = np.array(vel_log.data)
+        velocity = np.asarray(vel_log.data)
 
         if obp_log is None:
             obp = self.lithostatic
         else:
             if isinstance(obp_log, (bytes, str)):
                 obp_log.get_log(obp_log)
-            obp = np.array(obp_log.data)
+            obp = np.asarray(obp_log.data)
 
         try:
             n = self.params['n'] if n is None else n
@@ -531,14 +663,14 @@ class Well(object):
         """
         if isinstance(vel_log, (bytes, str)):
             vel_log.get_log(vel_log)
-        velocity = np.array(vel_log.data)
+        velocity = np.asarray(vel_log.data)
 
         if obp_log is None:
             obp = self.lithostatic
         else:
             if isinstance(obp_log, (bytes, str)):
                 obp_log.get_log(obp_log)
-            obp = np.array(obp_log.data)
+            obp = np.asarray(obp_log.data)
 
         try:
             a = self.params['bowers']['A'] if a is None else a
@@ -568,42 +700,80 @@ class Well(object):
         return log
 
     def multivariate(self, vel_log, por_log, vsh_log, obp_log=None,
-                     a0=None, a1=None, a2=None, a3=None, b=None):
+                     a0=None, a1=None, a2=None, a3=None, b=None, u=None,
+                     vmax=None, start_depth=None, buf=20, end_depth=None,
+                     end_buffer=10):
+        """
+        Predict pore pressure using multivariate method
+
+        Parameters
+        ----------
+        vel_log, por_log, vsh_log : Log or str
+            velocity, porosity and shale volume logs
+        obp_log : Log or str
+            overburden pressure log
+        a0, a1, a2, a3, b : float
+            multivariate virgin curve coefficients
+        u, vmax : float
+            unloading parameter and velocity at which unloading starts
+        start_depth, end_depth : float
+            depth range of unloading, no unloading if start_depth is not
+            given either here or in params
+
+        Returns
+        -------
+        Log
+            a Log object containing calculated pressure.
+        """
         if isinstance(vel_log, (bytes, str)):
-            vel_log.get_log(vel_log)
-        vel = np.array(vel_log.data)
+            vel_log = self.get_log(vel_log)
+        vel = np.asarray(vel_log.data)
         if isinstance(por_log, (bytes, str)):
-            por_log.get_log(por_log)
-        phi = np.array(por_log.data)
+            por_log = self.get_log(por_log)
+        phi = np.asarray(por_log.data)
         if isinstance(vsh_log, (bytes, str)):
-            vsh_log.get_log(vsh_log)
-        vsh = np.array(vsh_log.data)
-        if isinstance(vsh_log, (bytes, str)):
-            vsh_log.get_log(vsh_log)
-        vsh = np.array(vsh_log.data)
+            vsh_log = self.get_log(vsh_log)
+        vsh = np.asarray(vsh_log.data)
 
         if obp_log is None:
             obp = self.lithostatic
         else:
             if isinstance(obp_log, (bytes, str)):
-                obp_log.get_log(obp_log)
-            obp = np.array(obp_log.data)
+                obp_log = self.get_log(obp_log)
+            obp = np.asarray(obp_log.data)
 
+        params = self.params.get('multivariate', {})
         try:
-            a0 = self.params['multivariate']['a0'] if a0 is None else a0
-            a1 = self.params['multivariate']['a1'] if a1 is None else a1
-            a2 = self.params['multivariate']['a2'] if a2 is None else a2
-            a3 = self.params['multivariate']['a3'] if a3 is None else a3
-            b = self.params['multivariate']['B'] if b is None else b
+            a0 = params['a0'] if a0 is None else a0
+            a1 = params['a1'] if a1 is None else a1
+            a2 = params['a2'] if a2 is None else a2
+            a3 = params['a3'] if a3 is None else a3
+            b = params['B'] if b is None else b
         except KeyError as e:
             raise KeyError("Missing parameter: {}".format(e.args[0]))
+        start_depth = params.get('start_depth') if start_depth is None \
+            else start_depth
+        end_depth = params.get('end_depth') if end_depth is None \
+            else end_depth
 
         log = Log()
         log.depth = self.depth
 
-        log.data = pressure_multivariate(
-            obp, vel, phi, vsh, a0, a1, a2, a3,
-            b, 1, 4600, start_idx=3000, end_idx=None)
+        if start_depth is None:
+            log.data = obp - invert_multivariate_virgin(
+                vel, phi, vsh, a0, a1, a2, a3, b)
+        else:
+            try:
+                u = params['U'] if u is None else u
+                vmax = params['vmax'] if vmax is None else vmax
+            except KeyError as e:
+                raise KeyError("Missing parameter: {}".format(e.args[0]))
+            end_idx = None if end_depth is None \
+                else vel_log.get_depth_idx(end_depth)
+            log.data = pressure_multivariate_varu(
+                obp, vel, phi, vsh, a0, a1, a2, a3, b, u, vmax,
+                start_idx=vel_log.get_depth_idx(start_depth), buf=buf,
+                end_idx=end_idx, end_buffer=end_buffer)
 
         log.name = "pressure_mutlivariate_{}".format(
             self.well_name.lower().replace('-', '_'))
@@ -647,8 +817,50 @@ class Well(object):
         """
         Save edited parameters to well information file
         """
+        self.clear_cache()
         try:
             with open(self.json_file, "w") as fl:
                 json.dump(self.params, fl, indent=4)
         except KeyError as inst:
             print(inst)
+
+
+def sample_pressure_points(pres_log, vel_log, obp_log, hydrostatic=None,
+                           normal_velocity=None):
+    """
+    Sample logs at depths of pressure measurements
+
+    Parameters
+    ----------
+    pres_log : Log
+        measured pressure
+    vel_log, obp_log : Log
+        velocity and overburden pressure logs, sampled at the first depth
+        of obp_log not shallower than each pressure measurement
+    hydrostatic, normal_velocity : 1-d ndarray, optional
+        hydrostatic pressure and normal velocity at depths of obp_log,
+        missing values are nan
+
+    Returns
+    -------
+    numpy.ndarray
+        structured array with one record per pressure measurement and fields
+        PRESSURE_POINT_FIELDS: depth, pressure, velocity, obp, hydrostatic,
+        normal_velocity, es (obp - pressure) and es_normal
+        (obp - hydrostatic)
+    """
+    points = np.empty(
+        len(pres_log), dtype=[(name, np.float64) \
+                              for name in PRESSURE_POINT_FIELDS])
+    idx = obp_log.depth_axis.searchsorted(pres_log.depth)
+    points['depth'] = pres_log.depth
+    points['pressure'] = pres_log.data
+    points['velocity'] = vel_log.data[idx]
+    points['obp'] = obp_log.data[idx]
+    points['hydrostatic'] = np.nan if hydrostatic is None \
+        else np.asarray(hydrostatic)[idx]
+    points['normal_velocity'] = np.nan if normal_velocity is None \
+        else np.asarray(normal_velocity)[idx]
+    points['es'] = points['obp'] - points['pressure']
+    points['es_normal'] = points['obp'] - points['hydrostatic']
+    return points
@@ -18,7 +18,15 @@ import matplotlib.pyplot as plt
 class Log(object):
     """
     class for well log data
+
+    depth and data are stored as read-only float64 ndarrays, accessing
+    them returns the stored arrays without copying. Assign new values to
+    change them, use `tolist()` where a list is needed.
     """
+    __slots__ = ('name', 'units', 'descr', 'prop_type', '_data', '_depth',
+                 'log_start', 'log_stop', 'depth_start', 'depth_stop',
+                 'log_start_idx', 'log_stop_idx', '_depth_axis')
+
     def __init__(self, file_name=None, log_name="unk"):
         """
         Parameters
@@ -32,8 +40,9 @@ class Log(object):
         self.units = ""
         self.descr = ""
         self.prop_type = None
-        self.__data = []
-        self.__depth = []
+        self._data = _readonly([])
+        self._depth = _readonly([])
+        self._depth_axis = None
         self.log_start = None
         self.log_stop = None
         self.depth_start = None
@@ -47,8 +56,8 @@ class Log(object):
     def from_scratch(cls, depth, data, name=None, units=None, descr=None,
                      prop_type=None):
         log = cls()
-        log.depth = np.array(depth)
-        log.data = np.array(data)
+        log.depth = depth
+        log.data = data
         log.name = name
         log.units = units
         log.descr = descr
@@ -76,87 +85,113 @@ class Log(object):
             self.name = "unk_unk"
 
     def __len__(self):
-        return len(self.__data)
+        return self._data.shape[0]
 
     def __str__(self):
         return "Well_Log:{}({}[{}])".format(self.name, self.descr, self.units)
 
     def __bool__(self):
-        return bool(bool(self.__depth) and bool(self.__data))
+        return bool(self._depth.size and self._data.size)
+
+    __nonzero__ = __bool__
 
     def __eq__(self, other):
-        return self.depth == other.depth and self.data == other.data
+        return np.array_equal(self._depth, other.depth) and \
+            _array_equal_nan(self._data, other.data)
+
+    def __ne__(self, other):
+        return not self == other
+
+    __hash__ = None
+
+    def __getstate__(self):
+        return {key: getattr(self, key) for key in self.__slots__}
+
+    def __setstate__(self, state):
+        for key, value in state.items():
+            setattr(self, key, value)
 
     @property
     def depth(self):
         "depth data of the log"
-        return list(self.__depth)
+        return self._depth
 
     @depth.setter
     def depth(self, values):
-        self.__depth = list(values)
+        self._depth = _readonly(values)
+        self._depth_axis = None
+        self._reset_range()
+
+    @property
+    def depth_axis(self):
+        "DepthAxis for looking up indexes of depth values"
+        if self._depth_axis is None:
+            self._depth_axis = DepthAxis(self._depth)
+        return self._depth_axis
 
     @property
     def data(self):
         "property data of the log"
-        return list(self.__data)
+        return self._data
 
     @data.setter
     def data(self, values):
-        self.__data = list(values)
+        self._data = _readonly(values)
+        self._reset_range()
+
+    def _reset_range(self):
+        self.log_start = None
+        self.log_stop = None
+        self.log_start_idx = None
+        self.log_stop_idx = None
 
     @property
     def start(self):
         "start depth of available property data"
         if self.log_start is None:
-            for dep, dat in zip(self.__depth, self.__data):
-                if np.isfinite(dat):
-                    self.log_start = dep
-                    break
+            index = np.flatnonzero(np.isfinite(self._data))
+            if index.size > 0:
+                self.log_start = self._depth[index[0]]
         return self.log_start
 
     @property
     def start_idx(self):
         "start index of available property data"
         if self.log_start_idx is None:
-            self.__data = np.array(self.__data)
-            mask = np.isfinite(self.__data)
-            index = np.where(mask == True)
-            self.log_start_idx = index[0][0]
+            index = np.flatnonzero(np.isfinite(self._data))
+            self.log_start_idx = index[0]
         return self.log_start_idx
 
     @property
     def stop(self):
         "end depth of available property data"
         if self.log_stop is None:
-            for dep, dat in zip(reversed(self.__depth), reversed(self.__data)):
-                if np.isfinite(dat):
-                    self.log_stop = dep
-                    break
+            index = np.flatnonzero(np.isfinite(self._data))
+            if index.size > 0:
+                self.log_stop = self._depth[index[-1]]
         return self.log_stop
 
     @property
     def stop_idx(self):
         "end index of available property data"
         if self.log_stop_idx is None:
-            self.__data = np.array(self.__data)
-            mask = np.isfinite(self.__data)
-            index = np.where(mask == True)
-            self.log_stop_idx = index[0][-1] + 1
+            index = np.flatnonzero(np.isfinite(self._data))
+            self.log_stop_idx = index[-1] + 1
             # so when used in slice, +1 will not needed.
         return self.log_stop_idx
 
     @property
     def top(self):
         "top depth of this log"
-        return self.__depth[0]
+        return self._depth[0]
 
     @property
     def bottom(self):
         "bottom depth of this log"
-        return self.__depth[-1]
+        return self._depth[-1]
 
     def _read_od(self, file_name):
+        depth, data = [], []
         try:
             with open(file_name, "r") as fin:
                 info_list = fin.readline().split('\t')
@@ -165,14 +200,16 @@ class Log(object):
                 self.units = temp_list[1][:-2]
                 for line in fin:
                     tempList = line.split()
-                    self.__depth.append(round(float(tempList[0]), 1))
+                    depth.append(round(float(tempList[0]), 1))
                     if tempList[1] == "1e30":
-                        self.__data.append(np.nan)
+                        data.append(np.nan)
                     else:
-                        self.__data.append(float(tempList[1]))
+                        data.append(float(tempList[1]))
         except Exception as inst:
             print('{}: '.format(self.name))
             print(inst.args)
+        self.depth = depth
+        self.data = data
 
     def to_las(self, file_name):
         """
@@ -183,7 +220,7 @@ class Log(object):
                 split_list = self.descr.split(' ')
                 description = '_'.join(split_list)
                 fout.write("Depth(m)\t" + description + "(" + self.units + ")\n")
-                for d, v in zip(self.__depth, self.__data):
+                for d, v in zip(self._depth.tolist(), self._data.tolist()):
                     d = str(d)
                     v = str(v) if np.isfinite(v) else "1e30"
                     fout.write("\t".join([d, v]) + "\n")
@@ -195,28 +232,50 @@ class Log(object):
         if d > self.bottom or d < self.top:
             return None
         else:
-            return int((d - self.top) // 0.1)
+            return int(self.depth_axis.floor(d))
 
     def get_data(self, depth):
         "get data at certain depth"
-        depth_idx = list()
-        for de in depth:
-            depth_idx.append(self.get_depth_idx(de))
-        log_depth = np.array(self.__depth)
-        log_data = np.array(self.__data)
-        mask = log_depth < 0
-        for idx in depth_idx:
-            if idx is not None:
-                mask[idx] = True
-        return log_data[mask]
+        depth = np.asarray(depth, dtype=np.float64)
+        in_range = (depth <= self.bottom) & (depth >= self.top)
+        mask = np.zeros(self._data.shape, dtype=bool)
+        mask[self.depth_axis.floor(depth[in_range])] = True
+        return self._data[mask]
+
+    def sample_at(self, depths, method='nearest'):
+        """
+        Log values at given depths
+
+        Parameters
+        ----------
+        depths : scalar or ndarray
+        method : {'nearest', 'linear'}
+            value of the nearest sample or linear interpolation between
+            samples
+
+        Returns
+        -------
+        ndarray
+            values at depths, nan for depths outside the log
+        """
+        depths = np.asarray(depths, dtype=np.float64)
+        if method == 'linear':
+            return np.interp(
+                depths, self._depth, self._data, left=np.nan, right=np.nan)
+        elif method == 'nearest':
+            idx = self.depth_axis.nearest(depths)
+            in_range = (depths >= self.top) & (depths <= self.bottom)
+            return np.where(in_range, self._data[idx], np.nan)
+        else:
+            raise ValueError("Unknown method {}".format(method))
 
     def get_resampled(self, rate):
         "return resampled log"
         standard_log_step = 0.1
         step = int(rate // standard_log_step) + 1
         log = Log()
-        log.depth = self.depth[::step]
-        log.data = self.data[::step]
+        log.depth = self._depth[::step]
+        log.data = self._data[::step]
         return log
 
     def plot(self, ax=None, color='gray', linewidth=0.5, linestyle='-',
@@ -244,3 +303,86 @@ class Log(object):
                ylabel="Depth(m)",
                title=self.name)
         return ax
+
+
+class DepthAxis(object):
+    """
+    Index lookup of depth values of a log
+
+    Indexes are computed arithmetically when depth is regularly sampled,
+    with binary search otherwise. All methods accept scalars or arrays.
+
+    Parameters
+    ----------
+    depth : 1-d ndarray
+        increasing depth values
+    """
+    __slots__ = ('depth', 'start', 'step')
+
+    def __init__(self, depth):
+        self.depth = np.asarray(depth, dtype=np.float64)
+        self.start = None
+        self.step = None
+        if self.depth.shape[0] > 1:
+            step = (self.depth[-1] - self.depth[0]) / (self.depth.shape[0] - 1)
+            regular = self.depth[0] + step * np.arange(self.depth.shape[0])
+            if step > 0 and np.allclose(
+                    self.depth, regular, rtol=0, atol=1e-3 * step):
+                self.start = self.depth[0]
+                self.step = step
+
+    @property
+    def regular(self):
+        "whether depth is regularly sampled"
+        return self.step is not None
+
+    def searchsorted(self, depths):
+        """
+        same as `numpy.searchsorted(depth, depths)`, index of the first
+        depth not smaller than depths
+        """
+        if self.regular:
+            idx = np.ceil((np.asarray(depths) - self.start) / self.step - 1e-3)
+            return np.clip(idx, 0, self.depth.shape[0]).astype(int)
+        return np.searchsorted(self.depth, depths)
+
+    def floor(self, depths):
+        "index of the last depth not larger than depths"
+        if self.regular:
+            idx = np.floor((np.asarray(depths) - self.start) / self.step + 1e-3)
+            return np.clip(idx, -1, self.depth.shape[0] - 1).astype(int)
+        return np.searchsorted(self.depth, depths, side='right') - 1
+
+    def nearest(self, depths):
+        "index of the nearest depth"
+        n = self.depth.shape[0]
+        if n < 2:
+            return np.zeros(np.shape(depths), dtype=int)
+        if self.regular:
+            idx = np.around((np.asarray(depths) - self.start) / self.step)
+            return np.clip(idx, 0, n - 1).astype(int)
+        right = np.clip(np.searchsorted(self.depth, depths), 1, n - 1)
+        left = right - 1
+        depths = np.asarray(depths)
+        closer_left = np.abs(depths - self.depth[left]) <= \
+            np.abs(self.depth[right] - depths)
+        return np.where(closer_left, left, right)
+
+
+def _readonly(values):
+    """
+    float64 copy of values which can not be modified in place, read-only
+    float64 arrays (e.g. depth of another Log) are shared without copying
+    """
+    if isinstance(values, np.ndarray) and values.dtype == np.float64 and \
+            not values.flags.writeable:
+        return values
+    array = np.array(values, dtype=np.float64)
+    array.flags.writeable = False
+    return array
+
+
+def _array_equal_nan(a, b):
+    a, b = np.asarray(a, dtype=np.float64), np.asarray(b, dtype=np.float64)
+    return a.shape == b.shape and bool(
+        np.all((a == b) | (np.isnan(a) & np.isnan(b))))
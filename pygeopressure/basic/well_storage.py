@@ -7,9 +7,24 @@ Created on Thu May 10 2018
 from __future__ import (absolute_import, division, print_function,
                         unicode_literals)
 
+from builtins import str
+
 __author__ = "yuhao"
 
+import os
+import json
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from multiprocessing import Pool
+
+import numpy as np
 import pandas as pd
+import tables
+
+COLUMNS_ATTR = "well_columns"
+TMP_PREFIX = "tmp__"
+FILTERS = tables.Filters(complevel=5, complib='zlib', shuffle=True)
 
 
 class WellStorage(object):
@@ -17,50 +32,448 @@ class WellStorage(object):
     interface to hdf5 file storing well logs
 
     this class is designed to accept only LasData.data_frame as input data
+
+    Each well is a group holding one compressed array per column (log), and
+    a manifest of column names in the group attributes, so that a single log
+    can be read without loading the others. Wells stored as pandas fixed
+    format frames by previous versions are still readable, `to_columnar`
+    converts them.
     """
     def __init__(self, hdf5_file=None):
         self.hdf5_file = hdf5_file
 
     @property
     def wells(self):
-        well_names = None
-        with pd.HDFStore(self.hdf5_file) as store:
-            well_names = [key[1:] for key in store.keys()]
+        if not os.path.exists(self.hdf5_file):
+            return []
+        with self._open('r') as h5:
+            well_names = sorted(
+                group._v_name for group in h5.root._f_iter_nodes('Group') \
+                if _is_well(group))
         return well_names
 
     def get_well_data(self, well_name):
-        try:
-            with pd.HDFStore(self.hdf5_file) as store:
-                return store[well_name]
-        except KeyError:
-            raise KeyError("No well named {}".format(well_name))
+        """
+        Returns
+        -------
+        pandas.DataFrame
+            all logs of the well
+        """
+        with self._open('r') as h5:
+            group = self._get_group(h5, well_name)
+            if _is_columnar(group):
+                return pd.DataFrame(OrderedDict(
+                    (column, group._f_get_child(node).read()) \
+                    for column, node in _manifest(group).items()))
+        return pd.read_hdf(self.hdf5_file, well_name)
+
+    def get_columns(self, well_name):
+        """
+        Names of the columns of a well, without reading any data
+
+        Returns
+        -------
+        list of str
+        """
+        with self._open('r') as h5:
+            group = self._get_group(h5, well_name)
+            if _is_columnar(group):
+                return list(_manifest(group).keys())
+            return [_to_str(item) for item in group.axis0.read()]
+
+    def get_column(self, well_name, column):
+        """
+        Read values of one column of a well
+
+        Parameters
+        ----------
+        well_name : str
+        column : str
+            full column name, e.g. "Velocity(Meter/Second)"
+
+        Returns
+        -------
+        numpy.ndarray
+        """
+        with self._open('r') as h5:
+            group = self._get_group(h5, well_name)
+            if _is_columnar(group):
+                manifest = _manifest(group)
+                if column not in manifest:
+                    raise KeyError("No column named {}".format(column))
+                return group._f_get_child(manifest[column]).read()
+        data_frame = self.get_well_data(well_name)
+        if column not in data_frame.columns:
+            raise KeyError("No column named {}".format(column))
+        return data_frame[column].values
 
     def remove_well(self, well_name):
-        try:
-            with pd.HDFStore(self.hdf5_file) as store:
-                return store.remove(well_name)
-        except KeyError:
-            raise KeyError("No well named {}".format(well_name))
+        with self._open('a') as h5:
+            self._get_group(h5, well_name)
+            h5.remove_node('/', well_name, recursive=True)
 
     def add_well(self, well_name, well_data_frame):
-        well_name = well_name.lower().replace('-', '_')
-        well_data_frame.to_hdf(self.hdf5_file, well_name)
+        with self._open('a') as h5:
+            _write_well(h5, well_name, well_data_frame)
+
+    def ingest(self, paths, workers=1, well_names=None, usecols=None):
+        """
+        Add wells from LAS and pseudo-LAS files
+
+        Files are parsed by a pool of processes, the parsed wells are written
+        by this process with the hdf5 file opened once. A file failing to
+        parse or write is recorded in the report, other files are still
+        added.
+
+        Parameters
+        ----------
+        paths : str or list of str
+            LAS and pseudo-LAS files, or a directory whose *.las files are
+            added
+        workers : int
+            number of processes parsing files
+        well_names : list of str, optional
+            names of wells, file names without extension by default
+        usecols : list of str, optional
+            names of logs to read, see `LasData`
+
+        Returns
+        -------
+        pandas.DataFrame
+            one row per file with columns file, well, rows, logs,
+            parse_time, write_time and error (None if added)
+        """
+        if isinstance(paths, (str, bytes)) and os.path.isdir(paths):
+            paths = sorted(
+                os.path.join(paths, name) for name in os.listdir(paths) \
+                if name.lower().endswith('.las'))
+        elif isinstance(paths, (str, bytes)):
+            paths = [paths]
+        paths = [str(path) for path in paths]
+        if well_names is None:
+            well_names = [
+                os.path.splitext(os.path.basename(path))[0] for path in paths]
+        if len(well_names) != len(paths):
+            raise ValueError("Expected {} well names, got {}".format(
+                len(paths), len(well_names)))
+        tasks = [(i, path, name, usecols) \
+            for i, (path, name) in enumerate(zip(paths, well_names))]
+
+        records = []
+        pool = Pool(min(workers, len(tasks))) if workers > 1 and tasks \
+            else None
+        try:
+            results = pool.imap_unordered(_parse_well_file, tasks) \
+                if pool is not None else (_parse_well_file(t) for t in tasks)
+            with self._open('a') as h5:
+                for record, data_frame in results:
+                    if data_frame is not None:
+                        start = time.time()
+                        try:
+                            _write_well(h5, record['well'], data_frame)
+                        except Exception as ex:
+                            record['error'] = "{}: {}".format(
+                                type(ex).__name__, ex)
+                        record['write_time'] = time.time() - start
+                    records.append(record)
+        finally:
+            if pool is not None:
+                pool.close()
+                pool.join()
+        records.sort(key=lambda record: record.pop('index'))
+        return pd.DataFrame(records, columns=[
+            'file', 'well', 'rows', 'logs', 'parse_time', 'write_time',
+            'error'])
 
     def update_well(self, well_name, well_data_frame):
-        with pd.HDFStore(self.hdf5_file) as store:
-            store[well_name.lower().replace('-', '_')] = well_data_frame
+        """
+        Store well_data_frame as the logs of the well
+
+        Only columns which are added, changed or deleted are written, the
+        whole well is rewritten only when depth values change.
+        """
+        well_name = well_name.lower().replace('-', '_')
+        if well_name not in self.wells:
+            self.add_well(well_name, well_data_frame)
+            return
+        self.to_columnar(well_name)
+        columns = self.get_columns(well_name)
+        new_columns = [str(column) for column in well_data_frame.columns]
+        depth_column = columns[0]
+        if depth_column not in new_columns or not _same_values(
+                self.get_column(well_name, depth_column),
+                well_data_frame[depth_column].values):
+            self.add_well(well_name, well_data_frame)
+            return
+        for column in columns:
+            if column not in new_columns:
+                self.delete_column(well_name, column)
+        for column in new_columns:
+            values = well_data_frame[column].values
+            if column not in columns:
+                self.add_column(well_name, column, values)
+            elif not _same_values(
+                    self.get_column(well_name, column), values):
+                self.replace_column(well_name, column, values)
+        if self.get_columns(well_name) != new_columns:
+            self._set_manifest(well_name, new_columns)
+
+    def add_column(self, well_name, column, values):
+        """
+        Add a column to a well, other columns are left untouched
+
+        Parameters
+        ----------
+        well_name : str
+        column : str
+            full column name, e.g. "Velocity(Meter/Second)"
+        values : 1-d ndarray
+            values at every depth of the well
+        """
+        self._write_column(well_name, column, values, replace=False)
+
+    def replace_column(self, well_name, column, values):
+        """
+        Replace values of an existing column of a well
+        """
+        self._write_column(well_name, column, values, replace=True)
+
+    def delete_column(self, well_name, column):
+        """
+        Delete a column of a well
+        """
+        self.to_columnar(well_name)
+        with self._open('a') as h5:
+            group = self._get_group(h5, well_name)
+            manifest = _manifest(group)
+            if column not in manifest:
+                raise KeyError("No column named {}".format(column))
+            node = manifest.pop(column)
+            group._v_attrs[COLUMNS_ATTR] = json.dumps(manifest)
+            h5.remove_node(group, node)
+
+    def rename_column(self, well_name, column, new_column):
+        """
+        Rename a column of a well, only the manifest is rewritten
+        """
+        self.to_columnar(well_name)
+        with self._open('a') as h5:
+            group = self._get_group(h5, well_name)
+            manifest = _manifest(group)
+            if column not in manifest:
+                raise KeyError("No column named {}".format(column))
+            if new_column in manifest:
+                raise ValueError("Duplicate logs: {}".format(new_column))
+            group._v_attrs[COLUMNS_ATTR] = json.dumps(OrderedDict(
+                (new_column if key == column else key, node) \
+                for key, node in manifest.items()))
+
+    def _write_column(self, well_name, column, values, replace):
+        """
+        new data is written into a temporary node renamed afterwards, the
+        manifest is updated last, so an interrupted write leaves the well
+        as it was
+        """
+        self.to_columnar(well_name)
+        values = np.asarray(values)
+        with self._open('a') as h5:
+            group = self._get_group(h5, well_name)
+            manifest = _manifest(group)
+            if replace and column not in manifest:
+                raise KeyError("No column named {}".format(column))
+            if not replace and column in manifest:
+                raise ValueError("Duplicate logs: {}".format(column))
+            n_depth = group._f_get_child(list(manifest.values())[0]).nrows
+            if values.shape != (n_depth,):
+                raise ValueError("Expected {} values, got {}".format(
+                    n_depth, values.shape))
+            node = "col_{}".format(1 + max(
+                [-1] + [int(name[4:]) for name in group._v_children \
+                        if name.startswith("col_")]))
+            tmp_node = "tmp_{}".format(node)
+            if tmp_node in group:
+                h5.remove_node(group, tmp_node)
+            _write_column(h5, group, tmp_node, values)
+            h5.rename_node(group, node, name=tmp_node)
+            old_node = manifest.get(column)
+            manifest[column] = node
+            group._v_attrs[COLUMNS_ATTR] = json.dumps(manifest)
+            if old_node is not None:
+                h5.remove_node(group, old_node)
+
+    def _set_manifest(self, well_name, columns):
+        "reorder columns"
+        with self._open('a') as h5:
+            group = self._get_group(h5, well_name)
+            manifest = _manifest(group)
+            group._v_attrs[COLUMNS_ATTR] = json.dumps(OrderedDict(
+                (column, manifest[column]) for column in columns))
+
+    def to_columnar(self, well_name=None):
+        """
+        Convert wells stored as pandas fixed format frames to columnar layout
+
+        Parameters
+        ----------
+        well_name : str, optional
+            well to convert, None converts all wells
+        """
+        well_names = self.wells if well_name is None else [well_name]
+        for name in well_names:
+            with self._open('r') as h5:
+                columnar = _is_columnar(self._get_group(h5, name))
+            if not columnar:
+                self.add_well(name, self.get_well_data(name))
 
     def logs_into_well(self, well_name, logs_data_frame):
+        """
+        Add logs to a well, joined on depth, only new columns are written
+        """
         well_name = well_name.lower().replace('-', '_')
-        well_df = self.get_well_data(well_name)
-        logs_in_wells = well_df.columns.tolist()
+        columns = self.get_columns(well_name)
         logs_to_add = logs_data_frame.columns.tolist()
-        duplicate_columns = list(set(logs_in_wells).intersection(logs_to_add))
+        duplicate_columns = list(set(columns).intersection(logs_to_add))
         duplicate_columns.remove("Depth(m)")
-        if not duplicate_columns:
-            new_df = well_df.join(
-                logs_data_frame.set_index("Depth(m)"), on="Depth(m)")
-            self.remove_well(well_name)
-            self.add_well(well_name, new_df)
-        else:
+        if duplicate_columns:
             raise ValueError("Duplicate logs: {}".format(duplicate_columns))
+        depth_df = pd.DataFrame(
+            {"Depth(m)": self.get_column(well_name, "Depth(m)")})
+        new_df = depth_df.join(
+            logs_data_frame.set_index("Depth(m)"), on="Depth(m)")
+        if new_df.shape[0] != depth_df.shape[0]:
+            # duplicate depths in logs_data_frame add rows to the well
+            self.add_well(
+                well_name, self.get_well_data(well_name).join(
+                    logs_data_frame.set_index("Depth(m)"), on="Depth(m)"))
+            return
+        for column in new_df.columns[1:]:
+            self.add_column(well_name, str(column), new_df[column].values)
+
+    @contextmanager
+    def _open(self, mode):
+        h5 = tables.open_file(self.hdf5_file, mode=mode)
+        try:
+            yield h5
+        finally:
+            h5.close()
+
+    @staticmethod
+    def _get_group(h5, well_name):
+        well_name = well_name.strip('/')
+        if well_name not in h5.root or \
+                not _is_well(h5.root._f_get_child(well_name)):
+            raise KeyError("No well named {}".format(well_name))
+        return h5.root._f_get_child(well_name)
+
+
+def _write_well(h5, well_name, well_data_frame):
+    """
+    write well_data_frame as a columnar well into open file h5
+
+    the well is written into a temporary group renamed over the existing
+    well afterwards, so an interrupted write leaves the well as it was
+    """
+    well_name = well_name.lower().replace('-', '_')
+    tmp_name = "{}{}".format(TMP_PREFIX, well_name)
+    if tmp_name in h5.root:
+        h5.remove_node('/', tmp_name, recursive=True)
+    group = h5.create_group('/', tmp_name)
+    manifest = OrderedDict()
+    for i, column in enumerate(well_data_frame.columns):
+        node = "col_{}".format(i)
+        _write_column(h5, group, node, well_data_frame[column].values)
+        manifest[str(column)] = node
+    group._v_attrs[COLUMNS_ATTR] = json.dumps(manifest)
+    h5.rename_node('/', well_name, name=tmp_name, overwrite=True)
+
+
+def _parse_well_file(task):
+    """
+    read a LAS or pseudo-LAS file for `ingest`
+
+    Returns
+    -------
+    record : dict
+        ingest report entry of the file
+    data_frame : pandas.DataFrame or None
+        None if the file failed to parse
+    """
+    from pygeopressure.basic.las import LasData
+    index, path, well_name, usecols = task
+    record = OrderedDict([
+        ('index', index), ('file', path),
+        ('well', well_name.lower().replace('-', '_')), ('rows', 0),
+        ('logs', 0), ('parse_time', 0.), ('write_time', 0.),
+        ('error', None)])
+    start = time.time()
+    data_frame = None
+    try:
+        data_frame = _normalize_columns(LasData(path, usecols).data_frame)
+        record['rows'], record['logs'] = data_frame.shape[0], \
+            data_frame.shape[1] - 1
+    except Exception as ex:
+        data_frame = None
+        record['error'] = "{}: {}".format(type(ex).__name__, ex)
+    record['parse_time'] = time.time() - start
+    return record, data_frame
+
+
+def _normalize_columns(data_frame):
+    """
+    rename columns to "Log_Name(unit)" as expected by `LasData.find_logs`,
+    depth should be the first column and is renamed to "Depth(m)"
+    """
+    if data_frame is None:
+        raise ValueError("File not found")
+    columns = []
+    for column in data_frame.columns:
+        name, _, unit = str(column).partition('(')
+        columns.append("{}({})".format(
+            name.strip().replace(' ', '_'), unit.strip().rstrip(')').strip()))
+    if not columns or columns[0].split('(')[0].lower() != 'depth':
+        raise ValueError("First column should be depth")
+    if columns[0].lower() != 'depth(m)':
+        raise ValueError("Depth unit should be meter")
+    columns[0] = 'Depth(m)'
+    if len(set(columns)) != len(columns):
+        raise ValueError("Duplicate logs")
+    data_frame.columns = columns
+    return data_frame
+
+
+def _is_well(node):
+    return isinstance(node, tables.Group) and \
+        not node._v_name.startswith(TMP_PREFIX) and \
+        (COLUMNS_ATTR in node._v_attrs or 'pandas_type' in node._v_attrs)
+
+
+def _is_columnar(group):
+    return COLUMNS_ATTR in group._v_attrs
+
+
+def _manifest(group):
+    "ordered column name -> array node name"
+    return json.loads(
+        _to_str(group._v_attrs[COLUMNS_ATTR]), object_pairs_hook=OrderedDict)
+
+
+def _same_values(old, new):
+    old, new = np.asarray(old), np.asarray(new)
+    if old.shape != new.shape:
+        return False
+    if old.dtype.kind == 'f' and new.dtype.kind == 'f':
+        return np.array_equal(old, new) or bool(
+            np.all((old == new) | (np.isnan(old) & np.isnan(new))))
+    return np.array_equal(old, new)
+
+
+def _write_column(h5, group, node, values):
+    values = np.asarray(values)
+    if values.size == 0:
+        h5.create_array(group, node, obj=values)
+    else:
+        h5.create_carray(group, node, obj=values, filters=FILTERS)
+
+
+def _to_str(item):
+    return item.decode('utf-8') if isinstance(item, bytes) else str(item)
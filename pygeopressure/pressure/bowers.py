@@ -43,7 +43,9 @@ def bowers(v, obp, u, start_idx, a, b, vmax, end_idx=None):
     sigma_max = ((vmax-1524)/a)**(1/b)
     ves = ((v - 1524) / a)**(1.0 / b)
     ves_fe = sigma_max*(((v-1524)/a)**(1/b)/sigma_max)**u
-    ves[start_idx: end_idx] = ves_fe[start_idx: end_idx]
+    ves, ves_fe = np.broadcast_arrays(ves, ves_fe)
+    ves = np.array(ves)
+    ves[..., start_idx: end_idx] = ves_fe[..., start_idx: end_idx]
     return obp - ves
 
 
@@ -74,19 +76,28 @@ def bowers_varu(v, obp, u, start_idx, a, b, vmax, buf=20,
     end_buffer : int
         len of end buffer interval
     """
-    u_array = np.ones(v.shape)
-    u_array[start_idx: end_idx] = u
-    # start buffer
-    u_buffer = np.linspace(1, u, buf)
-    u_array[start_idx-buf+1: start_idx + 1] = u_buffer
-    # end buffer
-    if end_idx is not None:
-        u_array[end_idx: end_idx + end_buffer] = np.linspace(u, 1, end_buffer)
+    u_array = 1 + (np.asarray(u) - 1) * _varu_weight(
+        np.shape(v)[-1], start_idx, buf, end_idx, end_buffer)
     sigma_max = ((vmax-1524)/a)**(1/b)
     ves = sigma_max*(((v-1524)/a)**(1/b)/sigma_max)**u_array
     return obp - ves
 
 
+def _varu_weight(n, start_idx, buf, end_idx, end_buffer):
+    """
+    weight of u along a trace of n samples, u varies as 1 + (u - 1)*weight,
+    0 outside unloading zone, 1 inside with linear transitions in buffers
+    """
+    weight = np.zeros(n)
+    weight[start_idx: end_idx] = 1
+    # start buffer
+    weight[start_idx-buf+1: start_idx + 1] = np.linspace(0, 1, buf)
+    # end buffer
+    if end_idx is not None:
+        weight[end_idx: end_idx + end_buffer] = np.linspace(1, 0, end_buffer)
+    return weight
+
+
 def virgin_curve(sigma, a, b):
     "Virgin curve in Bowers' method."
     v0 = 1524
@@ -7,17 +7,41 @@ from __future__ import (absolute_import, division, print_function,
 
 __author__ = "yuhao"
 
+import warnings
+
 import numpy as np
 
-from pygeopressure.basic.indexes import InlineIndex, CdpIndex
-from pygeopressure.basic.optimizer import optimize_bowers_trace
+from pygeopressure.basic.optimizer import optimize_bowers_batch
 from pygeopressure.pressure.bowers import invert_virgin
 from pygeopressure.pressure.hydrostatic import hydrostatic_trace
-from pygeopressure.pressure.utils import create_seis, create_seis_info
+from pygeopressure.basic.seis_utils import (
+    create_seis, create_seis_info, process_inlines)
 
 
 def bowers_seis(output_name, obp_cube, vel_cube, a=None, b=None,
-                upper=None, lower=None, mode='simple'):
+                upper=None, lower=None, mode='simple', n_workers=1):
+    """
+    Parameters
+    ----------
+    output_name : str
+        output file name without extention
+    obp_cube : SeiSEGY
+        overburden pressure cube
+    vel_cube : SeiSEGY
+        velocity cube
+    a, b : float
+        bowers loading curve coefficients, used in 'simple' mode
+    upper, lower : Horizon
+        horizons bounding the interval for fitting loading curve, used in
+        'optimize' mode, lower can also be "bottom"
+    mode : {'simple', 'optimize'}
+    n_workers : int
+        number of processes
+
+    Returns
+    -------
+    SeiSEGY
+    """
     # create seismic object
     bowers_cube = create_seis(output_name, vel_cube)
     # create info file
@@ -25,51 +49,78 @@ def bowers_seis(output_name, obp_cube, vel_cube, a=None, b=None,
     # calculation
     if mode == 'optimize':
         # with optimization
-        bowers_optimize(bowers_cube, obp_cube, vel_cube, upper, lower)
+        converged = bowers_optimize(
+            bowers_cube, obp_cube, vel_cube, upper, lower,
+            n_workers=n_workers)
+        if not converged.all():
+            warnings.warn("Bowers curve fitting failed on {} of {} traces".format(
+                np.count_nonzero(~converged), converged.size))
     else:
         # simple
-        bowers_simple(bowers_cube, obp_cube, vel_cube, a, b)
+        bowers_simple(bowers_cube, obp_cube, vel_cube, a, b,
+                      n_workers=n_workers)
 
     return bowers_cube
 
 
-def bowers_simple(bowers_cube, obp_cube, vel_cube, a=None, b=None):
+def bowers_simple(bowers_cube, obp_cube, vel_cube, a=None, b=None,
+                  n_workers=1):
     """
     Bowers prediction with fixed a, b
     """
-    for inl in vel_cube.inlines():
-        obp_data_inline = obp_cube.data(InlineIndex(inl))
-        vel_data_inline = vel_cube.data(InlineIndex(inl))
+    process_inlines(
+        _bowers_simple_inline, [obp_cube, vel_cube], bowers_cube,
+        n_workers=n_workers, a=a, b=b)
 
-        bowers_inline = obp_data_inline - \
-            invert_virgin(vel_data_inline, a, b)
 
-        bowers_cube.update(InlineIndex(inl), bowers_inline)
+def _bowers_simple_inline(inl, obp_data_inline, vel_data_inline, a, b):
+    return obp_data_inline - invert_virgin(vel_data_inline, a, b)
 
 
-def bowers_optimize(bowers_cube, obp_cube, vel_cube, upper_hor, lower_hor):
+def bowers_optimize(bowers_cube, obp_cube, vel_cube, upper_hor, lower_hor,
+                    n_workers=1):
     """
     Bowers prediction with automatic coefficient optimization
+
+    Loading curve coefficients are fitted for all traces of an inline at once
+    with `optimize_bowers_batch`, pore pressure is written to bowers_cube as
+    in `bowers_simple`.
+
+    Returns
+    -------
+    converged : 2-d ndarray of bool
+        convergence flag of every trace with shape (nEast, nNorth), traces
+        failed to fit use coefficients of the nearest fitted trace
+    """
+    converged = process_inlines(
+        _bowers_optimize_inline, [obp_cube, vel_cube], bowers_cube,
+        n_workers=n_workers,
+        **_bowers_optimize_kwargs(vel_cube, upper_hor, lower_hor))
+    return np.array(converged)
+
+
+def _bowers_optimize_kwargs(vel_cube, upper_hor, lower_hor):
+    """
+    keyword arguments of `_bowers_optimize_inline` for a velocity cube
     """
     depth_tr = np.array(list(vel_cube.depths()))
     hydro_tr = hydrostatic_trace(depth_tr)
+    return dict(
+        depth_tr=depth_tr, hydro_tr=hydro_tr,
+        crlines=list(vel_cube.crlines()), upper_hor=upper_hor,
+        lower_hor=lower_hor)
+
 
-    for inl in vel_cube.inlines():
-        bowers_data_inline = np.zeros((vel_cube.nNorth, vel_cube.nDepth))
-        for i, crl in enumerate(vel_cube.crlines()):
-            vel_tr = vel_cube.data(CdpIndex((inl, crl)))
-            obp_tr = obp_cube.data(CdpIndex((inl, crl)))
-            depth_upper = upper_hor.get_cdp((inl, crl))
-            if lower_hor == "bottom":
-                depth_lower = depth_tr[-1]
-            else:
-                depth_lower = lower_hor.get_cdp((inl, crl))
-            try:
-                a, b = optimize_bowers_trace(
-                    depth_tr, vel_tr, obp_tr, hydro_tr,
-                    depth_upper, depth_lower)
-            except:
-                raise Exception("cdp{},{}".format(inl, crl))
-            bowers_data_inline[i] = invert_virgin(vel_tr, a, b)
-
-        bowers_cube.update(InlineIndex(inl), bowers_data_inline)
+def _bowers_optimize_inline(inl, obp_data_inline, vel_data_inline, depth_tr,
+                            hydro_tr, crlines, upper_hor, lower_hor):
+    depth_upper = upper_hor.get_inline(inl, crlines)
+    if lower_hor == "bottom":
+        depth_lower = depth_tr[-1]
+    else:
+        depth_lower = lower_hor.get_inline(inl, crlines)
+    a, b, converged = optimize_bowers_batch(
+        depth_tr, vel_data_inline, obp_data_inline, hydro_tr,
+        depth_upper, depth_lower)
+    es_data_inline = invert_virgin(
+        vel_data_inline, a[:, np.newaxis], b[:, np.newaxis])
+    return obp_data_inline - es_data_inline, converged
@@ -11,43 +11,118 @@ __author__ = "yuhao"
 
 import numpy as np
 from pygeopressure.basic.indexes import InlineIndex
-from pygeopressure.basic.optimizer import optimize_nct_trace
+from pygeopressure.basic.optimizer import optimize_nct_batch
 from pygeopressure.velocity.extrapolate import normal
 from pygeopressure.pressure.hydrostatic import hydrostatic_trace
-from pygeopressure.pressure.utils import create_seis, create_seis_info
+from pygeopressure.basic.seis_utils import (
+    create_seis, create_seis_info, process_inlines)
 from pygeopressure.pressure.eaton import sigma_eaton
 
 
 def eaton_seis(output_name, obp_cube, vel_cube, n,
-               a=None, b=None, upper=None, lower=None):
+               a=None, b=None, upper=None, lower=None, n_workers=1):
+    """
+    Eaton prediction with seismic velocity
+
+    Parameters
+    ----------
+    output_name : str
+        output file name without extention
+    obp_cube : SeiSEGY
+        overburden pressure cube
+    vel_cube : SeiSEGY
+        velocity cube
+    n : float
+        eaton exponent
+    a, b : float or 2-d ndarray
+        NCT coefficients, either constant or a map with shape
+        (nEast, nNorth) as returned by `nct_map`, if not given NCT is fitted
+        for every trace between upper and lower
+    upper, lower : Horizon
+        horizons bounding the interval for fitting NCT
+    n_workers : int
+        number of processes
+
+    Returns
+    -------
+    SeiSEGY
+    """
     # create seismic object
     eaton_cube = create_seis(output_name, vel_cube)
     # create info file
     create_seis_info(eaton_cube, output_name)
 
+    # actual calcualtion
+    process_inlines(
+        _eaton_inline, [obp_cube, vel_cube], eaton_cube, n_workers=n_workers,
+        **_eaton_kwargs(vel_cube, n, a, b, upper, lower))
+
+    return eaton_cube
+
+
+def nct_map(vel_cube, upper, lower):
+    """
+    Fit NCT for every trace of a velocity cube
+
+    Parameters
+    ----------
+    vel_cube : SeiSEGY
+        velocity cube
+    upper, lower : Horizon
+        horizons bounding the interval for fitting NCT
+
+    Returns
+    -------
+    a, b : 2-d ndarray
+        NCT coefficients with shape (nEast, nNorth)
+    """
+    depth = np.array(list(vel_cube.depths()))
+    crlines = list(vel_cube.crlines())
+    a_map = np.full((vel_cube.nEast, vel_cube.nNorth), np.nan)
+    b_map = np.full((vel_cube.nEast, vel_cube.nNorth), np.nan)
+    with vel_cube.session():
+        for i, inl in enumerate(vel_cube.inlines()):
+            a_map[i], b_map[i] = _fit_nct_inline(
+                inl, vel_cube.data(InlineIndex(inl)), depth, crlines,
+                upper, lower)
+    return a_map, b_map
+
+
+def _eaton_kwargs(vel_cube, n, a, b, upper, lower):
+    """
+    keyword arguments of `_eaton_inline` for a velocity cube
+    """
     depth = np.array(list(vel_cube.depths()))
 
     hydrostatic = hydrostatic_trace(depth)
     hydro_inline = np.tile(hydrostatic, (vel_cube.nNorth, 1))
 
-    # actual calcualtion
-    for inl in vel_cube.inlines():
-        obp_data_inline = obp_cube.data(InlineIndex(inl))
-        vel_data_inline = vel_cube.data(InlineIndex(inl))
-        vn_inline = np.zeros((vel_cube.nNorth, vel_cube.nDepth))
-        for i, crl in enumerate(vel_cube.crlines()):
-            cdp = (inl, crl)
-            start_depth = upper.get_cdp(cdp)
-            end_depth = lower.get_cdp(cdp)
+    if a is not None and b is not None:
+        a = np.broadcast_to(a, (vel_cube.nEast, vel_cube.nNorth))
+        b = np.broadcast_to(b, (vel_cube.nEast, vel_cube.nNorth))
 
-            a, b = optimize_nct_trace(
-                depth, vel_data_inline[i], start_depth, end_depth)
+    return dict(
+        depth=depth, hydro_inline=hydro_inline, n=n, a=a, b=b,
+        inline_range=(vel_cube.startInline, vel_cube.stepInline),
+        crlines=list(vel_cube.crlines()), upper=upper, lower=lower)
 
-            vn_inline[i] = normal(depth, a, b)
-        eaton_inline = obp_data_inline - \
-            sigma_eaton(
-                obp_data_inline-hydro_inline, vel_data_inline/vn_inline, n)
 
-        eaton_cube.update(InlineIndex(inl), eaton_inline)
+def _fit_nct_inline(inl, vel_data_inline, depth, crlines, upper, lower):
+    start_depth = upper.get_inline(inl, crlines)
+    end_depth = lower.get_inline(inl, crlines)
+    return optimize_nct_batch(depth, vel_data_inline, start_depth, end_depth)
 
-    return eaton_cube
+
+def _eaton_inline(inl, obp_data_inline, vel_data_inline, depth, hydro_inline,
+                  n, a, b, inline_range, crlines, upper, lower):
+    if a is None or b is None:
+        a_inline, b_inline = _fit_nct_inline(
+            inl, vel_data_inline, depth, crlines, upper, lower)
+    else:
+        row = (inl - inline_range[0]) // inline_range[1]
+        a_inline, b_inline = a[row], b[row]
+    vn_inline = normal(
+        depth, a_inline[:, np.newaxis], b_inline[:, np.newaxis])
+    return obp_data_inline - \
+        sigma_eaton(
+            obp_data_inline-hydro_inline, vel_data_inline/vn_inline, n)
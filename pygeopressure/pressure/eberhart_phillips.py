@@ -9,6 +9,9 @@ from __future__ import (absolute_import, division, print_function,
 
 __author__ = "yuhao"
 
+import warnings
+from collections import OrderedDict
+
 import numpy as np
 from scipy.interpolate import interp1d
 
@@ -30,6 +33,134 @@ def eberhart_phillips(sigma, phi, vsh, a_0, a_1, a_2, a_3, B):
     return a_0 + a_1 * phi + a_2*np.sqrt(vsh)+a_3*(sigma - np.exp(B*sigma))
 
 
+def invert_eberhart_phillips(vel, phi, vsh, a_0, a_1, a_2, a_3, B,
+                             method='newton', tol=1e-10):
+    """
+    calculate effective pressure with Eberhart-Phillips model
+
+    Parameters
+    ----------
+    vel : ndarray
+        velocity
+    phi : ndarray
+        porosity
+    vsh : ndarray
+        shale volume
+    a_0, a_1, a_2, a_3, B : float
+        coefficients
+    method : {'newton', 'table'}
+        see `invert_stress_term`
+    tol : float
+        tolerance of effective pressure for 'newton'
+
+    Returns
+    -------
+    ndarray
+        effective pressure, nan where there is no solution
+    """
+    return invert_stress_term(
+        (vel - a_0 - a_1 * phi - a_2 * np.sqrt(vsh)) / a_3, B, method, tol)
+
+
+def invert_stress_term(value, B, method='newton', tol=1e-10, max_iter=100):
+    """
+    solve :math:`\\sigma-e^{B \\sigma}=value` for non-negative effective
+    pressure on the branch where the left side increases
+
+    Parameters
+    ----------
+    value : ndarray
+        array of any shape
+    B : float
+        exponent
+    method : {'newton', 'table'}
+        'newton' iterates Newton steps kept within a bracket of the root,
+        falling back to bisection when a step leaves it; 'table'
+        interpolates the lookup table of integer pressures used by
+        `Han_lookup`, cached for every B
+    tol : float
+        tolerance of effective pressure for 'newton'
+    max_iter : int
+        maximum number of iterations for 'newton'
+
+    Returns
+    -------
+    ndarray or float
+        effective pressure, nan where there is no solution or 'newton' did
+        not converge within max_iter (with a warning), float for scalar
+        value
+    """
+    value = np.asarray(value, dtype=np.float64)
+    if method == 'table':
+        table, sigma = _han_table(B)
+        return np.interp(
+            value, table, sigma, left=np.nan, right=np.nan)[()]
+    if method != 'newton':
+        raise ValueError("Unknown method {}".format(method))
+
+    def residual(sigma):
+        return sigma - np.exp(B * sigma) - value
+
+    # bracket [low, high] of the root
+    if B > 0:
+        # the left side increases up to its maximum at -ln(B)/B
+        high = np.full(value.shape, max(-np.log(B) / B, 0.))
+        low = np.zeros(value.shape)
+    else:
+        # sigma - 1 <= sigma - exp(B sigma) <= sigma
+        high = value + 1
+        low = np.maximum(value, 0)
+    with np.errstate(invalid='ignore', over='ignore'):
+        valid = (residual(low) <= 0) & (residual(high) >= 0)
+    low, high = low[valid], high[valid]
+    target = value[valid]
+    sigma = (low + high) / 2
+    converged = np.zeros(sigma.shape, dtype=bool)
+    for _ in range(max_iter):
+        diff = sigma - np.exp(B * sigma) - target
+        low = np.where(diff < 0, sigma, low)
+        high = np.where(diff > 0, sigma, high)
+        step = sigma - diff / (1 - B * np.exp(B * sigma))
+        inside = (step > low) & (step < high)
+        new_sigma = np.where(inside, step, (low + high) / 2)
+        converged = np.abs(new_sigma - sigma) < tol
+        sigma = new_sigma
+        if converged.all():
+            break
+    if not converged.all():
+        warnings.warn("Effective pressure did not converge on {} of {} "
+                      "samples".format(np.count_nonzero(~converged),
+                                       converged.size))
+        sigma[~converged] = np.nan
+    result = np.full(value.shape, np.nan)
+    result[valid] = sigma
+    return result[()]
+
+
+_TABLES = OrderedDict()
+_TABLE_CACHE_SIZE = 16
+
+
+def _han_table(B):
+    """
+    read-only lookup table of sigma - exp(B sigma) for integer sigma from 0
+    to 999, sorted by the former, the tables of recently used B are cached
+    """
+    if B in _TABLES:
+        _TABLES[B] = _TABLES.pop(B)
+        return _TABLES[B]
+    sigma = np.arange(1000, dtype=np.float64)
+    table = sigma - np.exp(B * sigma)
+    order = np.argsort(table)
+    table, sigma = table[order], sigma[order]
+    table.flags.writeable = False
+    sigma.flags.writeable = False
+    _TABLES[B] = (table, sigma)
+    while len(_TABLES) > _TABLE_CACHE_SIZE:
+        _TABLES.popitem(last=False)
+    return table, sigma
+
+
 def eberhart_phillips_univariate(sigma, a_0, a_1, B):
     """
     calculate effective pressure with the ratio of velocity and normal velocity
@@ -49,9 +180,8 @@ def eberhart_phillips_univariate(sigma, a_0, a_1, B):
 
 class Han_lookup(object):
     def __init__(self, B):
-        y = np.arange(1000)
-        x = y - np.exp(B*y)
-        self.func = interp1d(x, y)#, kind='cubic')
+        x, y = _han_table(B)
+        self.func = interp1d(x, y, assume_sorted=True)#, kind='cubic')
 
     def __call__(self, value):
         return self.func(value)
@@ -0,0 +1,65 @@
+# -*- coding: utf-8 -*-
+"""
+Routines for Eberhart-Phillips seismic pressure prediction
+"""
+from __future__ import (absolute_import, division, print_function,
+                        unicode_literals)
+
+__author__ = "yuhao"
+
+from pygeopressure.pressure.eberhart_phillips import invert_eberhart_phillips
+from pygeopressure.basic.seis_utils import (
+    create_seis, create_seis_info, process_inlines)
+
+
+def eberhart_phillips_seis(output_name, obp_cube, vel_cube, phi_cube,
+                           vsh_cube, a_0, a_1, a_2, a_3, B, method='newton',
+                           tol=1e-10, n_workers=1):
+    """
+    Eberhart-Phillips prediction with seismic velocity, porosity and shale
+    volume
+
+    Parameters
+    ----------
+    output_name : str
+        output file name without extention
+    obp_cube : SeiSEGY
+        overburden pressure cube
+    vel_cube : SeiSEGY
+        velocity cube
+    phi_cube : SeiSEGY
+        porosity cube
+    vsh_cube : SeiSEGY
+        shale volume cube
+    a_0, a_1, a_2, a_3, B : float
+        Eberhart-Phillips coefficients
+    method : {'newton', 'table'}
+        inversion of effective pressure, see `invert_stress_term`
+    tol : float
+        tolerance of effective pressure for 'newton'
+    n_workers : int
+        number of processes
+
+    Returns
+    -------
+    SeiSEGY
+    """
+    # create seismic object
+    eberhart_phillips_cube = create_seis(output_name, vel_cube)
+    # create info file
+    create_seis_info(eberhart_phillips_cube, output_name)
+
+    process_inlines(
+        _eberhart_phillips_inline, [obp_cube, vel_cube, phi_cube, vsh_cube],
+        eberhart_phillips_cube, n_workers=n_workers,
+        coefficients=(a_0, a_1, a_2, a_3, B), method=method, tol=tol)
+
+    return eberhart_phillips_cube
+
+
+def _eberhart_phillips_inline(inl, obp_data_inline, vel_data_inline,
+                              phi_data_inline, vsh_data_inline, coefficients,
+                              method, tol):
+    return obp_data_inline - invert_eberhart_phillips(
+        vel_data_inline, phi_data_inline, vsh_data_inline, *coefficients,
+        method=method, tol=tol)
@@ -9,7 +9,9 @@ __author__ = "yuhao"
 
 import numpy as np
 from pygeopressure.velocity.conversion import (
-    twt2depth, rms2int, int2avg, int2rms)
+    twt2depth, twt2depth_batch, int2avg, int2rms)
+from pygeopressure.basic.seis_utils import (
+    create_seis, create_seis_info, process_inlines)
 
 
 def fillippone(v_int, v_max, v_min, obp, n=1):
@@ -68,21 +70,23 @@ def v_max_min(twt, v_rms, v0=1524):
 
     Parameters
     ----------
-    twt : 1-d ndarray
-        two-way-time
-    v_rms : 1-d ndarray
-        RMS velocity in time domain
+    twt : ndarray
+        two-way-time, 1-d or of the same shape as v_rms
+    v_rms : ndarray
+        RMS velocity in time domain, time is the last axis
     v0 : scalar
 
     Returns
     -------
-    v_max : 1-d ndarray
+    v_max : ndarray
         maximum velocity in time domain
-    v_min : 1-d ndarray
+    v_min : ndarray
         minimum velocity in time domain
     """
-    K = np.zeros_like(v_rms)
-    K[1:] = (v_rms[1:] - v_rms[:-2]) / (twt[1:] - twt[:-2])
+    twt = np.asarray(twt, dtype=np.float64)
+    v_rms = np.asarray(v_rms, dtype=np.float64)
+    K = np.zeros(np.broadcast(twt, v_rms).shape)
+    K[..., 1:] = np.diff(v_rms, axis=-1) / np.diff(twt, axis=-1)
 
     v_max = 1.4 * v0 + 3 * K * twt
     v_min = 0.7 * v0 + 0.5 * K * twt
@@ -119,16 +123,115 @@ def fillippone_from_vint_time(
 
     v_avg_t = int2avg(twt, v_int_t)
 
-    depth, v_max = twt2depth(
-        twt, v_avg_t, v_max_t,
-        stepDepth=stepDepth, startDepth=startDepth, endDepth=endDepth)
-    _, v_min = twt2depth(
-        twt, v_avg_t, v_min_t,
-        stepDepth=stepDepth, startDepth=startDepth, endDepth=endDepth)
-    _, v_int = twt2depth(
-        twt, v_avg_t, v_int_t,
+    # the three velocities share one depth mapping and interpolator
+    depth, (v_max, v_min, v_int) = twt2depth(
+        twt, v_avg_t, np.stack([v_max_t, v_min_t, v_int_t]),
         stepDepth=stepDepth, startDepth=startDepth, endDepth=endDepth)
 
     pressure_fillip = fillippone(v_int, v_max, v_min, obp_d, n)
 
     return depth, pressure_fillip
+
+
+def fillippone_seis(output_name, obp_cube, vint_cube, n=1, v0=1524,
+                    domain='depth', kind='linear', n_workers=1):
+    """
+    Fillippone prediction with seismic interval velocity
+
+    Parameters
+    ----------
+    output_name : str
+        output file name without extention
+    obp_cube : SeiSEGY
+        overburden pressure cube in depth domain, output cube has the same
+        geometry
+    vint_cube : SeiSEGY
+        interval velocity cube
+    n : float
+        exponent for modified Fillippone equation
+    v0 : scalar
+        velocity for maximum and minimum velocity, see `v_max_min`
+    domain : {'depth', 'time'}
+        domain of vint_cube. A depth domain cube has the geometry of
+        obp_cube, its two-way-time is integrated from velocity. A time domain
+        cube has z in ms, velocities are converted to depth of obp_cube with
+        `twt2depth_batch`.
+    kind : {'linear', 'pchip'}
+        interpolation of time to depth conversion
+    n_workers : int
+        number of processes
+
+    Returns
+    -------
+    SeiSEGY
+    """
+    if domain not in ('depth', 'time'):
+        raise ValueError("Unknown domain {}".format(domain))
+    # create seismic object
+    fillippone_cube = create_seis(output_name, obp_cube)
+    # create info file
+    create_seis_info(fillippone_cube, output_name)
+
+    twt = np.array(list(vint_cube.depths())) if domain == 'time' else None
+    process_inlines(
+        _fillippone_inline, [obp_cube, vint_cube], fillippone_cube,
+        n_workers=n_workers, twt=twt,
+        depth=np.array(list(obp_cube.depths())), n=n, v0=v0, kind=kind)
+
+    return fillippone_cube
+
+
+def _fillippone_inline(inl, obp_data_inline, vint_data_inline, twt, depth,
+                       n, v0, kind):
+    v_int = np.asarray(vint_data_inline, dtype=np.float64)
+    with np.errstate(invalid='ignore'):
+        valid = np.isfinite(v_int) & (v_int > 0)
+    # time integration runs through invalid samples with interpolated
+    # velocity, their output is nan
+    v_filled = _fill_invalid(v_int, valid)
+    v_int = np.where(valid, v_int, np.nan)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        if twt is None:
+            twt_inline = _depth2twt(depth, v_filled)
+            v_max, v_min = v_max_min(
+                twt_inline, int2rms(twt_inline, v_filled), v0)
+            pressure = fillippone(v_int, v_max, v_min, obp_data_inline, n)
+        else:
+            v_max_t, v_min_t = v_max_min(twt, int2rms(twt, v_filled), v0)
+            v_int, v_max, v_min = twt2depth_batch(
+                twt, int2avg(twt, v_filled), [v_int, v_max_t, v_min_t],
+                depth, kind)
+            pressure = fillippone(v_int, v_max, v_min, obp_data_inline, n)
+    if twt is None:
+        pressure[~valid] = np.nan
+    pressure[~np.isfinite(pressure)] = np.nan
+    return pressure
+
+
+def _fill_invalid(v_int, valid):
+    """
+    linearly interpolate invalid samples of every trace from valid ones,
+    traces without valid samples are nan
+    """
+    if valid.all():
+        return v_int
+    filled = np.full(v_int.shape, np.nan)
+    positions = np.arange(v_int.shape[-1])
+    for idx in np.ndindex(v_int.shape[:-1]):
+        trace_valid = valid[idx]
+        if trace_valid.any():
+            filled[idx] = np.interp(
+                positions, positions[trace_valid], v_int[idx][trace_valid])
+    return filled
+
+
+def _depth2twt(depth, v_int):
+    """
+    two-way-time (ms) of depth samples, velocity of the first sample extends
+    to the surface
+    """
+    depth = np.asarray(depth, dtype=np.float64)
+    thickness = np.empty(depth.shape)
+    thickness[0] = depth[0]
+    thickness[1:] = np.diff(depth)
+    return 2000 * np.cumsum(thickness / v_int, axis=-1)
@@ -11,6 +11,8 @@ __author__ = "yuhao"
 
 import numpy as np
 
+from pygeopressure.pressure.bowers import _varu_weight
+
 
 def multivariate_virgin(sigma, phi, vsh, a_0, a_1, a_2, a_3, B):
     """
@@ -101,7 +103,9 @@ def effective_stress_multivariate(vel, phi, vsh, a_0, a_1, a_2, a_3,
     ves = invert_multivariate_virgin(vel, phi, vsh, a_0, a_1, a_2, a_3, B)
     unloading = invert_multivariate_unloading(
         vel, phi, vsh, a_0, a_1, a_2, a_3, B, U, vmax)
-    ves[start_idx: end_idx] = unloading[start_idx: end_idx]
+    ves, unloading = np.broadcast_arrays(ves, unloading)
+    ves = np.array(ves)
+    ves[..., start_idx: end_idx] = unloading[..., start_idx: end_idx]
     return ves
 
 
@@ -130,14 +134,8 @@ def pressure_multivariate_varu(obp, vel, phi, vsh, a_0, a_1, a_2, a_3,
 def effective_stress_multivariate_varu(vel, phi, vsh, a_0, a_1, a_2, a_3,
                                        B, U, vmax, start_idx, buf=20,
                                        end_idx=None, end_buffer=10):
-    u_array = np.ones(vel.shape)
-    u_array[start_idx: end_idx] = U
-    # start buffer
-    u_buffer = np.linspace(1, U, buf)
-    u_array[start_idx-buf+1: start_idx + 1] = u_buffer
-    # end buffer
-    if end_idx is not None:
-        u_array[end_idx: end_idx + end_buffer] = np.linspace(U, 1, end_buffer)
+    u_array = 1 + (np.asarray(U) - 1) * _varu_weight(
+        np.shape(vel)[-1], start_idx, buf, end_idx, end_buffer)
     ves = invert_multivariate_unloading(vel, phi, vsh, a_0, a_1, a_2, a_3,
                                         B, u_array, vmax)
     return ves
@@ -0,0 +1,131 @@
+# -*- coding: utf-8 -*-
+"""
+Routines for multivariate seismic pressure prediction
+"""
+from __future__ import (absolute_import, division, print_function,
+                        unicode_literals)
+
+__author__ = "yuhao"
+
+import numpy as np
+
+from pygeopressure.pressure.multivariate import (
+    invert_multivariate_virgin, invert_multivariate_unloading)
+from pygeopressure.basic.seis_utils import (
+    create_seis, create_seis_info, process_inlines)
+
+
+def multivariate_seis(output_name, obp_cube, vel_cube, phi_cube, vsh_cube,
+                      a_0, a_1, a_2, a_3, B, U=1, vmax=None, upper=None,
+                      lower=None, buf=20, end_buffer=10, n_workers=1):
+    """
+    Multivariate prediction with seismic velocity, porosity and shale volume
+
+    Parameters
+    ----------
+    output_name : str
+        output file name without extention
+    obp_cube : SeiSEGY
+        overburden pressure cube
+    vel_cube : SeiSEGY
+        velocity cube
+    phi_cube : SeiSEGY
+        porosity cube
+    vsh_cube : SeiSEGY
+        shale volume cube
+    a_0, a_1, a_2, a_3, B : float
+        multivariate virgin curve coefficients
+    U : float
+        unloading parameter
+    vmax : float
+        velocity at which unloading starts
+    upper : Horizon, optional
+        top of unloading zone, no unloading if not given
+    lower : Horizon, optional
+        bottom of unloading zone, it extends to the bottom if not given
+    buf, end_buffer : int
+        number of samples over which U changes linearly from 1 above the top
+        and back to 1 below the bottom of unloading zone
+    n_workers : int
+        number of processes
+
+    Returns
+    -------
+    SeiSEGY
+    """
+    if upper is not None and vmax is None:
+        raise ValueError("vmax is needed for unloading")
+    # create seismic object
+    multivariate_cube = create_seis(output_name, vel_cube)
+    # create info file
+    create_seis_info(multivariate_cube, output_name)
+
+    process_inlines(
+        _multivariate_inline, [obp_cube, vel_cube, phi_cube, vsh_cube],
+        multivariate_cube, n_workers=n_workers,
+        coefficients=(a_0, a_1, a_2, a_3, B), U=U, vmax=vmax,
+        depth=np.array(list(vel_cube.depths())),
+        crlines=list(vel_cube.crlines()), upper=upper, lower=lower, buf=buf,
+        end_buffer=end_buffer)
+
+    return multivariate_cube
+
+
+def _unloading_weight(depth, top, bottom=None, buf=20, end_buffer=10):
+    """
+    weight of unloading of traces, U of a sample is `1 + (U - 1) * weight`
+
+    Parameters
+    ----------
+    depth : 1-d ndarray
+        depth of samples, regularly sampled
+    top : 1-d ndarray
+        depth of top of unloading zone of every trace
+    bottom : 1-d ndarray, optional
+        depth of bottom of unloading zone of every trace, unloading extends
+        to the bottom of traces if not given
+    buf, end_buffer : int
+        number of samples of linear transition from 0 to 1 ending at top,
+        and from 1 to 0 starting at bottom
+
+    Returns
+    -------
+    2-d ndarray
+        weight with shape (len(top), len(depth)), 1 inside unloading zone, 0
+        outside and on traces with nan top
+    """
+    step = depth[1] - depth[0]
+    # position in samples relative to top and bottom
+    below_top = (depth - np.asarray(top, dtype=np.float64)[:, np.newaxis]) / \
+        step
+    weight = _ramp(below_top, buf)
+    if bottom is not None:
+        above_bottom = (np.asarray(bottom, dtype=np.float64)[:, np.newaxis] - \
+                        depth) / step
+        weight = np.minimum(weight, _ramp(above_bottom, end_buffer))
+    return np.nan_to_num(weight)
+
+
+def _ramp(position, length):
+    "0 before position -(length - 1), rising linearly to 1 at position 0"
+    with np.errstate(invalid='ignore'):
+        if length > 1:
+            return np.clip((position + length - 1) / (length - 1), 0, 1)
+        return np.where(np.isnan(position), np.nan,
+                        (position >= 0).astype(np.float64))
+
+
+def _multivariate_inline(inl, obp_data_inline, vel_data_inline,
+                         phi_data_inline, vsh_data_inline, coefficients, U,
+                         vmax, depth, crlines, upper, lower, buf, end_buffer):
+    if upper is None:
+        ves = invert_multivariate_virgin(
+            vel_data_inline, phi_data_inline, vsh_data_inline, *coefficients)
+    else:
+        bottom = None if lower is None else lower.get_inline(inl, crlines)
+        weight = _unloading_weight(
+            depth, upper.get_inline(inl, crlines), bottom, buf, end_buffer)
+        ves = invert_multivariate_unloading(
+            vel_data_inline, phi_data_inline, vsh_data_inline,
+            *coefficients, U=1 + (U - 1) * weight, vmax=vmax)
+    return obp_data_inline - ves
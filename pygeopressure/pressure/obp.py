@@ -10,8 +10,8 @@ __author__ = "yuhao"
 from collections import OrderedDict
 import numpy as np
 from pygeopressure.basic.well_log import Log
-from pygeopressure.basic.indexes import InlineIndex
-from pygeopressure.pressure.utils import create_seis, create_seis_info
+from pygeopressure.basic.seis_utils import (
+    create_seis, create_seis_info, process_inlines)
 
 
 def traugott(z, a, b):
@@ -80,12 +80,14 @@ def gardner(v, c=0.31, d=0.25):
     return c * v**d
 
 
-def gardner_seis(output_name, vel_cube, c=0.31, d=0.25):
+def gardner_seis(output_name, vel_cube, c=0.31, d=0.25, n_workers=1):
     """
     Parameters
     ----------
     output_name : str
         output file name without extention
+    n_workers : int
+        number of processes
 
     Returns
     -------
@@ -94,14 +96,16 @@ def gardner_seis(output_name, vel_cube, c=0.31, d=0.25):
     den_cube = create_seis(output_name, vel_cube)
     create_seis_info(den_cube, output_name)
     # calculate density
-    for inl in vel_cube.inlines():
-        vel_inline = vel_cube.data(InlineIndex(inl))
-        den_inline = gardner(vel_inline, c, d)
-        den_cube.update(InlineIndex(inl), den_inline)
+    process_inlines(
+        _gardner_inline, [vel_cube], den_cube, n_workers=n_workers, c=c, d=d)
 
     return den_cube
 
 
+def _gardner_inline(inl, vel_inline, c, d):
+    return gardner(vel_inline, c, d)
+
+
 def overburden_pressure(depth, rho, kelly_bushing=41, depth_w=82, rho_w=1.01):
     """
     Calculate Overburden Pressure
@@ -163,8 +167,8 @@ def obp_well(den_log, kb=41, wd=82, rho_w=1.01):
     out : Log
         Log containing overburden pressure in mPa
     """
-    depth = np.array(den_log.depth)
-    rho = np.array(den_log.data)
+    depth = np.asarray(den_log.depth)
+    rho = np.asarray(den_log.data)
     obp = overburden_pressure(
         depth, rho, kelly_bushing=kb, depth_w=wd, rho_w=rho_w)
 
@@ -196,20 +200,36 @@ def obp_trace(rho, step):
     return np.cumsum(data * 9.8 * step * 0.001)
 
 
-def obp_seis(output_name, den_cube):
+def obp_seis(output_name, den_cube, n_workers=1):
+    """
+    Parameters
+    ----------
+    output_name : str
+        output file name without extention
+    den_cube : SeiSEGY
+        density cube
+    n_workers : int
+        number of processes
+
+    Returns
+    -------
+    SeiSEGY
+    """
     # create seismic object
     obp_cube = create_seis(output_name, den_cube)
     # create info file
     create_seis_info(obp_cube, output_name)
     # calculate obp
-    step = den_cube.stepDepth
-    for inl in den_cube.inlines():
-        den_inline = den_cube.data(InlineIndex(inl))
-        obp_inline = obp_section(den_inline, step)
-        obp_cube.update(InlineIndex(inl), obp_inline)
+    process_inlines(
+        _obp_inline, [den_cube], obp_cube, n_workers=n_workers,
+        step=den_cube.stepDepth)
 
     return obp_cube
 
 
+def _obp_inline(inl, den_inline, step):
+    return obp_section(den_inline, step)
+
+
 def obp_section(rho_inline, step):
     return np.cumsum(rho_inline * 9.8 * step * 0.001, axis=1)
@@ -0,0 +1,229 @@
+# -*- coding: utf-8 -*-
+"""
+Pipeline chaining seismic pressure calculation stages inline by inline
+"""
+from __future__ import (absolute_import, division, print_function,
+                        unicode_literals)
+
+__author__ = "yuhao"
+
+from collections import OrderedDict
+
+import numpy as np
+
+from pygeopressure.pressure.obp import (
+    traugott_trend, _gardner_inline, _obp_inline)
+from pygeopressure.pressure.hydrostatic import hydrostatic_trace
+from pygeopressure.pressure.eaton_seis import _eaton_inline, _eaton_kwargs
+from pygeopressure.pressure.bowers_seis import (
+    _bowers_simple_inline, _bowers_optimize_inline, _bowers_optimize_kwargs)
+from pygeopressure.pressure.fillippone import _fillippone_inline
+from pygeopressure.basic.seis_utils import (
+    create_seis, create_seis_info, process_inlines)
+
+
+class Pipeline(object):
+    """
+    Chain of pressure calculation stages computed inline by inline
+
+    Every inline of the input cubes is read once and passed through all
+    stages in memory, only stages added with `save=True` are written to
+    disk. So a velocity -> density -> OBP -> pressure run reads the velocity
+    cube and writes the pressure cube, instead of writing and reading back
+    every intermediate cube.
+
+    Parameters
+    ----------
+    vel_cube : SeiSEGY
+        velocity cube, available to stages as input "velocity", it is also
+        the template of output cubes
+
+    Examples
+    --------
+    >>> pipe = Pipeline(vel_cube)
+    >>> pipe.gardner().obp().eaton(3, upper=upper_hor, lower=lower_hor)
+    >>> cubes = pipe.run()
+    >>> eaton_cube = cubes['eaton']
+    """
+    def __init__(self, vel_cube):
+        self.vel_cube = vel_cube
+        self.cubes = OrderedDict([("velocity", vel_cube)])
+        self.stages = OrderedDict()
+        self.extras = dict()
+
+    def __str__(self):
+        return "Pipeline({})".format(" -> ".join(
+            list(self.cubes.keys()) + list(self.stages.keys())))
+
+    def add_cube(self, name, cube):
+        """
+        Add an existing cube as input available to stages
+
+        Parameters
+        ----------
+        name : str
+        cube : SeiSEGY
+        """
+        self._check_name(name)
+        self.cubes[name] = cube
+        return self
+
+    def add_stage(self, name, func, inputs, save=False, **kwargs):
+        """
+        Add a stage
+
+        Parameters
+        ----------
+        name : str
+            name of the stage, also name of the output file if saved
+        func : callable
+            module level function called as
+            `func(inline, *input_inline_data, **kwargs)`, it returns the
+            2-d ndarray of the stage, optionally followed by other values
+            which are collected in `extras`
+        inputs : list of str
+            names of cubes or previous stages used as input
+        save : bool
+            whether to write the result of this stage to disk
+        kwargs :
+            additional keyword arguments passed to func
+        """
+        self._check_name(name)
+        for input_name in inputs:
+            if input_name not in self.cubes and input_name not in self.stages:
+                raise ValueError("Unknown input {}".format(input_name))
+        self.stages[name] = (func, list(inputs), save, kwargs)
+        return self
+
+    def gardner(self, name="density", vel="velocity", c=0.31, d=0.25,
+                save=False):
+        """
+        Add density stage with Gardner equation
+        """
+        return self.add_stage(name, _gardner_inline, [vel], save, c=c, d=d)
+
+    def traugott(self, a, b, kb=0, wd=0, name="density", save=False):
+        """
+        Add density stage with Traugott equation
+        """
+        depth = np.array(list(self.vel_cube.depths()))
+        return self.add_stage(
+            name, _traugott_inline, ["velocity"], save,
+            den_trace=traugott_trend(depth, a, b, kb, wd))
+
+    def obp(self, name="obp", den="density", save=False):
+        """
+        Add overburden pressure stage
+        """
+        return self.add_stage(
+            name, _obp_inline, [den], save, step=self.vel_cube.stepDepth)
+
+    def hydrostatic(self, name="hydrostatic", rho=1.01, save=False):
+        """
+        Add hydrostatic pressure stage
+        """
+        depth = np.array(list(self.vel_cube.depths()))
+        return self.add_stage(
+            name, _hydrostatic_inline, ["velocity"], save,
+            hydro_trace=hydrostatic_trace(depth, rho))
+
+    def eaton(self, n, a=None, b=None, upper=None, lower=None, name="eaton",
+              obp="obp", vel="velocity", save=True):
+        """
+        Add Eaton pressure stage, see `eaton_seis`
+        """
+        return self.add_stage(
+            name, _eaton_inline, [obp, vel], save,
+            **_eaton_kwargs(self.vel_cube, n, a, b, upper, lower))
+
+    def bowers(self, a=None, b=None, upper=None, lower=None, mode='simple',
+               name="bowers", obp="obp", vel="velocity", save=True):
+        """
+        Add Bowers pressure stage, see `bowers_seis`
+
+        In 'optimize' mode the convergence flags of every trace are stored
+        in `extras[name]` after running.
+        """
+        if mode == 'optimize':
+            return self.add_stage(
+                name, _bowers_optimize_inline, [obp, vel], save,
+                **_bowers_optimize_kwargs(self.vel_cube, upper, lower))
+        else:
+            return self.add_stage(
+                name, _bowers_simple_inline, [obp, vel], save, a=a, b=b)
+
+    def fillippone(self, n=1, v0=1524, name="fillippone", obp="obp",
+                   vel="velocity", save=True):
+        """
+        Add Fillippone pressure stage, see `fillippone_seis`
+
+        All cubes of a pipeline share the geometry of the velocity cube, so
+        vel is an interval velocity cube in depth domain.
+        """
+        return self.add_stage(
+            name, _fillippone_inline, [obp, vel], save, twt=None,
+            depth=np.array(list(self.vel_cube.depths())), n=n, v0=v0,
+            kind='linear')
+
+    def run(self, n_workers=1):
+        """
+        Compute all stages
+
+        Parameters
+        ----------
+        n_workers : int
+            number of processes
+
+        Returns
+        -------
+        OrderedDict
+            saved stage name -> SeiSEGY
+        """
+        saved = [name for name, stage in self.stages.items() if stage[2]]
+        if not saved:
+            raise ValueError("No stage to save")
+        outputs = OrderedDict()
+        for name in saved:
+            outputs[name] = create_seis(name, self.vel_cube)
+            create_seis_info(outputs[name], name)
+        # only read cubes some stage needs
+        needed = set()
+        for stage in self.stages.values():
+            needed.update(stage[1])
+        input_names = [name for name in self.cubes if name in needed]
+
+        extras = process_inlines(
+            _pipeline_inline, [self.cubes[name] for name in input_names],
+            list(outputs.values()), n_workers=n_workers,
+            input_names=input_names, stages=list(self.stages.items()),
+            saved=saved)
+
+        self.extras = dict()
+        for name in self.stages:
+            if extras and name in extras[0]:
+                self.extras[name] = np.array([extra[name] for extra in extras])
+        return outputs
+
+    def _check_name(self, name):
+        if name in self.cubes or name in self.stages:
+            raise ValueError("{} already exists".format(name))
+
+
+def _pipeline_inline(inl, *input_data, **kwargs):
+    data = dict(zip(kwargs['input_names'], input_data))
+    extras = dict()
+    for name, (func, inputs, _, stage_kwargs) in kwargs['stages']:
+        result = func(inl, *[data[key] for key in inputs], **stage_kwargs)
+        if isinstance(result, tuple):
+            result, extra = result[0], result[1:]
+            extras[name] = extra[0] if len(extra) == 1 else extra
+        data[name] = result
+    return tuple(data[name] for name in kwargs['saved']) + (extras,)
+
+
+def _traugott_inline(inl, vel_inline, den_trace):
+    return np.tile(den_trace, (vel_inline.shape[0], 1))
+
+
+def _hydrostatic_inline(inl, vel_inline, hydro_trace):
+    return np.tile(hydro_trace, (vel_inline.shape[0], 1))
@@ -0,0 +1,242 @@
+# -*- coding: utf-8 -*-
+"""
+Ensemble evaluation of pressure models for uncertainty estimation
+
+Coefficient realizations are drawn from the covariance returned by the
+optimizers (`return_cov=True`) or from bootstrap resamples of the fitted
+points, then a model (`eaton`, `bowers`, `bowers_varu`,
+`pressure_multivariate`, ...) is evaluated for all realizations with
+broadcasting, and percentiles of the results are returned.
+"""
+from __future__ import (absolute_import, division, print_function,
+                        unicode_literals)
+
+__author__ = "yuhao"
+
+import warnings
+from collections import OrderedDict
+
+import numpy as np
+from scipy.optimize import curve_fit
+
+from pygeopressure.basic.well_log import Log
+from pygeopressure.basic.seis_utils import process_inlines
+
+
+def sample_coefficients(mean, cov, size=1000, seed=None):
+    """
+    Draw coefficient realizations from a multivariate normal distribution
+
+    Parameters
+    ----------
+    mean : 1-d ndarray
+        fitted coefficients
+    cov : 2-d ndarray
+        covariance of coefficients, e.g. returned by optimizers with
+        `return_cov=True`
+    size : int
+        number of realizations
+    seed : int, optional
+        seed of random number generator
+
+    Returns
+    -------
+    ndarray
+        shape (size, len(mean))
+    """
+    mean = np.atleast_1d(np.asarray(mean, dtype=np.float64))
+    cov = np.asarray(cov, dtype=np.float64).reshape((mean.size, mean.size))
+    return np.random.RandomState(seed).multivariate_normal(mean, cov, size)
+
+
+def bootstrap_coefficients(func, xdata, ydata, size=1000, p0=None, seed=None):
+    """
+    Coefficients of func fitted to bootstrap resamples of (xdata, ydata)
+
+    Parameters
+    ----------
+    func : callable
+        model function as accepted by `scipy.optimize.curve_fit`, e.g.
+        `virgin_curve` or `power_eaton`
+    xdata, ydata : 1-d ndarray
+        points to resample
+    size : int
+        number of realizations
+    p0 : list, optional
+        initial coefficients
+    seed : int, optional
+        seed of random number generator
+
+    Returns
+    -------
+    ndarray
+        shape (size, n_coefficients), nan for resamples failing to fit
+    """
+    xdata = np.asarray(xdata, dtype=np.float64)
+    ydata = np.asarray(ydata, dtype=np.float64)
+    popt, _ = curve_fit(func, xdata, ydata, p0=p0)
+    idx = np.random.RandomState(seed).randint(
+        0, xdata.shape[0], (size, xdata.shape[0]))
+    coefficients = np.full((size, popt.size), np.nan)
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore')
+        for i in range(size):
+            try:
+                coefficients[i], _ = curve_fit(
+                    func, xdata[idx[i]], ydata[idx[i]], p0=popt)
+            except (RuntimeError, ValueError, TypeError):
+                pass
+    return coefficients
+
+
+def ensemble(func, coefficients, args=(), kwargs=None,
+             percentiles=(10, 50, 90), chunk_size=100, max_elements=10**7):
+    """
+    Percentiles of func evaluated for all coefficient realizations
+
+    Parameters
+    ----------
+    func : callable
+        model called as `func(*args, **kwargs, **coefficients)`, it should
+        broadcast coefficients against data along the last axis (all
+        pressure models in this package do)
+    coefficients : dict
+        name of argument of func -> 1-d ndarray of realizations, all of the
+        same length
+    args : list
+        positional arguments of func, ndarrays whose last axis is depth
+        (logs or inline/crline/depth cubes) or other values. Only non-scalar
+        ndarrays are broadcast and split into blocks of traces, scalars and
+        other values (e.g. None) are passed to func unchanged.
+    kwargs : dict, optional
+        keyword arguments of func not sampled, treated as args
+    percentiles : list of float
+        percentiles to compute, e.g. (10, 50, 90) for P10/P50/P90
+    chunk_size : int
+        number of realizations evaluated in one call of func
+    max_elements : int
+        maximum number of realization values held in memory, traces are
+        processed in blocks accordingly, a trace is never split
+
+    Returns
+    -------
+    ndarray
+        shape (len(percentiles),) + shape of func output for one realization
+
+    Raises
+    ------
+    ValueError
+        if no argument is a non-scalar ndarray
+    """
+    kwargs = dict() if kwargs is None else kwargs
+    coefficients = OrderedDict(
+        (name, np.asarray(values, dtype=np.float64).ravel()) \
+        for name, values in coefficients.items())
+    n_real = len(next(iter(coefficients.values())))
+    arrays = [value for value in list(args) + list(kwargs.values()) \
+              if _is_array(value)]
+    if not arrays:
+        raise ValueError("No array argument to evaluate func on")
+    shape = np.broadcast(*arrays).shape
+    n_samples = shape[-1]
+    n_traces = int(np.prod(shape[:-1]))
+
+    def flat(value):
+        "array data as (n_traces, n_samples), other values unchanged"
+        if not _is_array(value):
+            return value
+        return np.broadcast_to(value, shape).reshape((n_traces, n_samples))
+
+    args = [flat(arg) for arg in args]
+    kwargs = dict((key, flat(value)) for key, value in kwargs.items())
+    block = int(max(1, min(n_traces, max_elements // (n_real * n_samples))))
+    buf = np.empty((n_real, block, n_samples))
+    output = np.empty((len(percentiles), n_traces, n_samples))
+    for start in range(0, n_traces, block):
+        stop = min(start + block, n_traces)
+        block_args = [_block(arg, start, stop) for arg in args]
+        block_kwargs = dict(
+            (key, _block(value, start, stop)) \
+            for key, value in kwargs.items())
+        for real_start in range(0, n_real, chunk_size):
+            real_stop = min(real_start + chunk_size, n_real)
+            block_kwargs.update(
+                (name, values[real_start:real_stop, np.newaxis, np.newaxis]) \
+                for name, values in coefficients.items())
+            buf[real_start:real_stop, :stop - start] = func(
+                *block_args, **block_kwargs)
+        values = buf[:, :stop - start]
+        if np.isnan(values).any():
+            with warnings.catch_warnings():
+                warnings.simplefilter('ignore', RuntimeWarning)
+                output[:, start:stop] = np.nanpercentile(
+                    values, percentiles, axis=0)
+        else:
+            output[:, start:stop] = np.percentile(values, percentiles, axis=0)
+    return output.reshape((len(percentiles),) + shape)
+
+
+def _is_array(value):
+    "whether value is a non-scalar array, evaluated for every sample"
+    return isinstance(value, np.ndarray) and value.ndim > 0
+
+
+def _block(value, start, stop):
+    return value[start:stop] if _is_array(value) else value
+
+
+def ensemble_logs(depth, func, coefficients, args=(), kwargs=None,
+                  percentiles=(10, 50, 90), **options):
+    """
+    Percentile logs of func evaluated for all coefficient realizations,
+    see `ensemble`
+
+    Parameters
+    ----------
+    depth : 1-d ndarray
+        depth of log samples
+
+    Returns
+    -------
+    list of Log
+        one log for each percentile, named like 'P10'
+    """
+    results = ensemble(func, coefficients, args, kwargs, percentiles,
+                       **options)
+    return [Log.from_scratch(depth, result, name="P{:g}".format(pct)) \
+            for pct, result in zip(percentiles, results)]
+
+
+def ensemble_seis(func, coefficients, input_cubes, output_cubes, args=(),
+                  kwargs=None, percentiles=(10, 50, 90), n_workers=1,
+                  **options):
+    """
+    Percentile cubes of func evaluated for all coefficient realizations,
+    computed inline by inline
+
+    Parameters
+    ----------
+    func : callable
+        model called as
+        `func(*input_inline_data, *args, **kwargs, **coefficients)`
+    input_cubes : list of SeiSEGY
+        cubes whose inline data are the first arguments of func
+    output_cubes : list of SeiSEGY
+        one cube for each percentile, created with `create_seis`
+    n_workers : int
+        number of processes
+
+    See `ensemble` for other parameters.
+    """
+    process_inlines(
+        _ensemble_inline, input_cubes, output_cubes, n_workers=n_workers,
+        model=func, coefficients=coefficients, args=list(args),
+        func_kwargs=kwargs, percentiles=percentiles, options=options)
+
+
+def _ensemble_inline(inl, *input_data, **kwargs):
+    results = ensemble(
+        kwargs['model'], kwargs['coefficients'],
+        list(input_data) + kwargs['args'], kwargs['func_kwargs'],
+        kwargs['percentiles'], **kwargs['options'])
+    return tuple(results)
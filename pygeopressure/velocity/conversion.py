@@ -5,13 +5,14 @@ Routines performing velocity type conversion
 from __future__ import (absolute_import, division, print_function,
                         unicode_literals)
 
-from builtins import range
-
 __author__ = "yuhao"
 
 import numpy as np
 from scipy import interpolate
 
+from pygeopressure.basic.seis_utils import (
+    create_seis, create_seis_info, process_inlines)
+
 
 def rms2int(twt, v_rms):
     r"""
@@ -19,15 +20,15 @@ def rms2int(twt, v_rms):
 
     Parameters
     ----------
-    twt : 1-d ndarray
-        input two-way-time array, in ms
-    rms : 1-d nadarray
-        rms velocity array, in m/s
+    twt : ndarray
+        input two-way-time array, in ms, 1-d or of the same shape as v_rms
+    v_rms : ndarray
+        rms velocity array, in m/s, time is the last axis
 
     Returns
     -------
-    v_int : 1-d ndarray
-        interval velocity array with the same length of twt and rms
+    v_int : ndarray
+        interval velocity array of the same shape as v_rms
 
     Notes
     -----
@@ -47,90 +48,113 @@ def rms2int(twt, v_rms):
              6.08276253,   7.81024968,   9.53939201,  11.26942767,
             13.        ,  14.73091986])
     """
-    v_int = np.ones((len(twt), ))
-    # v_int = np.copy(rms)
-    twt = twt*0.001
-    v_int[0] = v_rms[0]
-    v_int[1:] = np.sqrt(
-        (v_rms[1:]**2 * twt[1:] - v_rms[:-1]**2 * twt[:-1]) / \
-        (twt[1:] - twt[:-1])
+    twt, v_rms = _time_axis(twt, v_rms)
+    v_int = np.empty(v_rms.shape)
+    v_int[..., 0] = v_rms[..., 0]
+    v_int[..., 1:] = np.sqrt(
+        (v_rms[..., 1:]**2 * twt[..., 1:] - \
+         v_rms[..., :-1]**2 * twt[..., :-1]) / \
+        (twt[..., 1:] - twt[..., :-1])
     )
-    # for i in range(1, v_rms.shape[0]):
-    #     v_int[i] = np.sqrt(
-    #         (v_rms[i]**2 * twt[i] - v_rms[i-1]**2 * twt[i-1]) / \
-    #         (twt[i] - twt[i-1])
-    #     )
-
     return v_int
 
 
 def int2rms(twt, v_int):
-    """
+    r"""
+    Convert interval velocity to rms velocity
+
     Parameters
     ----------
-    twt : 1-d ndarray
-    v_int : 1-d ndarray
+    twt : ndarray
+        two-way-time in ms, 1-d or of the same shape as v_int
+    v_int : ndarray
+        interval velocity, time is the last axis, so a trace, an inline or
+        a cube can be converted at once
 
     Returns
     -------
-    v_rms : 1-d ndarray
-    """
-    v_rms = np.ones((len(twt), ))
-    twt = twt*0.001
-    v_rms[0] = v_int[0]
-    # because of the accumulational effect of rms velocity, this func should
-    # not use vectorized notation
-    for i in range(1, v_int.shape[0]):
-        v_rms[i] = np.sqrt(
-            (v_int[i]**2 * (twt[i] - twt[i-1]) + v_rms[i-1]**2 * twt[i-1]) / twt[i]
-        )
+    v_rms : ndarray
+        rms velocity of the same shape as v_int
 
+    Notes
+    -----
+    .. math:: V_{rms}[i]^2 t_{i} = \sum_{k \leq i} V_{int}[k]^2 \
+              (t_{k} - t_{k-1}), \quad t_{-1} = 0
+    """
+    twt, v_int = _time_axis(twt, v_int)
+    v_rms = np.empty(v_int.shape)
+    v_rms[..., 1:] = np.sqrt(
+        np.cumsum(v_int**2 * _intervals(twt), axis=-1)[..., 1:] / \
+        twt[..., 1:])
+    v_rms[..., 0] = v_int[..., 0]
     return v_rms
 
 
 def int2avg(twt, v_int):
     r"""
+    Convert interval velocity to average velocity
+
     Parameters
     ----------
-    twt : 1-d ndarray
-
-    v_int : 1-d ndarray
+    twt : ndarray
+        two-way-time in ms, 1-d or of the same shape as v_int
+    v_int : ndarray
+        interval velocity, time is the last axis
 
     Returns
     -------
-    v_avg : 1-d ndarray
+    v_avg : ndarray
+        average velocity of the same shape as v_int
 
     Notes
     -----
-    .. math:: V_{int}[i](t_{i} - t_{i-1}) = V_{avg}[i] t_{i} - \
-              V_{avg}[i-1] t_{i-1}
+    .. math:: V_{avg}[i] t_{i} = \sum_{k \leq i} V_{int}[k] \
+              (t_{k} - t_{k-1}), \quad t_{-1} = 0
     """
-    v_avg = np.ones((len(twt), ))
-    twt = twt * 0.001
-    v_avg[0] = v_int[0]
-    for i in range(1, v_int.shape[0]):
-        v_avg[i] = (v_avg[i-1] * twt[i-1] + v_int[i] * (twt[i] - twt[i-1])) / \
-            twt[i]
+    twt, v_int = _time_axis(twt, v_int)
+    v_avg = np.empty(v_int.shape)
+    v_avg[..., 1:] = np.cumsum(
+        v_int * _intervals(twt), axis=-1)[..., 1:] / twt[..., 1:]
+    v_avg[..., 0] = v_int[..., 0]
     return v_avg
 
 
+def _time_axis(twt, velocity):
+    "twt in seconds and velocity as float arrays, time is the last axis"
+    return np.asarray(twt, dtype=np.float64) * 0.001, \
+        np.asarray(velocity, dtype=np.float64)
+
+
+def _intervals(twt):
+    "time intervals, the first sample spans from time zero"
+    intervals = np.empty(twt.shape)
+    intervals[..., 0] = twt[..., 0]
+    intervals[..., 1:] = np.diff(twt, axis=-1)
+    return intervals
+
+
 def avg2int(twt, v_avg):
     """
+    Convert average velocity to interval velocity
+
     Parameters
     ----------
-    twt : 1-d ndarray
-    v_avg : 1-d ndarray
+    twt : ndarray
+        two-way-time in ms, 1-d or of the same shape as v_avg
+    v_avg : ndarray
+        average velocity, time is the last axis
 
     Returns
     -------
-    v_int : 1-d ndarray
+    v_int : ndarray
+        interval velocity of the same shape as v_avg
     """
-    v_int = np.ones((len(twt), ))
-    twt = twt * 0.001
-    v_int[0] = v_avg[0]
-    v_int[1:] = (v_avg[1:]*twt[1:] - v_avg[:-1]*twt[:-1]) /\
-        (twt[1:] - twt[:-1])
-
+    twt, v_avg = _time_axis(twt, v_avg)
+    v_int = np.empty(v_avg.shape)
+    v_int[..., 0] = v_avg[..., 0]
+    v_int[..., 1:] = (v_avg[..., 1:] * twt[..., 1:] - \
+                      v_avg[..., :-1] * twt[..., :-1]) / \
+        (twt[..., 1:] - twt[..., :-1])
     return v_int
 
 
@@ -141,7 +165,9 @@ def twt2depth(twt, v_avg, prop_2_convert,
     ----------
     twt : 1-d ndarray
     v_avg : 1-d ndarray
-    prop_2_convert: 1-d ndarray
+    prop_2_convert: ndarray
+        property to convert, time is the last axis, several properties of
+        the trace can be stacked and converted at once
     stepDepth : scalar
     startDpeth (optional): scalar
     endDepth (optional): scalar
@@ -150,8 +176,8 @@ def twt2depth(twt, v_avg, prop_2_convert,
     -------
     newDepth : 1-d ndarray
         new depth array
-    new_prop_2_convert : 1-d ndarray
-        average velocity in depth domain
+    new_prop_2_convert : ndarray
+        property in depth domain
     """
     depth = np.ones((len(twt), ))
     twt = twt * 0.001
@@ -159,7 +185,191 @@ def twt2depth(twt, v_avg, prop_2_convert,
     startDepth = depth[0] if startDepth is None else startDepth
     endDepth = depth[-1] if endDepth is None else endDepth
     newDepth = np.arange(startDepth, endDepth+0.01, stepDepth)
-    f = interpolate.interp1d(depth, prop_2_convert, kind='cubic')
+    f = interpolate.interp1d(depth, prop_2_convert, kind='cubic', axis=-1)
     new_prop_2_convert = f(newDepth)
 
     return (newDepth, new_prop_2_convert)
+
+
+def twt2depth_batch(twt, v_avg, props, depth, kind='linear'):
+    """
+    Convert properties of many traces from time to depth domain
+
+    The depth of every time sample is computed once per trace, and all
+    properties are resampled through it.
+
+    Parameters
+    ----------
+    twt : ndarray
+        two-way-time in ms, 1-d or of the same shape as v_avg
+    v_avg : ndarray
+        average velocity in time domain, time is the last axis
+    props : list of ndarray
+        properties in time domain of the same shape as v_avg
+    depth : 1-d ndarray
+        depth of output samples
+    kind : {'linear', 'pchip'}
+        linear or monotone cubic (Fritsch-Carlson) interpolation
+
+    Returns
+    -------
+    list of ndarray
+        properties in depth domain, of shape `v_avg.shape[:-1] + (len(depth),)`,
+        nan outside the depth range of each trace
+    """
+    if kind not in ('linear', 'pchip'):
+        raise ValueError("Unknown interpolation {}".format(kind))
+    twt, v_avg = _time_axis(twt, v_avg)
+    depth = np.asarray(depth, dtype=np.float64)
+    shape = v_avg.shape
+    time_depth = np.broadcast_to(twt * v_avg / 2, shape).reshape(
+        (-1, shape[-1]))
+    idx, weight, valid = _locate(time_depth, depth)
+    results = []
+    for prop in props:
+        values = np.broadcast_to(
+            np.asarray(prop, dtype=np.float64), shape).reshape(
+                time_depth.shape)
+        result = _resample(time_depth, values, idx, weight, kind)
+        result[~valid] = np.nan
+        results.append(result.reshape(shape[:-1] + depth.shape))
+    return results
+
+
+def _locate(x, x_new):
+    """
+    interval of each of x_new in each row of x
+
+    Returns
+    -------
+    idx : 2-d ndarray of int
+        index of the left sample of the interval
+    weight : 2-d ndarray
+        relative position in the interval, from 0 to 1
+    valid : 2-d ndarray of bool
+        False outside x and in rows of x not strictly increasing
+    """
+    n_rows, n_samples = x.shape
+    increasing = np.all(np.diff(x, axis=-1) > 0, axis=-1)
+    x = np.where(increasing[:, np.newaxis], x, np.arange(n_samples))
+    # shifting rows apart makes the whole array sorted, so all rows are
+    # searched in a single call
+    low = min(x.min(), x_new.min())
+    span = max(x.max(), x_new.max()) - low + 1
+    shift = np.arange(n_rows)[:, np.newaxis] * span
+    position = np.searchsorted(
+        (x - low + shift).ravel(), (x_new - low + shift).ravel()).reshape(
+            (n_rows, x_new.size))
+    idx = np.clip(
+        position - np.arange(n_rows)[:, np.newaxis] * n_samples - 1,
+        0, n_samples - 2)
+    rows = np.arange(n_rows)[:, np.newaxis]
+    left, right = x[rows, idx], x[rows, idx + 1]
+    weight = (x_new - left) / (right - left)
+    valid = increasing[:, np.newaxis] & (x_new >= x[:, :1]) & \
+        (x_new <= x[:, -1:])
+    return idx, weight, valid
+
+
+def _resample(x, y, idx, weight, kind):
+    "values of rows of y at positions found by `_locate`"
+    rows = np.arange(y.shape[0])[:, np.newaxis]
+    left, right = y[rows, idx], y[rows, idx + 1]
+    if kind == 'linear':
+        return left + weight * (right - left)
+    slopes = _pchip_slopes(x, y)
+    width = x[rows, idx + 1] - x[rows, idx]
+    weight_2 = weight * weight
+    weight_3 = weight_2 * weight
+    return (2 * weight_3 - 3 * weight_2 + 1) * left + \
+        (weight_3 - 2 * weight_2 + weight) * width * slopes[rows, idx] + \
+        (-2 * weight_3 + 3 * weight_2) * right + \
+        (weight_3 - weight_2) * width * slopes[rows, idx + 1]
+
+
+def _pchip_slopes(x, y):
+    "derivatives of monotone cubic interpolation along rows, as scipy PCHIP"
+    width = np.diff(x, axis=-1)
+    secant = np.diff(y, axis=-1) / width
+    if y.shape[-1] == 2:
+        return np.concatenate([secant, secant], axis=-1)
+    slopes = np.zeros(y.shape)
+    w_1 = 2 * width[:, 1:] + width[:, :-1]
+    w_2 = width[:, 1:] + 2 * width[:, :-1]
+    same_sign = secant[:, :-1] * secant[:, 1:] > 0
+    with np.errstate(divide='ignore', invalid='ignore'):
+        slopes[:, 1:-1] = np.where(
+            same_sign, (w_1 + w_2) / (w_1 / secant[:, :-1] + \
+                                      w_2 / secant[:, 1:]), 0)
+    slopes[:, 0] = _pchip_end_slope(
+        width[:, 0], width[:, 1], secant[:, 0], secant[:, 1])
+    slopes[:, -1] = _pchip_end_slope(
+        width[:, -1], width[:, -2], secant[:, -1], secant[:, -2])
+    return slopes
+
+
+def _pchip_end_slope(h_0, h_1, m_0, m_1):
+    "one-sided three-point slope, shape preserving"
+    slope = ((2 * h_0 + h_1) * m_0 - h_0 * m_1) / (h_0 + h_1)
+    slope = np.where(np.sign(slope) != np.sign(m_0), 0, slope)
+    return np.where(
+        (np.sign(m_0) != np.sign(m_1)) & (np.abs(slope) > 3 * np.abs(m_0)),
+        3 * m_0, slope)
+
+
+def twt2depth_seis(output_names, vel_cube, input_cubes, z_range,
+                   vel_type='interval', kind='linear', n_workers=1):
+    """
+    Convert time domain cubes to depth domain, inline by inline
+
+    The depth of time samples is computed once per trace from the velocity
+    cube and all input cubes are resampled through it.
+
+    Parameters
+    ----------
+    output_names : list of str
+        output file names without extension, one for each input cube
+    vel_cube : SeiSEGY
+        velocity cube in time domain, z in ms
+    input_cubes : list of SeiSEGY
+        time domain cubes to convert, with the geometry of vel_cube, may
+        include vel_cube itself
+    z_range : tuple of float
+        start, end and step of depth of output cubes
+    vel_type : {'interval', 'rms', 'average'}
+        type of velocity in vel_cube
+    kind : {'linear', 'pchip'}
+        interpolation, see `twt2depth_batch`
+    n_workers : int
+        number of processes
+
+    Returns
+    -------
+    list of SeiSEGY
+        depth domain cubes
+    """
+    if vel_type not in ('interval', 'rms', 'average'):
+        raise ValueError("Unknown velocity type {}".format(vel_type))
+    output_cubes = []
+    for name, cube in zip(output_names, input_cubes):
+        output = create_seis(name, cube, z_range)
+        output.inDepth = True
+        output.property_type = cube.property_type
+        create_seis_info(output, name)
+        output_cubes.append(output)
+    process_inlines(
+        _twt2depth_inline, [vel_cube] + list(input_cubes), output_cubes,
+        n_workers=n_workers, twt=np.array(list(vel_cube.depths())),
+        depth=np.array(list(output_cubes[0].depths())), vel_type=vel_type,
+        kind=kind)
+    return output_cubes
+
+
+def _twt2depth_inline(inl, vel_inline, *inline_data, **kwargs):
+    twt, vel_type = kwargs['twt'], kwargs['vel_type']
+    if vel_type == 'rms':
+        vel_inline = rms2int(twt, vel_inline)
+    if vel_type != 'average':
+        vel_inline = int2avg(twt, vel_inline)
+    return tuple(twt2depth_batch(
+        twt, vel_inline, inline_data, kwargs['depth'], kwargs['kind']))
@@ -67,11 +67,11 @@ def normal_log(vel_log, a, b):
         normal velocity log
     """
 
-    normal_vel = normal(np.array(vel_log.depth), a, b)
-    mask = np.isnan(np.array(vel_log.data))
+    normal_vel = normal(np.asarray(vel_log.depth), a, b)
+    mask = np.isnan(np.asarray(vel_log.data))
     normal_vel[mask] = np.nan
     log = Log()
-    log.depth = np.array(vel_log.depth)
+    log.depth = np.asarray(vel_log.depth)
     log.data = normal_vel
     log.name = 'normal_vel_log'
     log.descr = "Velocity_normal"
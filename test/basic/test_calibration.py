@@ -0,0 +1,56 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Oct 18 2026
+"""
+from __future__ import (absolute_import, division, print_function,
+                        unicode_literals)
+
+import json
+
+import pytest
+import numpy as np
+import pygeopressure
+
+from pygeopressure.basic.optimizer import optimize_bowers_virgin, optimize_nct
+
+
+@pytest.fixture()
+def real_well():
+    return pygeopressure.Well(json_file='test/data/FW1.json')
+
+
+def test__calibrate_field(real_well):
+    report = pygeopressure.calibrate_field(
+        [real_well], models=['bowers', 'nct'], upper='T12', lower='T20')
+    assert report['model'].tolist() == ['nct', 'bowers']
+    assert report['error'].isnull().all()
+    a, b = optimize_nct(real_well.get_log('Velocity'), 1573, 2848)
+    assert np.allclose(report[['a', 'b']].values[0], [a, b])
+    a, b, err = optimize_bowers_virgin(
+        real_well, 'Velocity', 'Overburden_Pressure', 'T12', 'T20',
+        pres_log='loading', mode='both')
+    assert np.allclose(report[['a', 'b', 'rms']].values[1], [a, b, err])
+    parallel = pygeopressure.calibrate_field(
+        [real_well, real_well], models=['bowers', 'nct'], workers=2,
+        upper='T12', lower='T20')
+    assert np.allclose(parallel[['a', 'b']].values[2:], report[['a', 'b']])
+    sparse = pygeopressure.calibrate_field(
+        [real_well], models=['bowers'], upper='T12', lower='T20', nnc=3)
+    a, b, err = optimize_bowers_virgin(
+        real_well, 'Velocity', 'Overburden_Pressure', 'T12', 'T20',
+        pres_log='loading', mode='both', nnc=3)
+    assert np.allclose(sparse[['a', 'b', 'rms']].values[0], [a, b, err])
+    assert sparse['n_points'][0] == report['n_points'][1] - 2
+
+
+def test__calibrate_field_save(tmpdir, real_well):
+    real_well.json_file = str(tmpdir.join('fw1.json'))
+    report = pygeopressure.calibrate_field(
+        [real_well], models=['nct', 'eaton', 'unloading'], upper=1200,
+        lower=2000, pres_log='no_pressure', save=True)
+    assert report['error'].isnull().tolist() == [True, False, True]
+    with open(real_well.json_file) as fl:
+        params = json.load(fl)
+    assert params['nct']['a'] == report['a'][0]
+    assert params['bowers']['U'] == report['u'][2]
+    assert 'n' not in params
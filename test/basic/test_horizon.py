@@ -5,7 +5,10 @@ Created on Aug. 28th 2018
 from __future__ import (absolute_import, division, print_function,
                         unicode_literals)
 
+from collections import namedtuple
+
 import pytest
+import numpy as np
 import pygeopressure as ppp
 
 
@@ -17,3 +20,33 @@ def test__Horizon(tmpdir):
     hor.horizon_name = "hor_A"
     assert hor.get_cdp((1, 1)) == 200
     assert str(hor) == "Horizon Object: hor_A"
+
+
+def test__horizon_grid(tmpdir):
+    p = tmpdir.join("horizon.txt")
+    p.write("inline\tcrline\tz\n" + "".join(
+        "{}\t{}\t{}\n".format(inl, crl, inl + crl) \
+        for inl in range(100, 120, 4) for crl in range(10, 30, 2) \
+        if (inl, crl) != (108, 20)))
+    hor = ppp.Horizon(str(p))
+    assert hor.grid.shape == (5, 10)
+    assert hor.get_cdp((104, 12)) == 116
+    assert np.isnan(hor.get_cdp((108, 20)))
+    assert np.isnan(hor.get_cdp((105, 12)))
+    assert np.isnan(hor.get_cdp((200, 12)))
+    assert np.array_equal(
+        hor.get_cdp((np.array([100, 116]), np.array([10, 28]))), [110, 144])
+    assert np.array_equal(hor.get_inline(104, [10, 12]), [114, 116])
+    assert hor.get_inline(104).shape == (10,)
+
+    filled = ppp.Horizon(str(p), interpolation='linear')
+    assert np.isclose(filled.get_cdp((108, 20)), 128)
+
+    geometry = namedtuple('geometry', [
+        'startInline', 'endInline', 'stepInline',
+        'startCrline', 'endCrline', 'stepCrline'])
+    like = geometry(96, 120, 2, 10, 28, 2)
+    aligned = ppp.Horizon(str(p), like=like, interpolation='nearest')
+    assert aligned.grid.shape == (13, 10)
+    assert aligned.get_cdp((102, 12)) in (112, 116)
+    assert not np.isnan(aligned.grid).any()
@@ -0,0 +1,81 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Oct 18 2026
+"""
+from __future__ import (absolute_import, division, print_function,
+                        unicode_literals)
+
+import pytest
+import numpy as np
+from scipy.optimize import curve_fit
+
+from pygeopressure.basic.joint_optimizer import (
+    joint_bowers_virgin, joint_bowers_unloading, joint_eaton)
+from pygeopressure.pressure.bowers import virgin_curve, unloading_curve
+
+
+def _points(**fields):
+    points = np.empty(len(fields['es']), dtype=[
+        (name, np.float64) for name in fields])
+    for name, values in fields.items():
+        points[name] = values
+    return points
+
+
+def test__joint_bowers_virgin():
+    rng = np.random.RandomState(2018)
+    offsets = [-50., 0., 80.]
+    points = dict()
+    for i, offset in enumerate(offsets):
+        es = rng.uniform(5, 60, 200)
+        points["well_{}".format(i)] = _points(
+            es=es, velocity=virgin_curve(es, 120, 0.82) + offset)
+    a, b, fitted, result = joint_bowers_virgin(points, per_well=True)
+    assert result.success
+    assert np.allclose([a, b], [120, 0.82], rtol=1e-4)
+    assert np.allclose(
+        list(fitted.values()), offsets, atol=0.1)
+
+    # without per-well terms, same as one curve_fit on all points
+    es = np.concatenate([p['es'] for p in points.values()])
+    vel = np.concatenate([p['velocity'] for p in points.values()])
+    popt, _ = curve_fit(virgin_curve, es, vel, p0=[100, 0.8])
+    a, b, fitted, _ = joint_bowers_virgin(points)
+    assert np.allclose([a, b], popt, rtol=1e-4)
+    assert not any(fitted.values())
+
+    # robust loss is less affected by an outlier
+    points['well_1']['velocity'][0] += 2000
+    _, b_linear, _, _ = joint_bowers_virgin(points, per_well=True)
+    _, b_robust, _, _ = joint_bowers_virgin(
+        points, per_well=True, loss='soft_l1', f_scale=10)
+    assert abs(b_robust - 0.82) < abs(b_linear - 0.82)
+
+
+def test__joint_bowers_unloading():
+    es = np.linspace(5, 30, 20)
+    points = {
+        name: _points(es=es, velocity=unloading_curve(es, 120, 0.82, u, 4000))
+        for name, u in [('a', 2.5), ('b', 3.5)]}
+    u, result = joint_bowers_unloading(points, 120, 0.82, 4000)
+    assert result.success
+    assert np.allclose(list(u.values()), [2.5, 3.5])
+    u, _ = joint_bowers_unloading(
+        {'a': points['a']}, 120, 0.82, 4000, per_well=False)
+    assert np.isclose(u, 2.5)
+
+
+def test__joint_eaton():
+    vel_ratio = np.linspace(0.6, 1, 30)
+    points = {
+        name: _points(es=vel_ratio**n, es_normal=np.ones(30),
+                      velocity=vel_ratio, normal_velocity=np.ones(30))
+        for name, n in [('a', 2.8), ('b', 3.2), ('c', 3)]}
+    points['c']['es'] = np.nan
+    n, offsets, result = joint_eaton(points, per_well=True)
+    assert result.success
+    assert list(offsets.keys()) == ['a', 'b']
+    assert np.allclose([n, offsets['a'], offsets['b']], [3, -0.2, 0.2],
+                       atol=1e-6)
+    n, _, _ = joint_eaton({'a': points['a']})
+    assert np.isclose(n, 2.8)
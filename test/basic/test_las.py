@@ -7,6 +7,7 @@ from __future__ import (absolute_import, division, print_function,
 
 
 import pytest
+import numpy as np
 import pygeopressure as ppp
 
 
@@ -16,3 +17,83 @@ def test__LasData(pseudo_las_file):
     assert pseudo_las_data.file_type == "pseudo-las"
     assert pseudo_las_data.logs == ['Velocity', 'Shale_Volume', 'Overburden_Pressure']
     assert pseudo_las_data.units == ['Meter/Second', 'Fraction', 'MegaPascal']
+
+
+LAS_HEADER = """~VERSION INFORMATION
+ VERS.                  2.0 :   CWLS LOG ASCII STANDARD -VERSION 2.0
+ WRAP.                  {} :   ONE LINE PER DEPTH STEP
+~WELL INFORMATION
+ STRT.M              1670.0 :
+ STOP.M              1670.2 :
+ STEP.M                 0.1 :
+ NULL.              -999.25 :
+~CURVE INFORMATION
+ DEPT.M                     :  Depth
+ DT  .US/M                  :  Sonic Transit Time
+ RHOB.K/M3                  :  Bulk Density
+~A  DEPTH     DT       RHOB
+"""
+
+
+@pytest.fixture()
+def las_file(tmpdir):
+    fn = tmpdir.join('unwrapped.las')
+    fn.write(LAS_HEADER.format('NO') +
+             "1670.0 123.45 2550.0\n"
+             "# comment\n"
+             "1670.1 -999.25 2551.0\n"
+             "1670.2 123.5 -999.25\n")
+    return str(fn)
+
+
+@pytest.fixture()
+def wrapped_las_file(tmpdir):
+    fn = tmpdir.join('wrapped.las')
+    fn.write(LAS_HEADER.format('YES') +
+             "1670.0\n123.45\n2550.0\n"
+             "1670.1\n-999.25 2551.0\n"
+             "1670.2\n123.5\n-999.25\n")
+    return str(fn)
+
+
+def test__LASReader(las_file, wrapped_las_file):
+    las = ppp.basic.las_reader.LASReader(las_file, null_subs=np.nan)
+    wrapped = ppp.basic.las_reader.LASReader(wrapped_las_file, null_subs=np.nan)
+    assert las.names == ['DEPT', 'DT', 'RHOB']
+    assert las.data2d.shape == (3, 3)
+    assert np.array_equal(las.data2d, wrapped.data2d, equal_nan=True)
+    assert np.isnan(las.data['DT'][1])
+    projected = ppp.basic.las_reader.LASReader(
+        las_file, null_subs=np.nan, usecols=['DEPT', 2])
+    assert projected.names == ['DEPT', 'RHOB']
+    assert np.array_equal(projected.data2d, las.data2d[:, [0, 2]],
+                          equal_nan=True)
+    chunked = ppp.basic.las_reader.LASReader(
+        wrapped_las_file, null_subs=np.nan, chunksize=2)
+    chunks = list(chunked.chunks())
+    assert [len(chunk) for chunk in chunks] == [2, 1]
+    assert np.array_equal(
+        np.concatenate(chunks).view(float).reshape(-1, 3), las.data2d,
+        equal_nan=True)
+
+
+def test__LASReader_bad_row(tmpdir):
+    fn = tmpdir.join('bad.las')
+    fn.write(LAS_HEADER.format('NO') +
+             "1670.0 123.45\n"
+             "1670.1 -999.25 2551.0 1\n"
+             "1670.2 123.5 -999.25\n")
+    with pytest.raises(ppp.basic.las_reader.LASError):
+        ppp.basic.las_reader.LASReader(str(fn))
+    chunked = ppp.basic.las_reader.LASReader(str(fn), chunksize=2)
+    with pytest.raises(ppp.basic.las_reader.LASError):
+        list(chunked.chunks())
+
+
+def test__LasData_usecols(las_file, pseudo_las_file):
+    las_data = ppp.LasData(las_file, usecols=['Bulk_Density'])
+    assert las_data.data_frame.columns.tolist() == [
+        'Depth(m)', 'Bulk_Density(K/M3)']
+    pseudo_las_data = ppp.LasData(str(pseudo_las_file), usecols=['Velocity'])
+    assert pseudo_las_data.logs == ['Velocity']
+    assert pseudo_las_data.data_frame['Velocity(Meter/Second)'].isnull().all()
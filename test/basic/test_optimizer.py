@@ -7,10 +7,13 @@ from __future__ import (absolute_import, division, print_function,
 
 
 import pytest
+import numpy as np
 import pygeopressure
 
 from pygeopressure.basic.optimizer import (
-    optimize_bowers_virgin, optimize_eaton, optimize_nct)
+    optimize_bowers_virgin, optimize_eaton, optimize_nct, optimize_nct_batch,
+    optimize_bowers_batch)
+from pygeopressure.pressure.bowers import virgin_curve
 
 
 @pytest.fixture()
@@ -28,12 +31,25 @@ def test__optimize_bowers_virgin(real_well):
     assert float("{:.4f}".format(err)) == 0.1688
 
 
+def test__optimize_bowers_virgin_nct(real_well, capsys):
+    a, b, err = optimize_bowers_virgin(
+        real_well, 'Velocity', 'Overburden_Pressure', 'T12', 'T20',
+        pres_log='no_pressure', mode='nct')
+    assert np.isfinite([a, b, err]).all()
+    assert capsys.readouterr().out == ""
+
+
 def test__optimize_eaton(real_well):
     a = real_well.params['nct']['a']
     b = real_well.params['nct']['b']
     n = optimize_eaton(real_well, "Velocity", "Overburden_Pressure",
                        a, b, pres_log="loading")
     assert float("{:.4f}".format(n)) == 3.9798
+    n_cov, pcov = optimize_eaton(
+        real_well, "Velocity", "Overburden_Pressure", a, b,
+        pres_log="loading", return_cov=True)
+    assert n_cov == n
+    assert np.shape(pcov) == (1, 1)
 
 
 def test__optimize_nct(real_well):
@@ -41,3 +57,26 @@ def test__optimize_nct(real_well):
     a, b = optimize_nct(vel_log, 1200, 2000)
     assert float("{:.4f}".format(a)) == -7.7037
     assert float("{:.7f}".format(b)) == 0.0001281
+
+
+def test__optimize_nct_batch(real_well):
+    vel_log = real_well.get_log("Velocity")
+    a, b = optimize_nct(vel_log, 1200, 2000)
+    depth = np.array(vel_log.depth)
+    vel = np.array(vel_log.data)
+    a_batch, b_batch = optimize_nct_batch(
+        depth, np.vstack([vel, vel]), [1200, 1200], [2000, 2000])
+    assert np.allclose(a_batch, a)
+    assert np.allclose(b_batch, b)
+
+
+def test__optimize_bowers_batch():
+    depth = np.arange(100.) * 10
+    es = np.linspace(1, 40, 100)
+    vel = np.vstack([virgin_curve(es, 120, 0.8), virgin_curve(es, 60, 0.7),
+                     np.full(100, np.nan)])
+    a, b, converged = optimize_bowers_batch(depth, vel, es, 0, 100, 800)
+    assert np.allclose(a[:2], [120, 60])
+    assert np.allclose(b[:2], [0.8, 0.7])
+    assert list(converged) == [True, True, False]
+    assert a[2] == a[1] and b[2] == b[1]
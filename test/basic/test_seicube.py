@@ -0,0 +1,103 @@
+# -*- coding: utf-8 -*-
+"""
+Test
+
+Created on Oct. 18th 2026
+"""
+from __future__ import (absolute_import, division, print_function,
+                        unicode_literals)
+
+
+__author__ = "yuhao"
+
+import pytest
+import numpy as np
+import pygeopressure as ppp
+
+
+@pytest.fixture()
+def seis_cube():
+    return ppp.SeiSEGY("test/data/f3_sparse.sgy")
+
+
+def test__seicube(tmpdir, seis_cube):
+    cube = ppp.SeiCube.from_segy(
+        seis_cube, str(tmpdir.join("f3_cube")), brick_shape=(8, 8, 16))
+    assert cube.n_bricks == (3, 4, 3)
+    assert str(cube) == ("SeiCube(inl[200,640,20];crl[700,1200,20];"
+                         "z[400.0,1100.0,20.0])")
+    assert list(cube.inlines()) == list(seis_cube.inlines())
+    assert list(cube.depths()) == list(seis_cube.depths())
+    # same data dispatch as SeiSEGY
+    for index in [ppp.InlineIndex(260), ppp.CrlineIndex(1200),
+                  ppp.DepthIndex(800), ppp.CdpIndex((640, 720))]:
+        np.testing.assert_array_equal(
+            cube.data(index), seis_cube.data(index))
+    np.testing.assert_array_equal(cube.cube, seis_cube.cube)
+    # reopen from directory
+    reopened = ppp.SeiCube(str(tmpdir.join("f3_cube")))
+    np.testing.assert_array_equal(
+        reopened.data(ppp.CrlineIndex(760)),
+        seis_cube.data(ppp.CrlineIndex(760)))
+    # update sections in any direction
+    depth_slice = np.ones((cube.nEast, cube.nNorth))
+    cube.update(ppp.DepthIndex(800), depth_slice)
+    np.testing.assert_array_equal(
+        ppp.SeiCube(str(tmpdir.join("f3_cube"))).data(ppp.DepthIndex(800)),
+        depth_slice)
+    with pytest.raises(ValueError):
+        cube.update(ppp.InlineIndex(200), depth_slice)
+    # back to segy
+    new_segy = cube.to_segy(str(tmpdir.join("back.sgy")), like=seis_cube)
+    np.testing.assert_array_equal(
+        new_segy.data(ppp.DepthIndex(800)), depth_slice)
+    np.testing.assert_array_equal(
+        new_segy.data(ppp.InlineIndex(300)),
+        cube.data(ppp.InlineIndex(300)))
+
+
+def test__seicube_session_writes(tmpdir, seis_cube, monkeypatch):
+    cube = ppp.SeiCube.create(
+        str(tmpdir.join("out")), seis_cube, brick_shape=(8, 8, 16))
+    written = []
+    write_brick = cube._write_brick
+    monkeypatch.setattr(cube, "_write_brick", lambda idx, brick: (
+        written.append(idx), write_brick(idx, brick)))
+    with cube.session():
+        for inl in cube.inlines():
+            cube.update(ppp.InlineIndex(inl), seis_cube.inline(inl))
+        # pending updates are visible before they are written
+        np.testing.assert_array_equal(
+            cube.data(ppp.CrlineIndex(760)),
+            seis_cube.data(ppp.CrlineIndex(760)))
+        assert written == []
+    # every brick is written once
+    assert sorted(written) == sorted(set(written))
+    assert len(written) == np.prod(cube.n_bricks)
+    np.testing.assert_array_equal(
+        ppp.SeiCube(str(tmpdir.join("out"))).cube, seis_cube.cube)
+    # existing cube is reused
+    reused = ppp.SeiCube.create(
+        str(tmpdir.join("out")), seis_cube, brick_shape=(8, 8, 16))
+    np.testing.assert_array_equal(
+        reused.data(ppp.InlineIndex(300)), seis_cube.inline(300))
+    # but not if geometry or brick shape differ
+    with pytest.raises(ValueError):
+        ppp.SeiCube.create(str(tmpdir.join("out")), seis_cube)
+    with pytest.raises(ValueError):
+        ppp.SeiCube.create(
+            str(tmpdir.join("out")), seis_cube, brick_shape=(8, 8, 16),
+            z_range=(400, 1000, 20))
+
+
+def test__split_inlines_bricks(tmpdir, seis_cube):
+    from pygeopressure.basic.seis_utils import split_inlines
+    outputs = [ppp.SeiCube.create(
+        str(tmpdir.join("out_{}".format(depth))), seis_cube,
+        brick_shape=(depth, 8, 16)) for depth in (4, 6)]
+    inlines = list(seis_cube.inlines())
+    chunks = split_inlines(inlines, 4, outputs)
+    assert sum(chunks, []) == inlines
+    # chunks start on brick boundaries of both cubes
+    for chunk in chunks[1:]:
+        assert inlines.index(chunk[0]) % 12 == 0
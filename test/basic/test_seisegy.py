@@ -11,6 +11,8 @@ from __future__ import (absolute_import, division, print_function,
 __author__ = "yuhao"
 
 import pytest
+import numpy as np
+import segyio
 import pygeopressure as ppp
 
 
@@ -32,3 +34,94 @@ def test__seisegy():
     assert seis_cube.valid_cdp((199, 400)) == (200, 400)
     assert str(seis_cube) == ("SeiSEGY(inl[200,640,20];crl[700,1200,20];"
                               "z[400.0,1100.0,20.0])")
+
+
+def test__seisegy_session(tmpdir):
+    seis_cube = ppp.SeiSEGY("test/data/f3_sparse.sgy")
+    first_inline = seis_cube.data(ppp.InlineIndex(200))
+    out_cube = ppp.SeiSEGY(
+        str(tmpdir.join("session.sgy")), like="test/data/f3_sparse.sgy")
+    with seis_cube.session(), out_cube.session() as cube:
+        assert cube is out_cube
+        assert seis_cube._read_handle is not None
+        with seis_cube.session():
+            assert (seis_cube.data(ppp.InlineIndex(200)) == \
+                first_inline).all()
+        # nested session does not close handles of the outer one
+        assert seis_cube._read_handle is not None
+        out_cube.update(ppp.InlineIndex(200), first_inline * 2)
+        assert (out_cube.data(ppp.InlineIndex(200)) == \
+            first_inline * 2).all()
+    assert seis_cube._read_handle is None
+    assert out_cube._write_handle is None
+    assert (out_cube.data(ppp.InlineIndex(200)) == first_inline * 2).all()
+
+
+@pytest.fixture()
+def ieee_segy(tmpdir):
+    ieee_file = str(tmpdir.join("ieee.sgy"))
+    with segyio.open("test/data/f3_sparse.sgy") as src:
+        spec = segyio.tools.metadata(src)
+        spec.format = 5
+        with segyio.create(ieee_file, spec) as dst:
+            dst.text[0] = src.text[0]
+            dst.bin = src.bin
+            dst.bin.update(format=5)
+            dst.header = src.header
+            dst.trace = src.trace
+    return ieee_file
+
+
+def test__seisegy_cube(ieee_segy):
+    ibm_cube = ppp.SeiSEGY("test/data/f3_sparse.sgy")
+    ieee_cube = ppp.SeiSEGY(ieee_segy)
+    assert ieee_cube._viewable
+    assert not ibm_cube._viewable
+    assert isinstance(ieee_cube.cube, np.memmap)
+    assert ieee_cube.cube.shape == (23, 26, 36)
+    assert not ieee_cube.cube.flags.writeable
+    assert (ibm_cube.cube == ieee_cube.cube).all()
+    # accessors return writable native float32 copies of the view
+    inline = ieee_cube.data(ppp.InlineIndex(220))
+    assert not np.shares_memory(inline, ieee_cube.cube)
+    assert inline.dtype == np.float32 and inline.dtype.isnative
+    assert inline.flags.writeable
+    assert ieee_cube.data(ppp.CdpIndex((240, 760))).dtype == np.float32
+    assert (inline == ibm_cube.data(ppp.InlineIndex(220))).all()
+    assert (ieee_cube.data(ppp.CrlineIndex(740)) == \
+        ibm_cube.data(ppp.CrlineIndex(740))).all()
+    assert (ieee_cube.data(ppp.DepthIndex(600)) == \
+        ibm_cube.data(ppp.DepthIndex(600))).all()
+    assert (ieee_cube.data(ppp.CdpIndex((240, 760))) == \
+        ibm_cube.data(ppp.CdpIndex((240, 760)))).all()
+    with pytest.raises(KeyError):
+        ieee_cube.data(ppp.InlineIndex(210))
+    # updated values are visible through the view
+    ieee_cube.update(ppp.InlineIndex(220), inline * 2)
+    assert (ieee_cube.data(ppp.InlineIndex(220)) == \
+        ibm_cube.data(ppp.InlineIndex(220)) * 2).all()
+
+
+def test__seisegy_to_gslib(tmpdir):
+    seis_cube = ppp.SeiSEGY("test/data/f3_sparse.sgy")
+    cube = np.array(seis_cube.cube)
+
+    fname = str(tmpdir.join('cube.gslib'))
+    seis_cube.to_gslib("amp", fname)
+    data = np.loadtxt(fname, skiprows=6)
+    assert data.shape == (cube.size, 4)
+    assert tuple(data[seis_cube.nDepth + 1, :3]) == (200, 720, 420)
+    assert np.allclose(data[:, 3], cube.ravel(), equal_nan=True)
+
+    fname = str(tmpdir.join('cube.bin'))
+    seis_cube.to_gslib("amp", fname, binary=True)
+    with open(fname, 'rb') as fl:
+        for _ in range(6):
+            fl.readline()
+        data = np.frombuffer(fl.read(), dtype='<f4').reshape((-1, 4))
+    assert np.array_equal(data[:, 3], cube.ravel(), equal_nan=True)
+
+    fname = str(tmpdir.join('grid.gslib'))
+    seis_cube.to_gslib_grid("amp", fname)
+    data = np.loadtxt(fname, skiprows=3)
+    assert np.allclose(data, cube.ravel(order='F'), equal_nan=True)
@@ -53,3 +53,79 @@ def test__well_get_pressure(real_well, measured_log, measured_coef_log):
         measured_coef_log
     assert real_well.get_pressure("unloading", ref='sea') == measured_log
     assert real_well.get_pressure("unloading").depth == [4159.5]
+
+
+def test__well_lazy_loading(real_well):
+    vel_log = real_well.get_log("Velocity")
+    assert real_well._data_frame is None
+    assert len(vel_log.data) == len(real_well.depth)
+    assert real_well.data_frame.shape[1] == 4
+
+
+def test__well_cache(real_well):
+    hydrostatic = real_well.hydrostatic
+    assert real_well.hydrostatic is hydrostatic
+    assert real_well.get_log("Velocity").data is \
+        real_well.get_log("Velocity").data
+    real_well.kelly_bushing += 10
+    assert real_well.hydrostatic is not hydrostatic
+    vel_log = real_well.get_log("Velocity")
+    real_well.add_log(vel_log, name="Velocity_copy", unit="Meter/Second")
+    assert 'Velocity_copy' in real_well.logs
+    real_well.drop_log("Velocity_copy")
+    assert 'Velocity_copy' not in real_well.logs
+
+
+def test__well_pressure_points(real_well):
+    points = real_well.pressure_points('loading')
+    assert real_well.pressure_points('loading') is points
+    assert points.dtype.names == pygeopressure.basic.well.PRESSURE_POINT_FIELDS
+    idx = real_well.depth_axis.searchsorted(4159.5)
+    assert points['depth'][0] == 4159.5
+    assert points['pressure'][0] == 60.6047
+    assert points['velocity'][0] == real_well.get_log('Velocity').data[idx]
+    assert points['es'][0] == points['obp'][0] - 60.6047
+    assert points['hydrostatic'][0] == real_well.hydrostatic[idx]
+    assert points['normal_velocity'][0] == real_well.normal_velocity[idx]
+    pres_log = real_well.get_pressure('loading')
+    other = real_well.pressure_points(pres_log, a=-7.5, b=0.0002)
+    assert other['es'][0] == points['es'][0]
+    assert other['normal_velocity'][0] != points['normal_velocity'][0]
+
+
+def test__well_pressure_points_params(real_well):
+    points = real_well.pressure_points('loading')
+    real_well.params['nct'] = {'a': -7.5, 'b': 0.0002}
+    changed = real_well.pressure_points('loading')
+    assert changed is not points
+    assert changed['normal_velocity'][0] != points['normal_velocity'][0]
+    real_well.kelly_bushing += 100
+    shifted = real_well.pressure_points('loading')
+    assert shifted['hydrostatic'][0] != changed['hydrostatic'][0]
+
+
+def test__well_multivariate(real_well):
+    real_well.params['multivariate'] = {
+        'a0': 1800, 'a1': 10, 'a2': 100, 'a3': 50, 'B': 0.8}
+    por_log = pygeopressure.Log.from_scratch(
+        real_well.depth, [0.1] * len(real_well.depth))
+    virgin = real_well.multivariate('Velocity', por_log, 'Shale_Volume')
+    assert virgin.name == "pressure_mutlivariate_fw1"
+    unloading = real_well.multivariate(
+        'Velocity', por_log, 'Shale_Volume', u=3, vmax=4600,
+        start_depth=2000, buf=1)
+    idx = real_well.get_log('Velocity').get_depth_idx(2000)
+    assert unloading.data[idx - 1] == virgin.data[idx - 1]
+    assert unloading.data[idx + 10] != virgin.data[idx + 10]
+
+
+def test__well_multivariate_explicit(real_well):
+    del real_well.params['multivariate']
+    por_log = pygeopressure.Log.from_scratch(
+        real_well.depth, [0.1] * len(real_well.depth))
+    pres = real_well.multivariate(
+        'Velocity', por_log, 'Shale_Volume', a0=1800, a1=10, a2=100, a3=50,
+        b=0.8)
+    assert len(pres.data) == len(real_well.depth)
+    with pytest.raises(KeyError):
+        real_well.multivariate('Velocity', por_log, 'Shale_Volume')
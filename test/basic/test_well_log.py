@@ -58,3 +58,34 @@ def test__log_void(void_well_log):
     assert not void_well_log
     assert void_well_log.name == "unk"
     assert void_well_log.prop_type is None
+
+
+def test__log_array(real_well_log):
+    assert isinstance(real_well_log.data, np.ndarray)
+    assert real_well_log.data.dtype == np.float64
+    assert real_well_log.data is real_well_log.data
+    with pytest.raises(ValueError):
+        real_well_log.data[0] = 1
+    new_log = pygeopressure.Log.from_scratch(
+        real_well_log.depth, [1.] * len(real_well_log))
+    assert new_log.depth is real_well_log.depth
+    assert new_log != real_well_log
+    with pytest.raises(AttributeError):
+        new_log.other = 1
+
+
+def test__log_sample_at(real_well_log):
+    assert real_well_log.depth_axis.regular
+    assert real_well_log.get_depth_idx(4.5) == 45
+    assert real_well_log.sample_at(676.2) == 2000.262329
+    assert np.array_equal(
+        real_well_log.sample_at([676.2, 676.24, 2000]),
+        [2000.262329, 2000.262329, np.nan], equal_nan=True)
+    linear = real_well_log.sample_at([676.25], method='linear')
+    assert linear[0] == np.mean(real_well_log.data[6762:6764])
+    irregular = pygeopressure.Log.from_scratch([0, 1, 3, 7], [0, 1, 2, 3])
+    assert not irregular.depth_axis.regular
+    assert np.array_equal(irregular.sample_at([0.4, 2.1, 6]), [0, 2, 3])
+    assert np.array_equal(
+        irregular.depth_axis.searchsorted([1, 2, 8]),
+        np.searchsorted(irregular.depth, [1, 2, 8]))
@@ -44,3 +44,101 @@ def test__well_storage(tmpdir, pseudo_las_file):
     with pytest.raises(KeyError) as nowell_error:
         storage.get_well_data("abc_well")
     assert "No well named abc_well" in nowell_error.exconly()
+
+
+def test__well_storage_columns(tmpdir, pseudo_las_file):
+    temp_hdf5 = str(Path(str(tmpdir)) / "temp_well_storage.h5")
+    storage = ppp.WellStorage(temp_hdf5)
+    df = ppp.LasData(str(pseudo_las_file)).data_frame
+    storage.add_well("test-well", df)
+    assert storage.get_columns("test_well") == df.columns.tolist()
+    assert np.array_equal(
+        storage.get_column("test_well", "Shale_Volume(Fraction)"),
+        df["Shale_Volume(Fraction)"].values, equal_nan=True)
+    with pytest.raises(KeyError):
+        storage.get_column("test_well", "abc")
+
+
+def test__well_storage_legacy(tmpdir):
+    import shutil
+    temp_hdf5 = str(Path(str(tmpdir)) / "legacy.h5")
+    shutil.copy("test/data/well_storage.h5", temp_hdf5)
+    storage = ppp.WellStorage(temp_hdf5)
+    df = storage.get_well_data("fw1")
+    columns = storage.get_columns("fw1")
+    assert columns == df.columns.tolist()
+    storage.to_columnar()
+    assert storage.wells == ["fw1"]
+    assert storage.get_columns("fw1") == columns
+    assert np.array_equal(storage.get_column("fw1", "Velocity(Meter/Second)"),
+                          df["Velocity(Meter/Second)"].values, equal_nan=True)
+
+
+def test__well_storage_column_operations(tmpdir, pseudo_las_file):
+    temp_hdf5 = str(Path(str(tmpdir)) / "temp_well_storage.h5")
+    storage = ppp.WellStorage(temp_hdf5)
+    df = ppp.LasData(str(pseudo_las_file)).data_frame
+    storage.add_well("test_well", df)
+    n_depth = df.shape[0]
+
+    storage.add_column("test_well", "Pressure(MPa)", np.ones(n_depth))
+    assert storage.get_columns("test_well")[-1] == "Pressure(MPa)"
+    with pytest.raises(ValueError):
+        storage.add_column("test_well", "Pressure(MPa)", np.ones(n_depth))
+    with pytest.raises(ValueError):
+        storage.add_column("test_well", "Other(MPa)", np.ones(n_depth + 1))
+
+    storage.replace_column("test_well", "Pressure(MPa)", np.zeros(n_depth))
+    assert (storage.get_column("test_well", "Pressure(MPa)") == 0).all()
+
+    storage.rename_column("test_well", "Pressure(MPa)", "Pres(MPa)")
+    assert storage.get_columns("test_well")[-1] == "Pres(MPa)"
+    storage.delete_column("test_well", "Pres(MPa)")
+    assert storage.get_columns("test_well") == df.columns.tolist()
+    with pytest.raises(KeyError):
+        storage.delete_column("test_well", "Pres(MPa)")
+
+    # only the changed column is written
+    new_df = df.copy()
+    new_df["Shale_Volume(Fraction)"] = 0.5
+    storage.update_well("test_well", new_df)
+    assert (storage.get_column("test_well", "Shale_Volume(Fraction)") == \
+        0.5).all()
+    assert storage.get_columns("test_well") == df.columns.tolist()
+
+
+def test__well_storage_ingest(tmpdir, pseudo_las_file):
+    las_dir = tmpdir.mkdir('las')
+    las_dir.join('Well-A.las').write(pseudo_las_file.read())
+    las_dir.join('well_b.las').write(pseudo_las_file.read())
+    las_dir.join('broken.las').write("Velocity(m/s)\n1\n")
+    las_dir.join('notes.txt').write("not a las file")
+    storage = ppp.WellStorage(str(tmpdir.join("ingest.h5")))
+    report = storage.ingest(str(las_dir), workers=2)
+    assert report['well'].tolist() == ['well_a', 'broken', 'well_b']
+    assert report['error'].isnull().tolist() == [True, False, True]
+    assert report['rows'].tolist() == [21, 0, 21]
+    assert storage.wells == ['well_a', 'well_b']
+    expected = ppp.LasData(str(pseudo_las_file)).data_frame
+    pd.testing.assert_frame_equal(storage.get_well_data('well_a'), expected)
+
+
+def test__well_storage_atomic_write(tmpdir, monkeypatch):
+    storage = ppp.WellStorage(str(tmpdir.join("atomic.h5")))
+    original = pd.DataFrame(
+        {"Depth(m)": [1., 2., 3.], "Vel(m/s)": [4., 5., 6.]})
+    storage.add_well("well_a", original)
+
+    def failing_write(h5, group, node, values):
+        raise IOError("disk full")
+    monkeypatch.setattr(
+        ppp.basic.well_storage, "_write_column", failing_write)
+    with pytest.raises(IOError):
+        storage.add_well("well_a", original * 2)
+    monkeypatch.undo()
+    # the well is left as it was and the temporary group is not a well
+    assert storage.wells == ["well_a"]
+    pd.testing.assert_frame_equal(storage.get_well_data("well_a"), original)
+    storage.add_well("well_a", original * 2)
+    pd.testing.assert_frame_equal(
+        storage.get_well_data("well_a"), original * 2)
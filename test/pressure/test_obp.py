@@ -27,3 +27,21 @@ def test_obp_trace(rho):
     assert (np.round(ppp.obp_trace(rho, 1), 5) == \
         np.array([0.01078, 0.02156, 0.03234, 0.04312, 0.0539, 0.06468,
                   0.07546, 0.08624, 0.09702, 0.1078])).all()
+
+def test_gardner_obp_seis_workers(tmpdir):
+    import shutil
+    import os
+    seis_file = str(tmpdir.join('f3_sparse.sgy'))
+    shutil.copy(os.path.join(
+        os.path.dirname(__file__), '..', 'data', 'f3_sparse.sgy'), seis_file)
+    vel_cube = ppp.SeiSEGY(seis_file)
+    den_1 = ppp.gardner_seis("den_1", vel_cube)
+    den_2 = ppp.gardner_seis("den_2", vel_cube, n_workers=2)
+    assert np.array_equal(den_1.data(ppp.DepthIndex(800)),
+                          den_2.data(ppp.DepthIndex(800)),
+                          equal_nan=True)
+    obp_1 = ppp.obp_seis("obp_1", den_1)
+    obp_2 = ppp.obp_seis("obp_2", den_2, n_workers=2)
+    assert np.array_equal(obp_1.data(ppp.InlineIndex(300)),
+                          obp_2.data(ppp.InlineIndex(300)),
+                          equal_nan=True)
@@ -0,0 +1,88 @@
+# -*- coding: utf-8 -*-
+"""
+Test Pipeline
+"""
+from __future__ import (absolute_import, division, print_function,
+                        unicode_literals)
+
+import os
+import shutil
+
+import pytest
+import numpy as np
+import pygeopressure as ppp
+
+
+@pytest.fixture()
+def vel_cube(tmpdir):
+    seis_file = str(tmpdir.join('f3_sparse.sgy'))
+    shutil.copy(os.path.join(
+        os.path.dirname(__file__), '..', 'data', 'f3_sparse.sgy'), seis_file)
+    return ppp.SeiSEGY(seis_file)
+
+
+def test__pipeline(vel_cube):
+    den_cube = ppp.gardner_seis("den", vel_cube)
+    obp_cube = ppp.obp_seis("obp", den_cube)
+    eaton_cube = ppp.eaton_seis("eaton", obp_cube, vel_cube, 3, a=-8, b=1e-4)
+
+    pipe = ppp.Pipeline(vel_cube)
+    pipe.gardner().obp(name="obp_pipe", save=True)
+    pipe.eaton(3, a=-8, b=1e-4, name="eaton_pipe", obp="obp_pipe")
+    cubes = pipe.run(n_workers=2)
+
+    assert list(cubes.keys()) == ["obp_pipe", "eaton_pipe"]
+    # intermediates are not rounded to float32 on disk
+    assert np.allclose(obp_cube.data(ppp.InlineIndex(300)),
+                       cubes["obp_pipe"].data(ppp.InlineIndex(300)),
+                       equal_nan=True)
+    assert np.allclose(eaton_cube.data(ppp.DepthIndex(800)),
+                       cubes["eaton_pipe"].data(ppp.DepthIndex(800)),
+                       equal_nan=True)
+    with pytest.raises(ValueError):
+        pipe.obp(den="unknown")
+
+
+def test__pipeline_fillippone(vel_cube):
+    den_cube = ppp.gardner_seis("den", vel_cube)
+    obp_cube = ppp.obp_seis("obp", den_cube)
+    fillippone_cube = ppp.fillippone_seis("fillippone", obp_cube, vel_cube)
+
+    pipe = ppp.Pipeline(vel_cube)
+    pipe.gardner().obp().fillippone(name="fillippone_pipe")
+    cubes = pipe.run()
+
+    assert list(cubes.keys()) == ["fillippone_pipe"]
+    assert np.allclose(fillippone_cube.data(ppp.InlineIndex(300)),
+                       cubes["fillippone_pipe"].data(ppp.InlineIndex(300)),
+                       rtol=1e-5, equal_nan=True)
+
+
+def test__pipeline_bowers_optimize(tmpdir, vel_cube):
+    depth = np.array(list(vel_cube.depths()))
+    with vel_cube.session():
+        for inl in vel_cube.inlines():
+            vel_cube.update(ppp.InlineIndex(inl), np.tile(
+                1800 + depth + inl, (vel_cube.nNorth, 1)))
+    hor_files = []
+    for name, z in [("upper", 300), ("lower", 1000)]:
+        hor_file = tmpdir.join("{}.txt".format(name))
+        hor_file.write("inline\tcrline\tz\n" + "".join(
+            "{}\t{}\t{}\n".format(inl, crl, z) \
+            for inl, crl in vel_cube.inline_crlines()))
+        hor_files.append(ppp.Horizon(str(hor_file)))
+    upper, lower = hor_files
+    obp_cube = ppp.obp_seis("obp", ppp.gardner_seis("den", vel_cube))
+    bowers_cube = ppp.bowers_seis(
+        "bowers", obp_cube, vel_cube, upper=upper, lower=lower,
+        mode='optimize')
+
+    pipe = ppp.Pipeline(vel_cube)
+    pipe.gardner().obp().bowers(
+        upper=upper, lower=lower, mode='optimize', name="bowers_pipe")
+    cubes = pipe.run()
+
+    # both write pore pressure, not effective stress
+    pressure = bowers_cube.data(ppp.InlineIndex(300))
+    assert np.allclose(pressure, cubes["bowers_pipe"].data(
+        ppp.InlineIndex(300)), rtol=1e-4, equal_nan=True)
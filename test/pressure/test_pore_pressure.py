@@ -5,9 +5,14 @@ Created on Nov. 16th 2017
 from __future__ import (absolute_import, division, print_function,
                         unicode_literals)
 
+import os
+import shutil
+import warnings
+
 import pytest
 import numpy as np
 import pygeopressure as ppp
+from pygeopressure.basic.seis_utils import create_seis
 
 
 def test__virgin_curve():
@@ -86,3 +91,144 @@ def test__pressure_multivariate_varu():
     assert pres[0] == 37.988
     assert float("{:.4f}".format(pres[7])) == 38.5549
     assert pres[-1] == 37.988
+
+
+def test__fillippone_trace():
+    twt = np.arange(100, 2100, 100.)
+    v_int = 1600 + twt * 0.8
+    v_max, v_min = ppp.pressure.fillippone.v_max_min(
+        twt, ppp.int2rms(twt, v_int))
+    assert v_max.shape == v_min.shape == twt.shape
+    assert (v_max > v_min).all()
+    obp_d = np.full((36,), 30.)
+    depth, pressure = ppp.fillippone_from_vint_time(
+        twt, v_int, 40, 100, 1500, obp_d)
+    assert depth.shape == pressure.shape == (36,)
+    assert np.isfinite(pressure).all()
+
+
+def test__fillippone_seis(tmpdir):
+    seis_file = str(tmpdir.join('f3_sparse.sgy'))
+    shutil.copy(os.path.join(
+        os.path.dirname(__file__), '..', 'data', 'f3_sparse.sgy'), seis_file)
+    vel_cube = ppp.SeiSEGY(seis_file)
+    depth = np.array(list(vel_cube.depths()))
+    with vel_cube.session():
+        for inl in vel_cube.inlines():
+            vel_cube.update(ppp.InlineIndex(inl), np.tile(
+                1800 + depth + inl, (vel_cube.nNorth, 1)))
+    obp_cube = ppp.obp_seis("obp", ppp.gardner_seis("den", vel_cube))
+    depth_cube = ppp.fillippone_seis(
+        "fillip", obp_cube, vel_cube, n_workers=2)
+    time_cube = ppp.fillippone_seis(
+        "fillip_time", obp_cube, vel_cube, domain='time')
+
+    vel = vel_cube.cdp((300, 800))
+    twt = 2000 * np.cumsum(np.diff(depth, prepend=0) / vel)
+    v_max, v_min = ppp.pressure.fillippone.v_max_min(
+        twt, ppp.int2rms(twt, vel))
+    expected = ppp.fillippone(vel, v_max, v_min, obp_cube.cdp((300, 800)))
+    assert np.allclose(depth_cube.cdp((300, 800)), expected, rtol=1e-5)
+    time_result = time_cube.cdp((300, 800))
+    assert np.isnan(time_result[0]) and np.isfinite(time_result[-1])
+    with pytest.raises(ValueError):
+        ppp.fillippone_seis("fail", obp_cube, vel_cube, domain='space')
+
+
+def test__fillippone_inline_invalid():
+    depth = np.arange(100, 1540, 40.)
+    vel = np.tile(1800 + depth, (3, 1))
+    vel[0, 5] = 0
+    vel[1, 10:12] = np.nan
+    vel[2, 20] = -1500
+    obp = np.tile(depth * 0.02, (3, 1))
+    valid = np.isfinite(vel) & (np.nan_to_num(vel) > 0)
+    with warnings.catch_warnings():
+        warnings.simplefilter('error')
+        pressure = ppp.pressure.fillippone._fillippone_inline(
+            300, obp, vel, None, depth, 1, 1524, 'linear')
+        time_pressure = ppp.pressure.fillippone._fillippone_inline(
+            300, obp, vel, 2 * depth, depth, 1, 1524, 'linear')
+    assert np.isfinite(pressure[valid]).all()
+    assert np.isnan(pressure[~valid]).all()
+    assert np.isfinite(time_pressure[:, -1]).all()
+
+
+def test__multivariate_seis(tmpdir):
+    seis_file = str(tmpdir.join('f3_sparse.sgy'))
+    shutil.copy(os.path.join(
+        os.path.dirname(__file__), '..', 'data', 'f3_sparse.sgy'), seis_file)
+    obp_cube = ppp.SeiSEGY(seis_file)
+    depth = np.array(list(obp_cube.depths()))
+    cubes = [create_seis(name, obp_cube) for name in ('vel', 'phi', 'vsh')]
+    with ppp.basic.seis_utils._sessions([obp_cube] + cubes):
+        for inl in obp_cube.inlines():
+            for cube, trace in zip(
+                    [obp_cube] + cubes,
+                    [depth * 0.02, 1800 + depth * 1.5 + inl,
+                     0.3 - depth * 1e-4, 0.2 + depth * 1e-4]):
+                cube.update(ppp.InlineIndex(inl),
+                            np.tile(trace, (obp_cube.nNorth, 1)))
+    hor_file = tmpdir.join("top.txt")
+    hor_file.write("inline\tcrline\tz\n" + "".join(
+        "{}\t{}\t700\n".format(inl, crl) \
+        for inl, crl in obp_cube.inline_crlines()))
+    coefficients = (1800, 10, 100, 50, 0.8)
+    virgin_cube = ppp.multivariate_seis(
+        "mv", obp_cube, *cubes + list(coefficients))
+    unloading_cube = ppp.multivariate_seis(
+        "mv_unloading", obp_cube, *cubes + list(coefficients), U=3,
+        vmax=3000, upper=ppp.Horizon(str(hor_file)), buf=5, n_workers=2)
+
+    cdp = (300, 800)
+    data = [cube.cdp(cdp).astype(np.float64) for cube in [obp_cube] + cubes]
+    assert np.allclose(
+        virgin_cube.cdp(cdp),
+        data[0] - ppp.invert_multivariate_virgin(
+            *data[1:] + list(coefficients)),
+        equal_nan=True)
+    expected = ppp.pressure_multivariate_varu(
+        *data + list(coefficients) + [3, 3000],
+        start_idx=np.searchsorted(depth, 700), buf=5)
+    assert np.allclose(unloading_cube.cdp(cdp), expected, equal_nan=True)
+
+    ep_coefficients = [1800, -100, -500, 100, -0.1]
+    ep_cube = ppp.eberhart_phillips_seis(
+        "ep", obp_cube, *cubes + ep_coefficients)
+    sigma = data[0] - ep_cube.cdp(cdp)
+    assert np.allclose(
+        ppp.eberhart_phillips(sigma, *data[2:] + ep_coefficients), data[1],
+        rtol=1e-3)
+    table_cube = ppp.eberhart_phillips_seis(
+        "ep_table", obp_cube, *cubes + ep_coefficients, method='table')
+    assert np.allclose(table_cube.cdp(cdp), ep_cube.cdp(cdp), atol=0.1,
+                       equal_nan=True)
+
+
+def test__invert_stress_term():
+    from pygeopressure.pressure.eberhart_phillips import (
+        invert_stress_term, Han_lookup)
+    sigma = np.random.RandomState(0).uniform(0, 100, (3, 4, 5))
+    for B in (-0.1, -2, 0):
+        value = sigma - np.exp(B * sigma)
+        assert np.allclose(invert_stress_term(value, B), sigma,
+                           rtol=0, atol=1e-6)
+        assert np.allclose(invert_stress_term(value, B, method='table'),
+                           sigma, rtol=0, atol=0.1)
+    assert np.isnan(invert_stress_term(-5, -0.1))
+    # increasing branch below the maximum at -ln(B)/B
+    assert np.isclose(invert_stress_term(1 - np.exp(0.5), 0.5), 1)
+    assert np.isnan(invert_stress_term(1, 0.5))
+    assert np.isclose(Han_lookup(-0.1)(5 - np.exp(-0.5)), 5)
+    with pytest.raises(ValueError):
+        invert_stress_term(1, -0.1, method='bisect')
+    assert isinstance(invert_stress_term(5, -0.1), float)
+    assert isinstance(invert_stress_term(5, -0.1, method='table'), float)
+    with pytest.warns(UserWarning):
+        assert np.isnan(invert_stress_term(sigma, -0.1, max_iter=1)).all()
+    table, _ = ppp.pressure.eberhart_phillips._han_table(-0.1)
+    assert not table.flags.writeable
+    for B in np.linspace(-1, 0, 50):
+        ppp.pressure.eberhart_phillips._han_table(B)
+    assert len(ppp.pressure.eberhart_phillips._TABLES) <= \
+        ppp.pressure.eberhart_phillips._TABLE_CACHE_SIZE
@@ -0,0 +1,119 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Oct 18 2026
+"""
+from __future__ import (absolute_import, division, print_function,
+                        unicode_literals)
+
+import os
+import shutil
+
+import pytest
+import numpy as np
+import pygeopressure as ppp
+from pygeopressure.pressure.uncertainty import (
+    sample_coefficients, bootstrap_coefficients, ensemble, ensemble_logs,
+    ensemble_seis)
+from pygeopressure.basic.seis_utils import create_seis
+
+
+def test__sample_coefficients():
+    samples = sample_coefficients([1, 2], np.diag([0.01, 0.04]), 2000, seed=1)
+    assert samples.shape == (2000, 2)
+    assert np.array_equal(
+        samples, sample_coefficients([1, 2], np.diag([0.01, 0.04]), 2000,
+                                     seed=1))
+    assert np.allclose(samples.std(axis=0), [0.1, 0.2], rtol=0.1)
+
+
+def test__bootstrap_coefficients():
+    es = np.linspace(5, 60, 30)
+    vel = ppp.virgin_curve(es, 120, 0.82) + \
+        np.random.RandomState(0).normal(0, 20, 30)
+    coefficients = bootstrap_coefficients(
+        ppp.virgin_curve, es, vel, size=50, p0=[100, 0.8], seed=2)
+    assert coefficients.shape == (50, 2)
+    assert np.allclose(np.nanmedian(coefficients, axis=0), [120, 0.82],
+                       rtol=0.1)
+
+
+def test__ensemble_eaton():
+    vel = np.linspace(2000, 3000, 50)
+    hydro, obp = np.linspace(10, 30, 50), np.linspace(20, 60, 50)
+    samples = sample_coefficients(3, 0.04, 1000, seed=0)
+    results = ensemble(ppp.eaton, {'n': samples[:, 0]},
+                       args=(vel, 2800, hydro, obp))
+    assert results.shape == (3, 50)
+    assert (results[0] <= results[1]).all() and \
+        (results[1] <= results[2]).all()
+    assert np.allclose(results[1], ppp.eaton(vel, 2800, hydro, obp, n=3),
+                       rtol=1e-2)
+    # same result regardless of chunking
+    chunked = ensemble(ppp.eaton, {'n': samples[:, 0]},
+                       args=(vel, 2800, hydro, obp), chunk_size=7,
+                       max_elements=10)
+    assert np.allclose(results, chunked)
+    logs = ensemble_logs(np.arange(50), ppp.eaton, {'n': samples[:, 0]},
+                         args=(vel, 2800, hydro, obp))
+    assert [log.name for log in logs] == ['P10', 'P50', 'P90']
+
+
+def test__ensemble_bowers_varu():
+    vel = np.full((4, 30), 2112.)
+    obp = np.full((4, 30), 100.)
+    u = np.array([2., 3., 4.])
+    results = ensemble(
+        ppp.bowers_varu, {'u': u}, args=(vel, obp),
+        kwargs=dict(start_idx=10, a=98, b=0.5, vmax=4000, buf=5),
+        percentiles=(0, 50, 100), max_elements=100)
+    for result, u_value in zip(results, u):
+        assert np.allclose(result, ppp.bowers_varu(
+            vel[0], obp[0], u_value, 10, 98, 0.5, 4000, buf=5))
+
+
+def _scale(data, factor):
+    return data * factor
+
+
+def test__ensemble_seis(tmpdir):
+    seis_file = str(tmpdir.join('f3_sparse.sgy'))
+    shutil.copy(os.path.join(
+        os.path.dirname(__file__), '..', 'data', 'f3_sparse.sgy'), seis_file)
+    cube = ppp.SeiSEGY(seis_file)
+    outputs = [create_seis(name, cube) for name in ('p10', 'p90')]
+    ensemble_seis(_scale, {'factor': [1., 2., 3.]}, [cube], outputs,
+                  percentiles=(0, 100))
+    data = cube.data(ppp.InlineIndex(300))
+    assert np.allclose(outputs[0].data(ppp.InlineIndex(300)),
+                       np.minimum(data, 3 * data), equal_nan=True)
+    assert np.allclose(outputs[1].data(ppp.InlineIndex(300)),
+                       np.maximum(data, 3 * data), equal_nan=True)
+
+
+def test__ensemble_end_idx_none():
+    vel = np.full((30,), 2112.)
+    obp = np.full((30,), 100.)
+    u = np.array([2., 3.])
+    results = ensemble(
+        ppp.bowers_varu, {'u': u}, args=(vel, obp),
+        kwargs=dict(start_idx=10, a=98, b=0.5, vmax=4000, buf=5,
+                    end_idx=None, end_buffer=10),
+        percentiles=(0, 100))
+    for result, u_value in zip(results, u):
+        assert np.allclose(result, ppp.bowers_varu(
+            vel, obp, u_value, 10, 98, 0.5, 4000, buf=5, end_idx=None))
+
+
+def test__ensemble_scalar_inputs():
+    with pytest.raises(ValueError):
+        ensemble(ppp.eaton, {'n': [2., 3.]}, args=(2000, 2800, 10, 30))
+
+
+def test__ensemble_precision():
+    def shift(data, offset):
+        return data + offset
+
+    result = ensemble(shift, {'offset': [0.1, 0.2, 0.3]},
+                      args=(np.full((2, 4), 1e8),), percentiles=(50,))
+    assert result.dtype == np.float64
+    assert np.allclose(result, 1e8 + 0.2, rtol=0, atol=1e-6)
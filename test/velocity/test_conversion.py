@@ -5,9 +5,14 @@ Created on Aug. 23rd 2018
 from __future__ import (absolute_import, division, print_function,
                         unicode_literals)
 
+import os
+import shutil
+
 import pytest
 import numpy as np
+from scipy.interpolate import PchipInterpolator
 import pygeopressure as ppp
+from pygeopressure.basic.seis_utils import create_seis
 
 
 @pytest.fixture()
@@ -31,3 +36,62 @@ def test__avg_int(twt, vel):
 def test_time2depth(twt, vel):
     _, new_vel = ppp.twt2depth(twt, vel, vel, stepDepth=500)
     assert new_vel[0] == vel[0]
+
+
+def test__conversion_nd(twt, vel):
+    cube = np.stack([vel, vel * 2, vel[::-1]]).reshape((3, 1, 4))
+    for forward, backward in [(ppp.int2rms, ppp.rms2int),
+                              (ppp.int2avg, ppp.avg2int)]:
+        converted = forward(twt, cube)
+        assert converted.shape == cube.shape
+        for trace, result in zip(cube.reshape((3, 4)),
+                                 converted.reshape((3, 4))):
+            assert np.allclose(result, forward(twt, trace))
+        assert np.allclose(backward(twt, converted), cube)
+    assert np.allclose(ppp.int2avg(twt, vel)[-1],
+                       np.sum(vel * 1000) / twt[-1])
+
+
+def test__twt2depth_batch():
+    twt = np.arange(0, 1000, 20.)
+    v_avg = np.stack([1500 + np.arange(50.) * 10, 1800 + np.arange(50.) * 5])
+    prop = np.sin(twt / 100) * [[1], [2]]
+    depth = np.arange(0, 900, 7.)
+    linear, pchip = [
+        ppp.twt2depth_batch(twt, v_avg, [prop], depth, kind=kind)[0] \
+        for kind in ('linear', 'pchip')]
+    for i in range(2):
+        time_depth = twt * 0.001 * v_avg[i] / 2
+        inside = depth <= time_depth[-1]
+        assert np.allclose(linear[i][inside],
+                           np.interp(depth[inside], time_depth, prop[i]))
+        assert np.allclose(
+            pchip[i][inside],
+            PchipInterpolator(time_depth, prop[i])(depth[inside]))
+        assert np.isnan(linear[i][~inside]).all()
+    with pytest.raises(ValueError):
+        ppp.twt2depth_batch(twt, v_avg, [prop], depth, kind='cubic')
+
+
+def test__twt2depth_seis(tmpdir):
+    seis_file = str(tmpdir.join('f3_sparse.sgy'))
+    shutil.copy(os.path.join(
+        os.path.dirname(__file__), '..', 'data', 'f3_sparse.sgy'), seis_file)
+    amp_cube = ppp.SeiSEGY(seis_file)
+    twt = np.array(list(amp_cube.depths()))
+    vel_cube = create_seis("vel_twt", amp_cube)
+    with vel_cube.session():
+        for inl in vel_cube.inlines():
+            vel_cube.update(ppp.InlineIndex(inl), np.tile(
+                2000 + twt + inl, (vel_cube.nNorth, 1)))
+    depth_cubes = ppp.twt2depth_seis(
+        ["vel_depth", "amp_depth"], vel_cube, [vel_cube, amp_cube],
+        (500, 1200, 10), n_workers=2)
+    assert depth_cubes[1].inDepth
+    assert list(depth_cubes[1].depths())[:2] == [500, 510]
+    v_avg = ppp.int2avg(twt, vel_cube.data(ppp.InlineIndex(300)))
+    expected = ppp.twt2depth_batch(
+        twt, v_avg, [amp_cube.data(ppp.InlineIndex(300))],
+        np.arange(500, 1201, 10))[0]
+    assert np.allclose(depth_cubes[1].data(ppp.InlineIndex(300)), expected,
+                       equal_nan=True)